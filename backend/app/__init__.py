@@ -1,7 +1,7 @@
-import threading
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
+import multiprocessing
 import os
 
 
@@ -46,9 +46,26 @@ def create_app():
 	from app.api import api_bp
 	app.register_blueprint(api_bp, url_prefix="/api")
 
-	# Pre-warm RoBERTa model in background so first request isn't slow
-	from app.api.hf_proxy import _prewarm_model
-	threading.Thread(target=_prewarm_model, daemon=True).start()
+	# Resume-parse worker processes (app/utils/resume_extraction.py) re-import
+	# the main module, e.g. run.py; they must not load or warm any model.
+	if multiprocessing.current_process().name != "MainProcess":
+		return app
+
+	from app.config import ai_config
+	if ai_config.MODEL_PRELOAD:
+		# Load synchronously: under gunicorn preload_app this runs in the master,
+		# so every forked worker shares the weights copy-on-write.
+		from app.ai_module.model_registry import get_model_registry
+		from app.ai_module.whisper.transcriber import register_whisper_model
+		register_whisper_model()
+		get_model_registry().preload(ai_config.MODEL_PRELOAD)
+
+	# Warm every configured model in parallel so the first request isn't slow
+	# (/api/ready reports progress). Under gunicorn preload the warm-up threads
+	# are started per worker in gunicorn.conf.py post_fork instead.
+	if not ai_config.GUNICORN_PRELOAD:
+		from app.ai_module.warmup import start_warmup
+		start_warmup()
 
 	return app
 
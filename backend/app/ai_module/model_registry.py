@@ -0,0 +1,299 @@
+import ctypes
+import gc
+import logging
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.config import ai_config
+
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+	"""Resident set size of this process (0 when it cannot be read)."""
+	try:
+		with open("/proc/self/statm", "r") as statm:
+			return int(statm.read().split()[1]) * _PAGE_SIZE
+	except (OSError, ValueError, IndexError):
+		pass
+	try:
+		import resource
+
+		# ru_maxrss is a peak, in KiB on Linux — only a rough fallback.
+		return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+	except Exception:
+		return 0
+
+
+def _release_memory() -> None:
+	gc.collect()
+	try:
+		ctypes.CDLL("libc.so.6").malloc_trim(0)
+	except Exception:
+		pass
+
+
+class _ModelSlot:
+	def __init__(self, name: str, loader: Callable[[], Any], pinned: bool, retry_after_seconds: float):
+		self.name = name
+		self.loader = loader
+		self.pinned = pinned
+		self.retry_after_seconds = retry_after_seconds
+		self.model: Any = None
+		self.state = "unloaded"  # unloaded | loading | ready | failed
+		self.error: Optional[str] = None
+		self.failed_at: Optional[float] = None
+		self.load_seconds: Optional[float] = None
+		self.rss_delta_bytes: int = 0
+		self.loaded_at: Optional[float] = None
+		self.last_used: Optional[float] = None
+		self.loaded_pid: Optional[int] = None
+		self.loads = 0
+		self.unloads = 0
+		self.lock = threading.Lock()
+
+
+class ModelRegistry:
+	"""Process-wide owner of the heavy AI models (RoBERTa, NLI, Whisper).
+
+	Models are registered with a zero-argument loader and loaded on first use.
+	When the registry holds more than `memory_budget_bytes` of model memory
+	(measured as the RSS growth of each load), the least recently used
+	unpinned models are unloaded; a background reaper also unloads models idle
+	for longer than `idle_unload_seconds`. Loads run one at a time, so
+	parallel warm-up cannot count one model's growth towards another. Models loaded before a gunicorn fork
+	(preload_app) are shared copy-on-write by the workers.
+	"""
+
+	def __init__(self, memory_budget_bytes: int = 0, idle_unload_seconds: float = 0.0):
+		self.memory_budget_bytes = memory_budget_bytes
+		self.idle_unload_seconds = idle_unload_seconds
+		self._slots: Dict[str, _ModelSlot] = {}
+		self._lock = threading.Lock()
+		self._load_lock = threading.Lock()
+		self._reaper: Optional[threading.Thread] = None
+		self._reaper_pid: Optional[int] = None
+
+	# ── registration ──────────────────────────────────────────────────────────
+	def register(self, name: str, loader: Callable[[], Any], pinned: bool = False, retry_after_seconds: float = 0.0) -> None:
+		"""Register (or re-point) a model loader. Existing loaded models are kept.
+
+		A failed load is retried on the first get() at least `retry_after_seconds`
+		after the failure (0 = on every get()).
+		"""
+		with self._lock:
+			slot = self._slots.get(name)
+			if slot is None:
+				self._slots[name] = _ModelSlot(name, loader, pinned, retry_after_seconds)
+			else:
+				slot.loader = loader
+				slot.pinned = pinned
+				slot.retry_after_seconds = retry_after_seconds
+
+	def is_registered(self, name: str) -> bool:
+		return name in self._slots
+
+	def names(self) -> List[str]:
+		return list(self._slots)
+
+	# ── access ────────────────────────────────────────────────────────────────
+	def get(self, name: str) -> Any:
+		"""Return the loaded model, loading it if needed; None if it failed to load."""
+		slot = self._slots.get(name)
+		if slot is None:
+			raise KeyError(f"Model '{name}' is not registered")
+
+		slot.last_used = time.time()
+		if slot.model is not None:
+			return slot.model
+
+		with slot.lock:
+			if slot.model is not None:
+				return slot.model
+			if slot.state == "failed" and time.time() - (slot.failed_at or 0.0) < slot.retry_after_seconds:
+				return None
+			self._load(slot)
+		self._enforce_budget(keep=name)
+		self._ensure_reaper()
+		return slot.model
+
+	def peek(self, name: str) -> Any:
+		"""Return the model only if it is already loaded (never triggers a load)."""
+		slot = self._slots.get(name)
+		return slot.model if slot is not None else None
+
+	def state(self, name: str) -> str:
+		slot = self._slots.get(name)
+		return slot.state if slot is not None else "unregistered"
+
+	def error(self, name: str) -> Optional[str]:
+		slot = self._slots.get(name)
+		return slot.error if slot is not None else None
+
+	def preload(self, names: Iterable[str]) -> Dict[str, str]:
+		"""Load models synchronously (e.g. in the gunicorn master before fork)."""
+		states = {}
+		for name in names:
+			if name not in self._slots:
+				logger.warning("Cannot preload unknown model '%s'", name)
+				states[name] = "unregistered"
+				continue
+			self.get(name)
+			states[name] = self.state(name)
+		return states
+
+	def unload(self, name: str, reason: str = "manual") -> bool:
+		slot = self._slots.get(name)
+		if slot is None or slot.model is None:
+			return False
+		with slot.lock:
+			if slot.model is None:
+				return False
+			slot.model = None
+			slot.state = "unloaded"
+			slot.unloads += 1
+			freed = slot.rss_delta_bytes
+			slot.rss_delta_bytes = 0
+		_release_memory()
+		print(f"[models] unloaded {name} ({reason}, ~{freed // (1024 * 1024)} MB)", flush=True)
+		return True
+
+	# ── internals ─────────────────────────────────────────────────────────────
+	def _load(self, slot: _ModelSlot) -> None:
+		slot.state = "loading"
+		# RSS is process-wide: a concurrent load would show up in this delta too.
+		with self._load_lock:
+			rss_before = current_rss_bytes()
+			started = time.perf_counter()
+			try:
+				model = slot.loader()
+				if model is None:
+					raise RuntimeError("loader returned None")
+			except Exception as error:
+				slot.state = "failed"
+				slot.error = str(error)
+				slot.failed_at = time.time()
+				print(f"FAILED to load model '{slot.name}': {error}", flush=True)
+				traceback.print_exc()
+				return
+			rss_delta = max(0, current_rss_bytes() - rss_before)
+
+		slot.model = model
+		slot.state = "ready"
+		slot.error = None
+		slot.load_seconds = time.perf_counter() - started
+		slot.rss_delta_bytes = rss_delta
+		slot.loaded_at = time.time()
+		slot.loaded_pid = os.getpid()
+		slot.loads += 1
+		print(
+			f"[models] loaded {slot.name} in {slot.load_seconds:.1f}s "
+			f"(~{slot.rss_delta_bytes // (1024 * 1024)} MB)",
+			flush=True,
+		)
+
+	def loaded_bytes(self) -> int:
+		return sum(slot.rss_delta_bytes for slot in self._slots.values() if slot.model is not None)
+
+	def _enforce_budget(self, keep: Optional[str] = None) -> None:
+		if self.memory_budget_bytes <= 0:
+			return
+		candidates = sorted(
+			(slot for slot in self._slots.values() if slot.model is not None and not slot.pinned and slot.name != keep),
+			key=lambda slot: slot.last_used or 0.0,
+		)
+		for slot in candidates:
+			if self.loaded_bytes() <= self.memory_budget_bytes:
+				return
+			self.unload(slot.name, reason="memory budget")
+
+	def unload_idle(self, now: Optional[float] = None) -> List[str]:
+		if self.idle_unload_seconds <= 0:
+			return []
+		now = time.time() if now is None else now
+		idle = [
+			slot.name for slot in self._slots.values()
+			if slot.model is not None and not slot.pinned
+			and now - (slot.last_used or slot.loaded_at or now) > self.idle_unload_seconds
+		]
+		return [name for name in idle if self.unload(name, reason="idle")]
+
+	def _ensure_reaper(self) -> None:
+		# Threads do not survive fork: restart the reaper in each worker.
+		if self.idle_unload_seconds <= 0:
+			return
+		if self._reaper is not None and self._reaper.is_alive() and self._reaper_pid == os.getpid():
+			return
+		with self._lock:
+			if self._reaper is not None and self._reaper.is_alive() and self._reaper_pid == os.getpid():
+				return
+			self._reaper = threading.Thread(target=self._reap_forever, name="model-idle-reaper", daemon=True)
+			self._reaper_pid = os.getpid()
+			self._reaper.start()
+
+	def _reap_forever(self) -> None:
+		interval = max(5.0, min(60.0, self.idle_unload_seconds / 4))
+		while True:
+			time.sleep(interval)
+			try:
+				self.unload_idle()
+			except Exception:
+				logger.exception("Idle model unload failed")
+
+	def after_fork(self) -> None:
+		"""Reset per-process state in a freshly forked worker."""
+		self._lock = threading.Lock()
+		self._load_lock = threading.Lock()
+		for slot in self._slots.values():
+			slot.lock = threading.Lock()
+		self._reaper = None
+		self._reaper_pid = None
+		self._ensure_reaper()
+
+	# ── stats ─────────────────────────────────────────────────────────────────
+	def stats(self) -> Dict[str, Any]:
+		now = time.time()
+		pid = os.getpid()
+		models = {}
+		for slot in self._slots.values():
+			models[slot.name] = {
+				"state": slot.state,
+				"error": slot.error,
+				"pinned": slot.pinned,
+				"load_seconds": round(slot.load_seconds, 3) if slot.load_seconds is not None else None,
+				"memory_mb": round(slot.rss_delta_bytes / (1024 * 1024), 1),
+				"shared_from_parent": slot.model is not None and slot.loaded_pid not in (None, pid),
+				"idle_seconds": round(now - slot.last_used, 1) if slot.last_used else None,
+				"loads": slot.loads,
+				"unloads": slot.unloads,
+			}
+		return {
+			"pid": pid,
+			"rss_mb": round(current_rss_bytes() / (1024 * 1024), 1),
+			"models_mb": round(self.loaded_bytes() / (1024 * 1024), 1),
+			"memory_budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 1) if self.memory_budget_bytes else None,
+			"idle_unload_seconds": self.idle_unload_seconds or None,
+			"models": models,
+		}
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+	global _registry
+	if _registry is None:
+		with _registry_lock:
+			if _registry is None:
+				_registry = ModelRegistry(
+					memory_budget_bytes=ai_config.MODEL_MEMORY_BUDGET_MB * 1024 * 1024,
+					idle_unload_seconds=ai_config.MODEL_IDLE_UNLOAD_SECONDS,
+				)
+	return _registry
@@ -20,6 +20,8 @@ class Phi3FollowupGenerator:
 		self.model = os.getenv("PHI3_MODEL", "phi3:mini").strip()
 		self.base_url = os.getenv("PHI3_OLLAMA_BASE_URL", "http://127.0.0.1:11434").rstrip("/")
 		self.timeout_seconds = int(os.getenv("PHI3_TIMEOUT_SECONDS", "60"))
+		# Matches the startup warm-up so Ollama keeps phi3 resident between requests.
+		self.keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
 		self.openai_api_key = os.getenv("OPENAI_API_KEY", "").strip()
 		self.openai_base_url = os.getenv("PHI3_OPENAI_BASE_URL", os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")).rstrip("/")
@@ -50,6 +52,7 @@ class Phi3FollowupGenerator:
 			"model": self.model,
 			"prompt": prompt,
 			"stream": False,
+			"keep_alive": self.keep_alive,
 			"options": {
 				"temperature": temperature,
 				"top_p": top_p,
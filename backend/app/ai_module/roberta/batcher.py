@@ -0,0 +1,234 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bound used when the model does not report its own max_seq_length.
+_DEFAULT_MAX_SEQ_TOKENS = 512
+
+
+def estimate_tokens(text: str, max_seq_tokens: int = _DEFAULT_MAX_SEQ_TOKENS) -> int:
+	"""Cheap BPE token estimate (~4 chars per token + <s></s>), capped at the model limit."""
+	return min(max_seq_tokens, len(text) // 4 + 2)
+
+
+class ModelUnavailableError(RuntimeError):
+	"""Raised when the embedding model could not be loaded."""
+
+
+class _PendingRequest:
+	__slots__ = ("texts", "tokens", "future", "enqueued_at")
+
+	def __init__(self, texts: List[str]):
+		self.texts = texts
+		self.tokens = [estimate_tokens(text) for text in texts]
+		self.future: Future = Future()
+		self.enqueued_at = time.monotonic()
+
+
+class EmbeddingBatcher:
+	"""Coalesce concurrent embedding requests into shared forward passes.
+
+	Callers block on encode(); a single background worker drains the queue,
+	waiting up to max_wait_ms after the first request (or until the batch is
+	full by text count / padded token budget), runs the texts length-sorted
+	through the model and scatters the rows back to each caller.
+	"""
+
+	def __init__(
+		self,
+		model_getter: Callable[[], Any],
+		max_wait_ms: float = 8.0,
+		max_batch_size: int = 64,
+		max_batch_tokens: int = 8192,
+	):
+		self.model_getter = model_getter
+		self.max_wait_seconds = max(0.0, max_wait_ms) / 1000.0
+		self.max_batch_size = max(1, max_batch_size)
+		self.max_batch_tokens = max(1, max_batch_tokens)
+
+		self._queue: Deque[_PendingRequest] = deque()
+		self._cond = threading.Condition()
+		self._worker: Optional[threading.Thread] = None
+
+		self._stats_lock = threading.Lock()
+		self._batches = 0
+		self._requests = 0
+		self._texts = 0
+		self._forward_passes = 0
+		self._max_batch_texts = 0
+		self._queue_wait_ms_total = 0.0
+		self._forward_ms_total = 0.0
+		self._recent_batch_sizes: Deque[int] = deque(maxlen=256)
+		self._size_histogram: Dict[str, int] = {}
+
+	# ── public API ────────────────────────────────────────────────────────────
+	def submit(self, texts: Sequence[str]) -> Future:
+		pending = _PendingRequest(list(texts))
+		if not pending.texts:
+			pending.future.set_result(np.zeros((0, 0), dtype=np.float32))
+			return pending.future
+
+		with self._cond:
+			self._ensure_worker()
+			self._queue.append(pending)
+			self._cond.notify()
+		return pending.future
+
+	def encode(self, texts: Sequence[str], timeout: Optional[float] = None) -> np.ndarray:
+		return self.submit(texts).result(timeout=timeout)
+
+	def stats(self) -> Dict[str, Any]:
+		with self._stats_lock:
+			batches = self._batches
+			recent = list(self._recent_batch_sizes)
+			return {
+				"max_wait_ms": self.max_wait_seconds * 1000.0,
+				"max_batch_size": self.max_batch_size,
+				"max_batch_tokens": self.max_batch_tokens,
+				"batches": batches,
+				"requests": self._requests,
+				"texts": self._texts,
+				"forward_passes": self._forward_passes,
+				"avg_requests_per_batch": round(self._requests / batches, 2) if batches else 0.0,
+				"avg_texts_per_batch": round(self._texts / batches, 2) if batches else 0.0,
+				"max_texts_per_batch": self._max_batch_texts,
+				"avg_queue_wait_ms": round(self._queue_wait_ms_total / self._requests, 2) if self._requests else 0.0,
+				"avg_forward_ms": round(self._forward_ms_total / batches, 2) if batches else 0.0,
+				"recent_avg_texts_per_batch": round(sum(recent) / len(recent), 2) if recent else 0.0,
+				"batch_size_histogram": dict(self._size_histogram),
+				"queued_requests": len(self._queue),
+			}
+
+	# ── worker ────────────────────────────────────────────────────────────────
+	def _ensure_worker(self) -> None:
+		# Called with self._cond held. Threads do not survive a fork, so a
+		# gunicorn worker forked from a preloaded master starts its own.
+		if self._worker is None or not self._worker.is_alive():
+			self._worker = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+			self._worker.start()
+
+	def _run(self) -> None:
+		while True:
+			batch = self._collect_batch()
+			try:
+				self._process(batch)
+			except Exception as error:  # pragma: no cover - _process already routes errors to futures
+				logger.exception("Embedding batch failed: %s", error)
+
+	def _collect_batch(self) -> List[_PendingRequest]:
+		with self._cond:
+			while not self._queue:
+				self._cond.wait()
+
+			first = self._queue.popleft()
+			batch = [first]
+			batch_texts = len(first.texts)
+			batch_max_tokens = max(first.tokens)
+			deadline = first.enqueued_at + self.max_wait_seconds
+
+			while True:
+				while self._queue:
+					candidate = self._queue[0]
+					texts = batch_texts + len(candidate.texts)
+					max_tokens = max(batch_max_tokens, max(candidate.tokens))
+					if texts > self.max_batch_size or texts * max_tokens > self.max_batch_tokens:
+						return batch
+					batch.append(self._queue.popleft())
+					batch_texts = texts
+					batch_max_tokens = max_tokens
+
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					return batch
+				self._cond.wait(remaining)
+
+	def _split_sorted(self, order: List[int], tokens: List[int]) -> List[List[int]]:
+		"""Split length-sorted indices into sub-batches within the size/token budget."""
+		groups: List[List[int]] = []
+		current: List[int] = []
+		for index in order:
+			# Indices are sorted by ascending length, so the newest item is the longest.
+			if current and (
+				len(current) + 1 > self.max_batch_size
+				or (len(current) + 1) * tokens[index] > self.max_batch_tokens
+			):
+				groups.append(current)
+				current = []
+			current.append(index)
+		if current:
+			groups.append(current)
+		return groups
+
+	def _process(self, batch: List[_PendingRequest]) -> None:
+		started = time.monotonic()
+		texts: List[str] = []
+		for pending in batch:
+			texts.extend(pending.texts)
+
+		try:
+			model = self.model_getter()
+			if model is None:
+				raise ModelUnavailableError("Embedding model is not available")
+
+			max_seq = int(getattr(model, "max_seq_length", None) or _DEFAULT_MAX_SEQ_TOKENS)
+			tokens = [estimate_tokens(text, max_seq) for text in texts]
+			order = sorted(range(len(texts)), key=lambda i: tokens[i])
+
+			embeddings: Optional[np.ndarray] = None
+			groups = self._split_sorted(order, tokens)
+			for group in groups:
+				group_embeddings = model.encode(
+					[texts[i] for i in group],
+					batch_size=len(group),
+					convert_to_numpy=True,
+					show_progress_bar=False,
+				)
+				if embeddings is None:
+					embeddings = np.empty((len(texts), group_embeddings.shape[1]), dtype=group_embeddings.dtype)
+				embeddings[group] = group_embeddings
+		except BaseException as error:
+			for pending in batch:
+				if not pending.future.done():
+					pending.future.set_exception(error)
+			return
+
+		forward_ms = (time.monotonic() - started) * 1000.0
+		self._record(batch, len(texts), len(groups), forward_ms, started)
+
+		offset = 0
+		for pending in batch:
+			count = len(pending.texts)
+			pending.future.set_result(embeddings[offset:offset + count])
+			offset += count
+
+	def _record(
+		self,
+		batch: List[_PendingRequest],
+		text_count: int,
+		forward_passes: int,
+		forward_ms: float,
+		started: float,
+	) -> None:
+		bucket = 1
+		while bucket < text_count and bucket < 64:
+			bucket *= 2
+		bucket_key = f"<={bucket}" if text_count <= 64 else ">64"
+
+		with self._stats_lock:
+			self._batches += 1
+			self._requests += len(batch)
+			self._texts += text_count
+			self._forward_passes += forward_passes
+			self._max_batch_texts = max(self._max_batch_texts, text_count)
+			self._queue_wait_ms_total += sum((started - pending.enqueued_at) * 1000.0 for pending in batch)
+			self._forward_ms_total += forward_ms
+			self._recent_batch_sizes.append(text_count)
+			self._size_histogram[bucket_key] = self._size_histogram.get(bucket_key, 0) + 1
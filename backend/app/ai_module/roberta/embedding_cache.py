@@ -0,0 +1,255 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:  # POSIX only; on Windows dev boxes the disk tier runs unlocked (single process).
+	import fcntl  # type: ignore
+except ImportError:  # pragma: no cover
+	fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+	"""Canonical form used both as the cache key and as the text sent to the model."""
+	return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def cache_key(model_name: str, text: str) -> str:
+	return hashlib.sha256(f"{model_name}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingTier:
+	"""Append-only float32 vector file, read through np.memmap, plus a key sidecar.
+
+	<slug>.f32   raw rows of `dim` float32 values
+	<slug>.keys  one "<sha256> <row>" line per stored vector
+	<slug>.meta  {"model": ..., "dim": ...}
+
+	Writers take an exclusive flock on the key file so several gunicorn workers
+	can share one directory; readers pick up rows appended by other processes
+	whenever a key is not yet in their local index.
+	"""
+
+	def __init__(self, directory: str, model_name: str, max_rows: int = 200000):
+		slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+		os.makedirs(directory, exist_ok=True)
+		self.model_name = model_name
+		self.max_rows = max_rows
+		self.vectors_path = os.path.join(directory, f"{slug}.f32")
+		self.keys_path = os.path.join(directory, f"{slug}.keys")
+		self.meta_path = os.path.join(directory, f"{slug}.meta")
+
+		self.dim: Optional[int] = None
+		self._rows: Dict[str, int] = {}
+		self._keys_offset = 0
+		self._memmap: Optional[np.memmap] = None
+		self._lock = threading.RLock()
+		self._full_logged = False
+		self._load_meta()
+
+	@property
+	def row_count(self) -> int:
+		return len(self._rows)
+
+	def _load_meta(self) -> None:
+		if not os.path.exists(self.meta_path):
+			return
+		try:
+			with open(self.meta_path, "r", encoding="utf-8") as meta_file:
+				meta = json.load(meta_file)
+			if meta.get("model") == self.model_name and int(meta.get("dim") or 0) > 0:
+				self.dim = int(meta["dim"])
+		except Exception as error:
+			logger.warning("Ignoring unreadable embedding cache meta %s: %s", self.meta_path, error)
+
+	def _write_meta(self, dim: int) -> None:
+		with open(self.meta_path, "w", encoding="utf-8") as meta_file:
+			json.dump({"model": self.model_name, "dim": dim}, meta_file)
+		self.dim = dim
+
+	def _refresh_index(self) -> None:
+		"""Read key lines appended since the last refresh (by any process)."""
+		if not os.path.exists(self.keys_path):
+			return
+		if os.path.getsize(self.keys_path) <= self._keys_offset:
+			return
+		with open(self.keys_path, "rb") as keys_file:
+			keys_file.seek(self._keys_offset)
+			chunk = keys_file.read()
+		# Only consume complete lines; a concurrent writer may be mid-append.
+		complete = chunk[:chunk.rfind(b"\n") + 1]
+		for line in complete.decode("ascii", errors="ignore").splitlines():
+			parts = line.split()
+			if len(parts) == 2 and parts[1].isdigit():
+				self._rows[parts[0]] = int(parts[1])
+		self._keys_offset += len(complete)
+
+	def _vectors(self) -> Optional[np.memmap]:
+		if self.dim is None or not os.path.exists(self.vectors_path):
+			return None
+		rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+		if rows == 0:
+			return None
+		if self._memmap is None or self._memmap.shape[0] != rows:
+			self._memmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+		return self._memmap
+
+	def get(self, key: str) -> Optional[np.ndarray]:
+		with self._lock:
+			if self.dim is None:
+				self._load_meta()
+				if self.dim is None:
+					return None
+			row = self._rows.get(key)
+			if row is None:
+				self._refresh_index()
+				row = self._rows.get(key)
+				if row is None:
+					return None
+			vectors = self._vectors()
+			if vectors is None or row >= vectors.shape[0]:
+				return None
+			return np.array(vectors[row], dtype=np.float32)
+
+	def put_many(self, items: Sequence[Tuple[str, np.ndarray]]) -> int:
+		if not items:
+			return 0
+		with self._lock:
+			if self.dim is None:
+				self._write_meta(int(items[0][1].shape[-1]))
+
+			with open(self.keys_path, "a+b") as keys_file:
+				if fcntl is not None:
+					fcntl.flock(keys_file.fileno(), fcntl.LOCK_EX)
+				try:
+					self._refresh_index()
+					pending = [(key, vector) for key, vector in items if key not in self._rows]
+					room = self.max_rows - len(self._rows)
+					if room <= 0:
+						if not self._full_logged:
+							logger.warning("Embedding disk cache is full (%s rows); not spilling more", self.max_rows)
+							self._full_logged = True
+						return 0
+					pending = pending[:room]
+					if not pending:
+						return 0
+
+					# Row numbers come from the vector file size, so an orphaned
+					# row left by a crash between the two appends is just skipped.
+					start_row = os.path.getsize(self.vectors_path) // (self.dim * 4) if os.path.exists(self.vectors_path) else 0
+					block = np.stack([np.asarray(vector, dtype=np.float32).reshape(self.dim) for _, vector in pending])
+					with open(self.vectors_path, "ab") as vectors_file:
+						vectors_file.write(block.tobytes())
+
+					lines = "".join(f"{key} {start_row + i}\n" for i, (key, _) in enumerate(pending))
+					keys_file.seek(0, os.SEEK_END)
+					keys_file.write(lines.encode("ascii"))
+					keys_file.flush()
+					self._refresh_index()
+					return len(pending)
+				finally:
+					if fcntl is not None:
+						fcntl.flock(keys_file.fileno(), fcntl.LOCK_UN)
+
+
+class EmbeddingCache:
+	"""Content-addressed embedding cache: bounded in-memory LRU over an optional disk tier."""
+
+	def __init__(
+		self,
+		model_name: str,
+		max_entries: int = 4096,
+		disk_dir: Optional[str] = None,
+		disk_max_rows: int = 200000,
+	):
+		self.model_name = model_name
+		self.max_entries = max(1, max_entries)
+		self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+		self._lock = threading.Lock()
+		self.disk: Optional[DiskEmbeddingTier] = None
+		if disk_dir:
+			try:
+				self.disk = DiskEmbeddingTier(disk_dir, model_name, max_rows=disk_max_rows)
+			except Exception as error:
+				logger.warning("Embedding disk cache disabled (%s): %s", disk_dir, error)
+
+		self.memory_hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+
+	def key(self, text: str) -> str:
+		return cache_key(self.model_name, text)
+
+	def _remember(self, key: str, vector: np.ndarray) -> None:
+		# Called with self._lock held.
+		self._entries[key] = vector
+		self._entries.move_to_end(key)
+		while len(self._entries) > self.max_entries:
+			self._entries.popitem(last=False)
+
+	def lookup(self, texts: Sequence[str]) -> Tuple[List[Optional[np.ndarray]], List[str]]:
+		"""Return (vectors-or-None per text, cache keys per text)."""
+		keys = [self.key(text) for text in texts]
+		found: List[Optional[np.ndarray]] = [None] * len(keys)
+		disk_candidates: List[int] = []
+
+		with self._lock:
+			for i, key in enumerate(keys):
+				vector = self._entries.get(key)
+				if vector is not None:
+					self._entries.move_to_end(key)
+					found[i] = vector
+					self.memory_hits += 1
+				else:
+					disk_candidates.append(i)
+
+		if disk_candidates and self.disk is not None:
+			for i in disk_candidates:
+				vector = self.disk.get(keys[i])
+				if vector is not None:
+					found[i] = vector
+			with self._lock:
+				for i in disk_candidates:
+					if found[i] is not None:
+						self._remember(keys[i], found[i])
+						self.disk_hits += 1
+
+		with self._lock:
+			self.misses += sum(1 for vector in found if vector is None)
+		return found, keys
+
+	def store(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+		rows = [np.array(vector, dtype=np.float32) for vector in vectors]
+		with self._lock:
+			for key, vector in zip(keys, rows):
+				self._remember(key, vector)
+		if self.disk is not None:
+			try:
+				self.disk.put_many(list(zip(keys, rows)))
+			except Exception as error:
+				logger.warning("Failed to spill embeddings to disk: %s", error)
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			lookups = self.memory_hits + self.disk_hits + self.misses
+			return {
+				"model": self.model_name,
+				"entries": len(self._entries),
+				"max_entries": self.max_entries,
+				"memory_hits": self.memory_hits,
+				"disk_hits": self.disk_hits,
+				"misses": self.misses,
+				"hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+				"disk_enabled": self.disk is not None,
+				"disk_rows": self.disk.row_count if self.disk is not None else 0,
+			}
@@ -0,0 +1,338 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embedding_cache import cache_key
+
+try:
+	import fcntl  # type: ignore
+except ImportError:  # pragma: no cover
+	fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+_SUPPORTED_DTYPES = {"float16", "float32"}
+MIN_CAPACITY = 256
+
+# (id, row, meta) for an upsert, (id, None, None) for a removal.
+Change = Tuple[str, Optional[int], Optional[Dict[str, Any]]]
+
+
+class EmbeddingStore:
+	"""Persistent id -> embedding matrix, memory-mapped from a compact .npy file.
+
+	<prefix>.json          index: model, dim, dtype, matrix/journal files, rows
+	                       in use and per-id row, text hash and metadata
+	<prefix>.<gen>.npy     the matrix, preallocated with spare rows
+	<prefix>.<gen>.jsonl   journal of writes since the index was written
+	<prefix>.lock          flock'd by writers (gunicorn workers, build scripts)
+	                       around reload -> write, so concurrent writes neither
+	                       lose upserts nor delete each other's files.
+
+	A write appends its vectors to the next free matrix rows in place and a
+	line per id to the journal; an updated id simply moves to its new row.
+	Only when the spare rows run out or dead rows pile up is a new, compacted
+	generation written and the index swapped atomically, so readers in other
+	processes keep a consistent (old) mapping until they notice the change.
+	Readers pick up journal lines appended by other processes as they go.
+	"""
+
+	def __init__(self, path_prefix: str, model_name: str, dtype: str = "float16"):
+		if dtype not in _SUPPORTED_DTYPES:
+			raise ValueError(f"Unsupported embedding store dtype: {dtype}")
+		self.path_prefix = path_prefix
+		self.index_path = f"{path_prefix}.json"
+		self.lock_path = f"{path_prefix}.lock"
+		self.model_name = model_name
+		self.dtype = dtype
+
+		self._lock = threading.RLock()
+		self._entries: Dict[str, Dict[str, Any]] = {}
+		self._matrix: Optional[np.ndarray] = None
+		self._dim: Optional[int] = None
+		self._index_mtime: Optional[float] = None
+		self._matrix_file: Optional[str] = None
+		self._journal_file: Optional[str] = None
+		self._journal_offset = 0
+		self._next_row = 0
+		# Journal changes applied on top of the current generation, in order.
+		self._changes: List[Change] = []
+		self.reload_if_changed()
+
+	def _path(self, name: str) -> str:
+		return os.path.join(os.path.dirname(self.index_path), name)
+
+	# ── loading ───────────────────────────────────────────────────────────────
+	def reload_if_changed(self) -> None:
+		with self._lock:
+			try:
+				mtime = os.path.getmtime(self.index_path)
+			except OSError:
+				return
+			if mtime == self._index_mtime:
+				self._read_journal()
+				return
+			try:
+				with open(self.index_path, "r", encoding="utf-8") as index_file:
+					index = json.load(index_file)
+				if index.get("model") != self.model_name:
+					logger.warning(
+						"Embedding store %s was built with %s, expected %s; ignoring it",
+						self.index_path,
+						index.get("model"),
+						self.model_name,
+					)
+					self._entries, self._matrix, self._dim, self._matrix_file = {}, None, None, None
+					self._journal_file, self._next_row = None, 0
+				else:
+					self._matrix = np.load(self._path(index["matrix_file"]), mmap_mode="r")
+					self._entries = index.get("entries") or {}
+					self._dim = int(index.get("dim") or self._matrix.shape[1])
+					self._matrix_file = index["matrix_file"]
+					# Stores written before the journal existed are full and contiguous.
+					self._journal_file = index.get("journal_file")
+					self._next_row = int(index.get("rows", self._matrix.shape[0]))
+				self._journal_offset = 0
+				self._changes = []
+				self._index_mtime = mtime
+				self._read_journal()
+			except Exception as error:
+				logger.error("Failed to load embedding store %s: %s", self.index_path, error)
+
+	def _read_journal(self) -> None:
+		if not self._journal_file:
+			return
+		try:
+			with open(self._path(self._journal_file), "rb") as journal:
+				journal.seek(self._journal_offset)
+				data = journal.read()
+		except OSError:
+			return
+		# A line still being written by another process is left for next time.
+		complete = data.rfind(b"\n") + 1
+		for line in data[:complete].splitlines():
+			if line.strip():
+				self._apply_change(json.loads(line))
+		self._journal_offset += complete
+
+	def _apply_change(self, record: Dict[str, Any]) -> None:
+		entry_id = record["id"]
+		if record.get("removed"):
+			self._entries.pop(entry_id, None)
+			self._changes.append((entry_id, None, None))
+			return
+		entry = {**(record.get("meta") or {}), "row": int(record["row"]), "hash": record["hash"]}
+		self._entries[entry_id] = entry
+		self._next_row = max(self._next_row, entry["row"] + 1)
+		self._changes.append((entry_id, entry["row"], entry))
+
+	# ── reads ─────────────────────────────────────────────────────────────────
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, entry_id: str) -> bool:
+		return entry_id in self._entries
+
+	@property
+	def dim(self) -> Optional[int]:
+		return self._dim
+
+	@property
+	def generation(self) -> Optional[str]:
+		"""Name of the current matrix file; changes when the store is compacted."""
+		return self._matrix_file
+
+	def ids(self) -> List[str]:
+		with self._lock:
+			return list(self._entries)
+
+	def entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
+		with self._lock:
+			entry = self._entries.get(entry_id)
+			return dict(entry) if entry else None
+
+	def needs_update(self, entry_id: str, text: str) -> bool:
+		entry = self._entries.get(entry_id)
+		return entry is None or entry.get("hash") != cache_key(self.model_name, text)
+
+	def get_many(self, entry_ids: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+		"""Return (float32 rows for the ids that exist, ids that are missing)."""
+		self.reload_if_changed()
+		with self._lock:
+			rows: List[int] = []
+			missing: List[str] = []
+			for entry_id in entry_ids:
+				entry = self._entries.get(entry_id)
+				if entry is None or self._matrix is None:
+					missing.append(entry_id)
+				else:
+					rows.append(int(entry["row"]))
+			if not rows:
+				return np.zeros((0, self._dim or 0), dtype=np.float32), missing
+			return np.asarray(self._matrix[rows], dtype=np.float32), missing
+
+	def snapshot(self) -> Tuple[Optional[str], int, List[str], np.ndarray, np.ndarray]:
+		"""(generation, change count, live ids in row order, their rows, the read-only mmap'd matrix).
+
+		Matrix rows that are not listed are free or dead (superseded or removed).
+		"""
+		self.reload_if_changed()
+		with self._lock:
+			if self._matrix is None:
+				return None, 0, [], np.zeros(0, dtype=np.int64), np.zeros((0, self._dim or 0), dtype=np.float32)
+			ordered = sorted(self._entries.items(), key=lambda item: int(item[1]["row"]))
+			rows = np.fromiter((int(entry["row"]) for _, entry in ordered), dtype=np.int64, count=len(ordered))
+			return self._matrix_file, len(self._changes), [entry_id for entry_id, _ in ordered], rows, self._matrix
+
+	def changes_since(self, generation: Optional[str], count: int) -> Optional[Tuple[List[Change], np.ndarray]]:
+		"""Changes after the first `count` of `generation`, plus the matrix; None once compacted since."""
+		self.reload_if_changed()
+		with self._lock:
+			if generation is None or generation != self._matrix_file:
+				return None
+			return self._changes[count:], self._matrix
+
+	# ── writes ────────────────────────────────────────────────────────────────
+	def apply(
+		self,
+		upserts: Optional[Dict[str, Tuple[str, np.ndarray, Dict[str, Any]]]] = None,
+		removals: Iterable[str] = (),
+	) -> bool:
+		"""Upsert {id: (text, vector, meta)} and drop `removals`, then persist.
+
+		Returns False when nothing changed (no file is written).
+		"""
+		upserts = upserts or {}
+		removals = [entry_id for entry_id in removals if entry_id not in upserts]
+		if not upserts and not removals:
+			return False
+
+		with self._lock, self._file_lock():
+			# Another process may have written since our last look: build on its state.
+			self.reload_if_changed()
+			removals = [entry_id for entry_id in removals if entry_id in self._entries]
+			if not upserts and not removals:
+				return False
+
+			dim = self._dim
+			for _, vector, _ in upserts.values():
+				dim = int(np.asarray(vector).shape[-1])
+				break
+			if dim is None:
+				return False
+
+			live = len(self._entries) - len(removals) + sum(1 for entry_id in upserts if entry_id not in self._entries)
+			dead = self._next_row + len(upserts) - live
+			if (
+				self._matrix is not None
+				and self._journal_file
+				and dim == self._dim
+				and self._next_row + len(upserts) <= self._matrix.shape[0]
+				and dead <= max(MIN_CAPACITY, live // 2)
+			):
+				self._append(upserts, removals, dim)
+			else:
+				self._compact(upserts, removals, dim)
+			return True
+
+	@contextmanager
+	def _file_lock(self) -> Iterator[None]:
+		directory = os.path.dirname(self.lock_path) or "."
+		os.makedirs(directory, exist_ok=True)
+		with open(self.lock_path, "a") as lock_file:
+			if fcntl is not None:
+				fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+			try:
+				yield
+			finally:
+				if fcntl is not None:
+					fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+	def _append(self, upserts: Dict[str, Tuple[str, np.ndarray, Dict[str, Any]]], removals: List[str], dim: int) -> None:
+		# Called with the file lock held. Vectors land before the journal lines
+		# that point at them, so a reader never sees a row that is not written.
+		start = self._next_row
+		if upserts:
+			writable = np.load(self._path(self._matrix_file), mmap_mode="r+")
+			for offset, (_, vector, _) in enumerate(upserts.values()):
+				writable[start + offset] = np.asarray(vector, dtype=np.float32).reshape(dim)
+			writable.flush()
+			del writable
+
+		records = [{"id": entry_id, "removed": True} for entry_id in removals]
+		for offset, (entry_id, (text, _, meta)) in enumerate(upserts.items()):
+			records.append({"id": entry_id, "row": start + offset, "hash": cache_key(self.model_name, text), "meta": meta or {}})
+		payload = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+
+		with open(self._path(self._journal_file), "r+b") as journal:
+			# Drop the tail of a write that died half way through a line.
+			journal.truncate(self._journal_offset)
+			journal.seek(self._journal_offset)
+			journal.write(payload)
+		for record in records:
+			self._apply_change(record)
+		self._journal_offset += len(payload)
+
+	def _compact(self, upserts: Dict[str, Tuple[str, np.ndarray, Dict[str, Any]]], removals: List[str], dim: int) -> None:
+		# Called with the file lock held.
+		removed = set(removals)
+		_, _, kept_ids, kept_rows, old_matrix = self.snapshot()
+		keep = [(entry_id, row) for entry_id, row in zip(kept_ids, kept_rows.tolist()) if entry_id not in upserts and entry_id not in removed]
+		live = len(keep) + len(upserts)
+
+		directory = os.path.dirname(self.index_path) or "."
+		os.makedirs(directory, exist_ok=True)
+		base = os.path.basename(self.path_prefix)
+		generation = uuid.uuid4().hex[:12]
+		matrix_file = f"{base}.{generation}.npy"
+		journal_file = f"{base}.{generation}.jsonl"
+		# Room to double before the next compaction, so appends stay amortised O(1).
+		matrix = np.lib.format.open_memmap(
+			self._path(matrix_file), mode="w+", dtype=self.dtype, shape=(max(MIN_CAPACITY, 2 * live), dim)
+		)
+		entries: Dict[str, Dict[str, Any]] = {}
+		for row, (entry_id, old_row) in enumerate(keep):
+			matrix[row] = old_matrix[old_row]
+			entries[entry_id] = {**self._entries[entry_id], "row": row}
+		for offset, (entry_id, (text, vector, meta)) in enumerate(upserts.items()):
+			row = len(keep) + offset
+			matrix[row] = np.asarray(vector, dtype=np.float32).reshape(dim)
+			entries[entry_id] = {**(meta or {}), "row": row, "hash": cache_key(self.model_name, text)}
+		matrix.flush()
+		del matrix
+		open(self._path(journal_file), "wb").close()
+
+		index = {
+			"model": self.model_name,
+			"dim": dim,
+			"dtype": self.dtype,
+			"matrix_file": matrix_file,
+			"journal_file": journal_file,
+			"rows": live,
+			"updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+			"entries": entries,
+		}
+		tmp_index = f"{self.index_path}.{os.getpid()}.tmp"
+		with open(tmp_index, "w", encoding="utf-8") as index_file:
+			json.dump(index, index_file)
+		os.replace(tmp_index, self.index_path)
+
+		# Only the generation this compaction replaced is unlinked; processes
+		# that still map it keep a valid view until they reload.
+		for name in (self._matrix_file, self._journal_file):
+			if name and name not in (matrix_file, journal_file):
+				try:
+					os.remove(self._path(name))
+				except OSError:
+					pass
+
+		self._index_mtime = None
+		self.reload_if_changed()
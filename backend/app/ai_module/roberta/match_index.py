@@ -0,0 +1,293 @@
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import ai_config
+
+from .embedding_store import EmbeddingStore
+from .question_embeddings import refresh_store
+
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix product, so exact search over a large mmap'd
+# float16 store never materialises the whole matrix as float32.
+SEARCH_CHUNK_ROWS = 8192
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 40
+
+
+def job_reference_texts(jobs: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+	"""Map job rows to {id: {"text", "meta"}}: title, category, requirements, description."""
+	references: Dict[str, Dict[str, Any]] = {}
+	for job in jobs:
+		job_id = job.get("id")
+		requirements = job.get("requirements") if isinstance(job.get("requirements"), list) else []
+		parts = [job.get("title"), job.get("category"), ", ".join(str(r) for r in requirements if r), job.get("description")]
+		text = ". ".join(str(part).strip() for part in parts if part and str(part).strip())
+		if not job_id or not text:
+			continue
+		references[str(job_id)] = {
+			"text": text,
+			"meta": {
+				"kind": "job",
+				"status": job.get("status") or "active",
+				"employer_id": job.get("employer_id"),
+			},
+		}
+	return references
+
+
+def resume_reference_texts(resumes: Iterable[Dict[str, Any]], max_chars: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+	"""Map parsed resume rows to {id: {"text", "meta"}}: skills first, then the opening resume text."""
+	max_chars = max_chars or ai_config.MATCH_RESUME_MAX_CHARS
+	references: Dict[str, Dict[str, Any]] = {}
+	for resume in resumes:
+		resume_id = resume.get("id")
+		body = " ".join(str(resume.get("resume_text") or "").split())[:max_chars].rstrip()
+		skills = resume.get("skills") if isinstance(resume.get("skills"), list) else []
+		text = f"Skills: {', '.join(str(s) for s in skills)}. {body}" if skills else body
+		if not resume_id or not body:
+			continue
+		references[str(resume_id)] = {
+			"text": text,
+			"meta": {"kind": "resume", "user_id": resume.get("user_id")},
+		}
+	return references
+
+
+class VectorIndex:
+	"""Top-k cosine search over an EmbeddingStore.
+
+	Exact search scores every live row in chunks straight off the
+	memory-mapped matrix. Once the store holds `ivf_min_rows` rows an
+	inverted-file index (spherical k-means, ~sqrt(n) lists) is used instead
+	and only the `nprobe` closest lists are scored. Rows appended to the store
+	are picked up from its journal: only their norms, metadata and list
+	assignments are computed, and superseded rows are masked out. Everything
+	is rebuilt only when the store compacts into a new generation, and
+	centroids are re-trained only when the store has doubled in size.
+	"""
+
+	def __init__(self, store: EmbeddingStore, ivf_min_rows: Optional[int] = None, nprobe: Optional[int] = None):
+		self.store = store
+		self.ivf_min_rows = ai_config.MATCH_IVF_MIN_ROWS if ivf_min_rows is None else ivf_min_rows
+		self.nprobe = nprobe or ai_config.MATCH_IVF_NPROBE
+		self._lock = threading.RLock()
+		self._generation: Optional[str] = None
+		self._seen_changes = 0
+		self._matrix: Optional[np.ndarray] = None
+		# Indexed by physical matrix row; rows not in `_alive` are free or dead.
+		self._ids: List[Optional[str]] = []
+		self._meta: List[Dict[str, Any]] = []
+		self._alive = np.zeros(0, dtype=bool)
+		self._inv_norms = np.zeros(0, dtype=np.float32)
+		self._rows: Dict[str, int] = {}
+		self._columns: Dict[str, np.ndarray] = {}
+		self._centroids: Optional[np.ndarray] = None
+		self._trained_rows = 0
+		self._list_rows: List[np.ndarray] = []
+
+	# ── loading ───────────────────────────────────────────────────────────────
+	def _refresh(self) -> None:
+		update = self.store.changes_since(self._generation, self._seen_changes)
+		if update is None:
+			self._rebuild()
+		elif update[0]:
+			self._apply_changes(update[0])
+
+	def _rebuild(self) -> None:
+		generation, seen, ids, rows, matrix = self.store.snapshot()
+		capacity = len(matrix)
+		self._generation, self._seen_changes, self._matrix = generation, seen, matrix
+		self._ids = [None] * capacity
+		self._meta = [{} for _ in range(capacity)]
+		self._alive = np.zeros(capacity, dtype=bool)
+		self._inv_norms = np.zeros(capacity, dtype=np.float32)
+		self._rows = {}
+		self._columns = {}
+		self._add_rows(ids, rows)
+
+		self._centroids, self._list_rows, self._trained_rows = None, [], 0
+		self._update_lists(rows)
+
+	def _apply_changes(self, changes: List[Tuple[str, Optional[int], Optional[Dict[str, Any]]]]) -> None:
+		self._seen_changes += len(changes)
+		added: Dict[str, int] = {}
+		for entry_id, row, _ in changes:
+			old = self._rows.pop(entry_id, None)
+			if old is not None:
+				self._alive[old] = False
+			added.pop(entry_id, None)
+			if row is not None:
+				added[entry_id] = row
+				self._rows[entry_id] = row
+		rows = np.fromiter(added.values(), dtype=np.int64, count=len(added))
+		self._add_rows(list(added), rows)
+		self._update_lists(rows)
+
+	def _add_rows(self, ids: List[str], rows: np.ndarray) -> None:
+		for start in range(0, len(rows), SEARCH_CHUNK_ROWS):
+			chunk = rows[start:start + SEARCH_CHUNK_ROWS]
+			norms = np.linalg.norm(np.asarray(self._matrix[chunk], dtype=np.float32), axis=1)
+			self._inv_norms[chunk] = 1.0 / np.maximum(norms, 1e-12)
+		for entry_id, row in zip(ids, rows.tolist()):
+			meta = self.store.entry(entry_id) or {}
+			self._ids[row], self._meta[row] = entry_id, meta
+			self._rows[entry_id] = row
+			for key, column in self._columns.items():
+				column[row] = meta.get(key)
+		self._alive[rows] = True
+
+	def _update_lists(self, new_rows: np.ndarray) -> None:
+		live = len(self._rows)
+		if not self.ivf_min_rows or live < self.ivf_min_rows:
+			self._centroids, self._list_rows, self._trained_rows = None, [], 0
+		elif self._centroids is None or live >= 2 * self._trained_rows:
+			self._train(np.flatnonzero(self._alive))
+			self._list_rows = self._assign(np.flatnonzero(self._alive))
+		elif len(new_rows):
+			# Dead rows stay in their lists until the next rebuild; `_alive` masks them.
+			fresh = self._assign(new_rows)
+			self._list_rows = [np.concatenate([current, extra]) for current, extra in zip(self._list_rows, fresh)]
+
+	def _unit_rows(self, rows: np.ndarray) -> np.ndarray:
+		return np.asarray(self._matrix[rows], dtype=np.float32) * self._inv_norms[rows, None]
+
+	def _train(self, live_rows: np.ndarray) -> None:
+		n = len(live_rows)
+		lists = max(1, int(np.sqrt(n)))
+		rng = np.random.default_rng(0)
+		sample = np.sort(rng.choice(live_rows, size=min(n, lists * KMEANS_SAMPLE_PER_LIST), replace=False))
+		vectors = self._unit_rows(sample)
+		centroids = vectors[rng.choice(len(vectors), size=lists, replace=False)]
+		for _ in range(KMEANS_ITERATIONS):
+			assignment = np.argmax(vectors @ centroids.T, axis=1)
+			sums = np.zeros_like(centroids)
+			np.add.at(sums, assignment, vectors)
+			empty = ~sums.any(axis=1)
+			sums[empty] = centroids[empty]
+			centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+		self._centroids = centroids.astype(np.float32)
+		self._trained_rows = n
+		logger.info("Trained IVF index for %s: %s lists over %s rows", self.store.index_path, lists, n)
+
+	def _assign(self, rows: np.ndarray) -> List[np.ndarray]:
+		assignment = np.empty(len(rows), dtype=np.int64)
+		for start in range(0, len(rows), SEARCH_CHUNK_ROWS):
+			chunk = rows[start:start + SEARCH_CHUNK_ROWS]
+			assignment[start:start + len(chunk)] = np.argmax(self._unit_rows(chunk) @ self._centroids.T, axis=1)
+		order = np.argsort(assignment, kind="stable")
+		bounds = np.searchsorted(assignment[order], np.arange(len(self._centroids) + 1))
+		return [rows[order[bounds[i]:bounds[i + 1]]] for i in range(len(self._centroids))]
+
+	# ── queries ───────────────────────────────────────────────────────────────
+	def __len__(self) -> int:
+		return len(self.store)
+
+	def vector(self, entry_id: str) -> Optional[np.ndarray]:
+		vectors, missing = self.store.get_many([entry_id])
+		return None if missing else vectors[0]
+
+	def _score(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+		return (np.asarray(self._matrix[rows], dtype=np.float32) @ query) * self._inv_norms[rows]
+
+	def _column(self, key: str) -> np.ndarray:
+		column = self._columns.get(key)
+		if column is None:
+			column = self._columns[key] = np.array([meta.get(key) for meta in self._meta], dtype=object)
+		return column
+
+	def search(
+		self,
+		vector: np.ndarray,
+		k: int = 10,
+		where: Optional[Dict[str, Any]] = None,
+		exclude: Iterable[str] = (),
+	) -> List[Tuple[str, float, Dict[str, Any]]]:
+		"""Return up to k (id, cosine, meta) rows, best first, whose metadata equals `where` and not in `exclude`."""
+		query = np.asarray(vector, dtype=np.float32).reshape(-1)
+		query = query / max(float(np.linalg.norm(query)), 1e-12)
+		with self._lock:
+			self._refresh()
+			if not self._rows or k <= 0:
+				return []
+			mask = self._alive.copy()
+			for key, value in (where or {}).items():
+				mask &= self._column(key) == value
+			for entry_id in exclude:
+				row = self._rows.get(entry_id)
+				if row is not None:
+					mask[row] = False
+
+			hits: List[Tuple[str, float, Dict[str, Any]]] = []
+			if self._centroids is not None:
+				probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+				rows = np.sort(np.concatenate([self._list_rows[p] for p in probes]))
+				hits = self._top(rows[mask[rows]], query, k)
+			if len(hits) < k:
+				# Exact search: small stores, or too few allowed rows in the probed lists.
+				hits = self._top(np.flatnonzero(mask), query, k)
+			return hits
+
+	def _top(self, rows: np.ndarray, query: np.ndarray, k: int) -> List[Tuple[str, float, Dict[str, Any]]]:
+		if not len(rows):
+			return []
+		scores = np.concatenate([
+			self._score(rows[start:start + SEARCH_CHUNK_ROWS], query) for start in range(0, len(rows), SEARCH_CHUNK_ROWS)
+		])
+		k = min(k, len(rows))
+		best = np.argpartition(-scores, k - 1)[:k]
+		best = best[np.argsort(-scores[best], kind="stable")]
+		return [(self._ids[rows[i]], float(scores[i]), self._meta[rows[i]]) for i in best]
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			self._refresh()
+			return {
+				"rows": len(self._rows),
+				"dim": self.store.dim,
+				"mode": "ivf" if self._centroids is not None else "exact",
+				"lists": len(self._list_rows),
+			}
+
+
+_indexes: Dict[str, VectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _get_index(kind: str, path: str) -> VectorIndex:
+	if kind not in _indexes:
+		with _indexes_lock:
+			if kind not in _indexes:
+				_indexes[kind] = VectorIndex(
+					EmbeddingStore(path, ai_config.EMBED_MODEL_NAME, dtype=ai_config.MATCH_EMBEDDINGS_DTYPE)
+				)
+	return _indexes[kind]
+
+
+def get_job_index() -> VectorIndex:
+	"""Process-wide index of job posting embeddings."""
+	return _get_index("jobs", ai_config.JOB_EMBEDDINGS_PATH)
+
+
+def get_resume_index() -> VectorIndex:
+	"""Process-wide index of parsed resume embeddings."""
+	return _get_index("resumes", ai_config.RESUME_EMBEDDINGS_PATH)
+
+
+def refresh_job_rows(jobs: List[Dict[str, Any]], removals: Iterable[str] = ()) -> Dict[str, int]:
+	"""Embed new/changed job postings (called after job writes)."""
+	# Imported lazily: the embedding model lives with the HF proxy blueprint.
+	from app.api.hf_proxy import embed_texts
+
+	return refresh_store(get_job_index().store, job_reference_texts(jobs), embed_texts, removals=removals)
+
+
+def refresh_resume_rows(resumes: List[Dict[str, Any]], removals: Iterable[str] = ()) -> Dict[str, int]:
+	"""Embed new/changed parsed resumes (called when a resume is parsed or saved)."""
+	from app.api.hf_proxy import embed_texts
+
+	return refresh_store(get_resume_index().store, resume_reference_texts(resumes), embed_texts, removals=removals)
@@ -0,0 +1,249 @@
+import logging
+import os
+import re
+import shutil
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import ai_config
+
+
+logger = logging.getLogger(__name__)
+
+_ENCODER_FILE = "model.onnx"
+_QUANTIZED_FILE = "model.int8.onnx"
+_OPSET = 14
+
+
+def model_dir(model_name: str, root: Optional[str] = None) -> str:
+	"""Directory holding the exported graph, tokenizer and config of one model."""
+	slug = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+	return os.path.join(root or ai_config.ONNX_MODELS_DIR, slug)
+
+
+def graph_path(directory: str, quantized: bool) -> str:
+	return os.path.join(directory, _QUANTIZED_FILE if quantized else _ENCODER_FILE)
+
+
+# ── export ──────────────────────────────────────────────────────────────────
+def _export(torch_model, tokenizer, directory: str, output_name: str) -> str:
+	import torch
+
+	os.makedirs(directory, exist_ok=True)
+	sample = tokenizer(["an example sentence", "a second one"], padding=True, return_tensors="pt")
+	input_names = [name for name in ("input_ids", "attention_mask") if name in sample]
+	dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+	dynamic_axes[output_name] = {0: "batch"} if output_name == "logits" else {0: "batch", 1: "sequence"}
+
+	path = graph_path(directory, quantized=False)
+	tmp_path = path + ".tmp"
+	torch_model.eval()
+	with torch.inference_mode():
+		torch.onnx.export(
+			torch_model,
+			tuple(sample[name] for name in input_names),
+			tmp_path,
+			input_names=input_names,
+			output_names=[output_name],
+			dynamic_axes=dynamic_axes,
+			opset_version=_OPSET,
+			do_constant_folding=True,
+		)
+	os.replace(tmp_path, path)
+	tokenizer.save_pretrained(directory)
+	torch_model.config.save_pretrained(directory)
+	return path
+
+
+def export_sentence_encoder(model_name: str, directory: str) -> str:
+	"""Export the transformer of a sentence-transformers model (pooling is done in numpy)."""
+	import torch
+	from transformers import AutoModel, AutoTokenizer
+
+	tokenizer = AutoTokenizer.from_pretrained(model_name)
+	model = AutoModel.from_pretrained(model_name, torch_dtype=torch.float32, low_cpu_mem_usage=False)
+
+	class _LastHidden(torch.nn.Module):
+		def __init__(self, inner):
+			super().__init__()
+			self.inner = inner
+			self.config = inner.config
+
+		def forward(self, input_ids, attention_mask):
+			return self.inner(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+	return _export(_LastHidden(model), tokenizer, directory, "last_hidden_state")
+
+
+def export_sequence_classifier(model_name: str, directory: str) -> str:
+	"""Export an NLI cross-encoder that maps (premise, hypothesis) to logits."""
+	import torch
+	from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+	tokenizer = AutoTokenizer.from_pretrained(model_name)
+	model = AutoModelForSequenceClassification.from_pretrained(
+		model_name,
+		torch_dtype=torch.float32,
+		low_cpu_mem_usage=False,
+	)
+
+	class _Logits(torch.nn.Module):
+		def __init__(self, inner):
+			super().__init__()
+			self.inner = inner
+			self.config = inner.config
+
+		def forward(self, input_ids, attention_mask):
+			return self.inner(input_ids=input_ids, attention_mask=attention_mask).logits
+
+	return _export(_Logits(model), tokenizer, directory, "logits")
+
+
+def quantize_int8(directory: str) -> str:
+	"""Dynamic (weight-only) int8 quantization of an exported graph."""
+	from onnxruntime.quantization import QuantType, quantize_dynamic
+
+	source = graph_path(directory, quantized=False)
+	target = graph_path(directory, quantized=True)
+	tmp_target = target + ".tmp"
+	quantize_dynamic(source, tmp_target, weight_type=QuantType.QInt8)
+	os.replace(tmp_target, target)
+	return target
+
+
+def ensure_exported(model_name: str, kind: str, quantized: bool, export_missing: bool = True) -> str:
+	"""Return the graph path for `model_name`, exporting/quantizing it if needed."""
+	directory = model_dir(model_name)
+	path = graph_path(directory, quantized)
+	if os.path.exists(path):
+		return path
+	if not export_missing:
+		raise FileNotFoundError(f"No ONNX export at {path} (run export_onnx_models.py)")
+
+	if not os.path.exists(graph_path(directory, quantized=False)):
+		logger.info("Exporting %s to ONNX in %s", model_name, directory)
+		try:
+			if kind == "encoder":
+				export_sentence_encoder(model_name, directory)
+			else:
+				export_sequence_classifier(model_name, directory)
+		except Exception:
+			shutil.rmtree(directory, ignore_errors=True)
+			raise
+	if quantized:
+		logger.info("Quantizing %s to int8", model_name)
+		quantize_int8(directory)
+	return path
+
+
+# ── runtime ─────────────────────────────────────────────────────────────────
+def make_session(path: str, intra_op_threads: int = 0):
+	import onnxruntime as ort
+
+	options = ort.SessionOptions()
+	options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+	options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+	options.inter_op_num_threads = 1
+	if intra_op_threads > 0:
+		options.intra_op_num_threads = intra_op_threads
+	return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def session_forward(session) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+	"""numpy-in / first-output-out callable, feeding only the inputs the graph declares."""
+	input_names = [node.name for node in session.get_inputs()]
+
+	def forward(encoded: Dict[str, np.ndarray]) -> np.ndarray:
+		feed = {name: np.asarray(encoded[name], dtype=np.int64) for name in input_names}
+		return session.run(None, feed)[0]
+
+	return forward
+
+
+class OnnxSentenceEncoder:
+	"""Drop-in for SentenceTransformer.encode(): transformer in ONNX, mean pooling in numpy.
+
+	all-roberta-large-v1 is Transformer -> mean Pooling -> Normalize, so the
+	output is L2-normalized by default to match the PyTorch model.
+	"""
+
+	def __init__(self, directory: str, path: str, intra_op_threads: int = 0, max_seq_length: int = 128, normalize: bool = True):
+		from transformers import AutoTokenizer
+
+		self.tokenizer = AutoTokenizer.from_pretrained(directory)
+		self.session = make_session(path, intra_op_threads)
+		self.forward = session_forward(self.session)
+		self.max_seq_length = max_seq_length
+		self.normalize = normalize
+		self.path = path
+
+	def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+		single = isinstance(sentences, str)
+		texts: List[str] = [sentences] if single else list(sentences)
+		if not texts:
+			return np.zeros((0, 0), dtype=np.float32)
+
+		order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+		embeddings: Optional[np.ndarray] = None
+		for start in range(0, len(order), max(1, batch_size)):
+			chunk = order[start:start + batch_size]
+			encoded = self.tokenizer(
+				[texts[i] for i in chunk],
+				padding=True,
+				truncation=True,
+				max_length=self.max_seq_length,
+				return_tensors="np",
+			)
+			hidden = self.forward(dict(encoded))
+			mask = encoded["attention_mask"][..., None].astype(np.float32)
+			pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+			if self.normalize:
+				pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+			if embeddings is None:
+				embeddings = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+			embeddings[chunk] = pooled
+		return embeddings[0] if single else embeddings
+
+
+def load_sentence_encoder(model_name: str, quantized: Optional[bool] = None) -> OnnxSentenceEncoder:
+	quantized = ai_config.ONNX_QUANTIZE if quantized is None else quantized
+	path = ensure_exported(model_name, "encoder", quantized, export_missing=ai_config.ONNX_EXPORT_ON_DEMAND)
+	return OnnxSentenceEncoder(model_dir(model_name), path, intra_op_threads=ai_config.ONNX_INTRA_OP_THREADS)
+
+
+def load_zero_shot_classifier(model_name: str, quantized: Optional[bool] = None, **kwargs):
+	from transformers import AutoConfig, AutoTokenizer
+
+	from app.ai_module.zero_shot.classifier import ZeroShotClassifier
+
+	quantized = ai_config.ONNX_QUANTIZE if quantized is None else quantized
+	path = ensure_exported(model_name, "classifier", quantized, export_missing=ai_config.ONNX_EXPORT_ON_DEMAND)
+	directory = model_dir(model_name)
+	tokenizer = AutoTokenizer.from_pretrained(directory)
+	config = AutoConfig.from_pretrained(directory)
+	session = make_session(path, ai_config.ONNX_INTRA_OP_THREADS)
+	return ZeroShotClassifier(tokenizer, session_forward(session), config.label2id, **kwargs)
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+	"""Row-wise cosine between two embedding matrices of the same texts."""
+	reference = np.asarray(reference, dtype=np.float32)
+	candidate = np.asarray(candidate, dtype=np.float32)
+	dots = (reference * candidate).sum(axis=1)
+	norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+	return dots / np.maximum(norms, 1e-12)
+
+
+def sample_texts(extra: Sequence[str] = ()) -> List[str]:
+	"""Verification sentences: interview-style answers plus anything passed in."""
+	return [
+		"I led a team of four students to rebuild our org's registration system before enrollment week.",
+		"When our client changed requirements two days before the deadline, I split the work and we shipped on time.",
+		"I am a hardworking person who always gives my best.",
+		"Tell me about a time you handled a conflict with a teammate.",
+		"Sales rose by 18 percent after we redesigned the onboarding emails.",
+		"I learned that asking for help early saves the whole team time.",
+		"ok",
+		*extra,
+	]
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.config import ai_config
+
+from .embedding_store import EmbeddingStore
+
+
+logger = logging.getLogger(__name__)
+
+_backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+IDEAL_ANSWERS_FILE = os.path.join(_backend_dir, "data", "ideal_answers", "ideal_answers.json")
+QUESTIONS_FILE = os.path.join(_backend_dir, "data", "questions", "questions.json")
+
+IDEAL_ANSWER_PREFIX = "ideal:"
+
+_store: Optional[EmbeddingStore] = None
+_store_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def get_question_store() -> EmbeddingStore:
+	"""Process-wide store of question-bank and ideal-answer embeddings."""
+	global _store
+	if _store is None:
+		with _store_lock:
+			if _store is None:
+				_store = EmbeddingStore(
+					ai_config.QUESTION_EMBEDDINGS_PATH,
+					ai_config.EMBED_MODEL_NAME,
+					dtype=ai_config.QUESTION_EMBEDDINGS_DTYPE,
+				)
+	return _store
+
+
+def question_reference_texts(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+	"""Map interview_question_bank rows to {id: {"text", "meta"}} (active rows only)."""
+	references: Dict[str, Dict[str, Any]] = {}
+	for row in rows:
+		question_id = row.get("id")
+		text = (row.get("question_text") or "").strip()
+		if not question_id or not text or row.get("is_active") is False:
+			continue
+		references[str(question_id)] = {
+			"text": text,
+			"meta": {
+				"kind": "question",
+				"category": row.get("category"),
+				"quality": row.get("quality"),
+			},
+		}
+	return references
+
+
+def ideal_answer_reference_texts(
+	ideal_answers_file: str = IDEAL_ANSWERS_FILE,
+	questions_file: str = QUESTIONS_FILE,
+) -> Dict[str, Dict[str, Any]]:
+	"""Ideal answers from data/ideal_answers, keyed "ideal:<question key>".
+
+	The reference text mirrors the frontend evaluator: question text followed by
+	the answer (or its key points when no full answer is recorded).
+	"""
+	try:
+		with open(ideal_answers_file, "r", encoding="utf-8") as answers_file:
+			ideal_answers = json.load(answers_file)
+	except Exception as error:
+		logger.warning("Could not read ideal answers from %s: %s", ideal_answers_file, error)
+		return {}
+
+	questions: Dict[str, str] = {}
+	try:
+		with open(questions_file, "r", encoding="utf-8") as question_file:
+			for question in json.load(question_file):
+				questions[str(question.get("id"))] = question.get("text") or ""
+	except Exception:
+		pass
+
+	references: Dict[str, Dict[str, Any]] = {}
+	for key, answer in (ideal_answers or {}).items():
+		answer_text = (answer.get("answer") or ". ".join(answer.get("key_points") or [])).strip()
+		if not answer_text:
+			continue
+		text = f"{questions.get(str(key), '')} {answer_text}".strip()
+		references[f"{IDEAL_ANSWER_PREFIX}{key}"] = {
+			"text": text,
+			"meta": {"kind": "ideal_answer", "question_key": str(key)},
+		}
+	return references
+
+
+def refresh_store(
+	store: EmbeddingStore,
+	references: Dict[str, Dict[str, Any]],
+	embed_fn: Callable[[List[str]], np.ndarray],
+	removals: Iterable[str] = (),
+	batch_size: int = 64,
+) -> Dict[str, int]:
+	"""Embed only new/changed references and persist them alongside `removals`."""
+	with _refresh_lock:
+		changed = [entry_id for entry_id, ref in references.items() if store.needs_update(entry_id, ref["text"])]
+		upserts = {}
+		for start in range(0, len(changed), batch_size):
+			chunk = changed[start:start + batch_size]
+			vectors = embed_fn([references[entry_id]["text"] for entry_id in chunk])
+			for entry_id, vector in zip(chunk, vectors):
+				ref = references[entry_id]
+				upserts[entry_id] = (ref["text"], vector, ref["meta"])
+
+		# Same text but new metadata (e.g. a quality rating): keep the stored vector.
+		for entry_id, ref in references.items():
+			entry = store.entry(entry_id)
+			if entry_id in upserts or entry is None:
+				continue
+			if any(entry.get(key) != value for key, value in ref["meta"].items()):
+				vectors, _ = store.get_many([entry_id])
+				upserts[entry_id] = (ref["text"], vectors[0], ref["meta"])
+
+		removal_ids = [entry_id for entry_id in removals if entry_id in store and entry_id not in references]
+		store.apply(upserts, removal_ids)
+		return {
+			"embedded": len(changed),
+			"unchanged": len(references) - len(changed),
+			"removed": len(removal_ids),
+			"total": len(store),
+		}
+
+
+def refresh_question_rows(rows: List[Dict[str, Any]], requested_ids: Iterable[str]) -> Dict[str, int]:
+	"""Incremental refresh for a few bank rows (called after an add or a rating).
+
+	Ids that were requested but came back missing or inactive are dropped.
+	"""
+	# Imported lazily: the embedding model lives with the HF proxy blueprint.
+	from app.api.hf_proxy import embed_texts
+
+	references = question_reference_texts(rows)
+	removals = [str(question_id) for question_id in requested_ids if str(question_id) not in references]
+	return refresh_store(get_question_store(), references, embed_texts, removals=removals)
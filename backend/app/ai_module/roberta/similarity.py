@@ -0,0 +1,20 @@
+import numpy as np
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+	"""L2-normalize each row (zero rows stay zero)."""
+	matrix = np.asarray(matrix, dtype=np.float32)
+	if matrix.ndim == 1:
+		matrix = matrix.reshape(1, -1)
+	norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+	return matrix / np.maximum(norms, 1e-12)
+
+
+def cosine_matrix(queries: np.ndarray, references: np.ndarray) -> np.ndarray:
+	"""Cosine similarity of every query row against every reference row: (q, r)."""
+	return normalize_rows(queries) @ normalize_rows(references).T
+
+
+def to_unit_interval(scores: np.ndarray) -> np.ndarray:
+	"""Clamp cosine scores to [0, 1] — same contract as the frontend cosineSimilarity()."""
+	return np.clip(scores, 0.0, 1.0)
@@ -0,0 +1,191 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import requests
+
+from app.config import ai_config
+
+from .model_registry import get_model_registry
+
+
+logger = logging.getLogger(__name__)
+
+_WARMUP_SENTENCES = [
+	"Warm-up.",
+	"I coordinated a small team to finish our capstone project two weeks early by splitting the backend work "
+	"and reviewing each other's code daily, which taught me to communicate blockers sooner.",
+]
+_WARMUP_LABELS = ["describes a specific event", "mentions a general background", "no context mentioned"]
+
+
+class SkipWarmup(Exception):
+	"""Raised by a warm-up task whose model is not used in this deployment."""
+
+
+class WarmupTask:
+	def __init__(self, name: str, run: Callable[[], Any], required: bool):
+		self.name = name
+		self.run = run
+		self.required = required
+		self.state = "pending"  # pending | warming | ready | skipped | failed
+		self.detail: Optional[str] = None
+		self.started_at: Optional[float] = None
+		self.seconds: Optional[float] = None
+
+
+class WarmupManager:
+	"""Warm every configured model in parallel and report readiness.
+
+	Each task loads its model and pushes a dummy input through it so the first
+	real request does not pay for lazy initialisation (allocator growth, ONNX
+	/ MKL thread pools, Ollama loading phi3 into RAM).
+	"""
+
+	def __init__(self, tasks: Iterable[WarmupTask]):
+		self.tasks: Dict[str, WarmupTask] = {task.name: task for task in tasks}
+		self._lock = threading.Lock()
+		self._started_pid: Optional[int] = None
+
+	def start(self) -> bool:
+		"""Start all tasks on daemon threads (once per process)."""
+		with self._lock:
+			if self._started_pid == os.getpid():
+				return False
+			self._started_pid = os.getpid()
+			for task in self.tasks.values():
+				task.state = "pending"
+		for task in self.tasks.values():
+			threading.Thread(target=self._run, args=(task,), name=f"warmup-{task.name}", daemon=True).start()
+		return True
+
+	def run_all(self) -> None:
+		"""Synchronous variant (tests, CLI)."""
+		for task in self.tasks.values():
+			self._run(task)
+
+	def _run(self, task: WarmupTask) -> None:
+		task.state = "warming"
+		task.started_at = time.time()
+		started = time.perf_counter()
+		try:
+			task.detail = task.run()
+			task.state = "ready"
+		except SkipWarmup as reason:
+			task.state = "skipped"
+			task.detail = str(reason)
+		except Exception as error:
+			task.state = "failed"
+			task.detail = str(error)
+			print(f"[warmup] {task.name} failed: {error}", flush=True)
+			logger.debug(traceback.format_exc())
+		task.seconds = round(time.perf_counter() - started, 3)
+		if task.state == "ready":
+			print(f"[warmup] {task.name} ready in {task.seconds:.1f}s", flush=True)
+
+	def is_ready(self) -> bool:
+		return all(task.state in ("ready", "skipped") for task in self.tasks.values() if task.required)
+
+	def status(self) -> Dict[str, Any]:
+		return {
+			"ready": self.is_ready(),
+			"models": {
+				task.name: {
+					"state": task.state,
+					"required": task.required,
+					"seconds": task.seconds,
+					"detail": task.detail,
+				}
+				for task in self.tasks.values()
+			},
+		}
+
+
+# ── warm-up tasks ───────────────────────────────────────────────────────────
+def _require(key: str) -> Any:
+	registry = get_model_registry()
+	if not registry.is_registered(key):
+		raise SkipWarmup(f"{key} is not registered")
+	model = registry.get(key)
+	if model is None:
+		raise RuntimeError(registry.error(key) or f"{key} failed to load")
+	return model
+
+
+def warm_embed() -> str:
+	model = _require("embed")
+	model.encode(_WARMUP_SENTENCES, batch_size=len(_WARMUP_SENTENCES), convert_to_numpy=True, show_progress_bar=False)
+	return "encoded dummy batch"
+
+
+def warm_zsl() -> str:
+	classifier = _require("zsl")
+	classifier.classify_many([{"premise": text, "labels": _WARMUP_LABELS} for text in _WARMUP_SENTENCES])
+	return "classified dummy batch"
+
+
+def warm_whisper() -> str:
+	if os.getenv("WHISPER_BACKEND", "hybrid").lower() == "openai":
+		raise SkipWarmup("WHISPER_BACKEND=openai")
+	from app.ai_module.whisper.transcriber import WHISPER_MODEL_KEY, register_whisper_model
+
+	register_whisper_model()
+	model = _require(WHISPER_MODEL_KEY)
+	segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+	list(segments)  # segments are lazy; consume them to run the decoder
+	return "transcribed 1s of silence"
+
+
+def warm_ollama() -> str:
+	if os.getenv("PHI3_PROVIDER", "ollama").strip().lower() != "ollama":
+		raise SkipWarmup("PHI3_PROVIDER is not ollama")
+	base_url = os.getenv("PHI3_OLLAMA_BASE_URL", "http://127.0.0.1:11434").rstrip("/")
+	model = os.getenv("PHI3_MODEL", "phi3:mini").strip()
+	# An empty prompt makes Ollama load the model and keep it resident for keep_alive.
+	response = requests.post(
+		f"{base_url}/api/generate",
+		json={"model": model, "prompt": "", "stream": False, "keep_alive": ai_config.OLLAMA_KEEP_ALIVE},
+		timeout=ai_config.WARMUP_OLLAMA_TIMEOUT_SECONDS,
+	)
+	if response.status_code != 200:
+		raise RuntimeError(response.text or f"Ollama returned {response.status_code}")
+	return f"{model} loaded (keep_alive={ai_config.OLLAMA_KEEP_ALIVE})"
+
+
+WARMUP_TASKS: Dict[str, Callable[[], Any]] = {
+	"embed": warm_embed,
+	"zsl": warm_zsl,
+	"whisper": warm_whisper,
+	"ollama": warm_ollama,
+}
+
+
+_manager: Optional[WarmupManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_warmup_manager() -> WarmupManager:
+	global _manager
+	if _manager is None:
+		with _manager_lock:
+			if _manager is None:
+				required = set(ai_config.READY_REQUIRED_MODELS)
+				_manager = WarmupManager(
+					WarmupTask(name, WARMUP_TASKS[name], required=name in required)
+					for name in ai_config.WARMUP_MODELS
+					if name in WARMUP_TASKS
+				)
+	return _manager
+
+
+def start_warmup() -> List[str]:
+	"""Kick off background warm-up of all configured models in this process."""
+	if not ai_config.WARMUP_ENABLED:
+		return []
+	manager = get_warmup_manager()
+	manager.start()
+	return list(manager.tasks)
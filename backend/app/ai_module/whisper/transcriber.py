@@ -3,6 +3,38 @@ import tempfile
 import requests
 from typing import Dict, Any, Optional
 
+from app.ai_module.model_registry import get_model_registry
+from app.config import ai_config
+
+
+WHISPER_MODEL_KEY = "whisper"
+
+
+def _whisper_loader(model_name: str, device: str, compute_type: str):
+	def load():
+		from faster_whisper import WhisperModel  # type: ignore
+
+		return WhisperModel(model_name, device=device, compute_type=compute_type)
+
+	return load
+
+
+def register_whisper_model() -> None:
+	"""Register the local faster-whisper model once per process (shared by all transcribers)."""
+	registry = get_model_registry()
+	if registry.is_registered(WHISPER_MODEL_KEY):
+		return
+	registry.register(
+		WHISPER_MODEL_KEY,
+		_whisper_loader(
+			os.getenv("WHISPER_LOCAL_MODEL", "base"),
+			os.getenv("WHISPER_LOCAL_DEVICE", "cpu"),
+			os.getenv("WHISPER_LOCAL_COMPUTE_TYPE", "int8"),
+		),
+		pinned=WHISPER_MODEL_KEY in ai_config.MODEL_PINNED,
+		retry_after_seconds=ai_config.MODEL_LOAD_RETRY_SECONDS,
+	)
+
 
 class WhisperTranscriber:
 	"""Hybrid Whisper transcriber: local faster-whisper and/or OpenAI API fallback."""
@@ -15,9 +47,8 @@ class WhisperTranscriber:
 		self.local_model_name = os.getenv("WHISPER_LOCAL_MODEL", "base")
 		self.local_device = os.getenv("WHISPER_LOCAL_DEVICE", "cpu")
 		self.local_compute_type = os.getenv("WHISPER_LOCAL_COMPUTE_TYPE", "int8")
-		self.local_model = None
 		self.local_model_error: Optional[str] = None
-		self.local_model_load_attempted = False
+		register_whisper_model()
 
 		self.api_key = os.getenv("OPENAI_API_KEY")
 		self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
@@ -30,29 +61,17 @@ class WhisperTranscriber:
 			if self.hybrid_preference in {"local", "local_first", "speed_first"}:
 				self.hybrid_preference = "openai_first"
 
-	def _ensure_local_model(self) -> bool:
-		if self.local_model is not None:
-			return True
-
-		if self.local_model_load_attempted:
-			return False
-
-		self.local_model_load_attempted = True
-
-		try:
-			from faster_whisper import WhisperModel  # type: ignore
+	@property
+	def local_model(self):
+		"""The shared faster-whisper model if loaded (never triggers a load)."""
+		return get_model_registry().peek(WHISPER_MODEL_KEY)
 
-			self.local_model = WhisperModel(
-				self.local_model_name,
-				device=self.local_device,
-				compute_type=self.local_compute_type,
-			)
-			self.local_model_error = None
-			return True
-		except Exception as error:
-			self.local_model = None
-			self.local_model_error = str(error)
-			return False
+	def _ensure_local_model(self) -> bool:
+		# One model per process via the registry; a failed load is retried after MODEL_LOAD_RETRY_SECONDS.
+		registry = get_model_registry()
+		model = registry.get(WHISPER_MODEL_KEY)
+		self.local_model_error = None if model is not None else registry.error(WHISPER_MODEL_KEY)
+		return model is not None
 
 	def _transcribe_with_local(
 		self,
@@ -74,7 +93,10 @@ class WhisperTranscriber:
 				temp_file.write(audio_bytes)
 				temp_path = temp_file.name
 
-			segments, info = self.local_model.transcribe(
+			local_model = get_model_registry().get(WHISPER_MODEL_KEY)
+			if local_model is None:
+				raise RuntimeError(f"Local Whisper is not available: {get_model_registry().error(WHISPER_MODEL_KEY)}")
+			segments, info = local_model.transcribe(
 				temp_path,
 				language=language,
 				vad_filter=True,
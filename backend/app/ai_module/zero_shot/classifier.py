@@ -0,0 +1,206 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+DEFAULT_HYPOTHESIS_TEMPLATE = "This example is {}."
+AGGREGATIONS = ("max", "mean")
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def _softmax(logits: np.ndarray, axis: int = -1) -> np.ndarray:
+	shifted = logits - logits.max(axis=axis, keepdims=True)
+	exp = np.exp(shifted)
+	return exp / exp.sum(axis=axis, keepdims=True)
+
+
+def torch_forward(model) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+	"""Wrap a transformers sequence-classification model as numpy in -> logits out."""
+	import torch
+
+	def forward(encoded: Dict[str, np.ndarray]) -> np.ndarray:
+		tensors = {name: torch.from_numpy(np.asarray(value)) for name, value in encoded.items()}
+		with torch.inference_mode():
+			return model(**tensors).logits.float().numpy()
+
+	return forward
+
+
+class ZeroShotClassifier:
+	"""NLI zero-shot classifier that scores many premise/label pairs per forward pass.
+
+	Mirrors transformers' ZeroShotClassificationPipeline scoring (hypothesis
+	template, entailment softmax across labels, or entailment-vs-contradiction
+	per label when multi_label=True), but takes a batch of independent
+	(premise, labels) specs and runs every premise x hypothesis pair together
+	instead of one pipeline call per STAR dimension.
+	"""
+
+	def __init__(
+		self,
+		tokenizer,
+		forward_fn: Callable[[Dict[str, np.ndarray]], np.ndarray],
+		label2id: Dict[str, int],
+		hypothesis_template: str = DEFAULT_HYPOTHESIS_TEMPLATE,
+		max_length: int = 512,
+		max_pairs_per_pass: int = 64,
+	):
+		self.tokenizer = tokenizer
+		self.forward_fn = forward_fn
+		self.hypothesis_template = hypothesis_template
+		self.max_length = max_length
+		self.max_pairs_per_pass = max(1, max_pairs_per_pass)
+
+		normalized = {label.lower(): index for label, index in label2id.items()}
+		self.entailment_id = next((i for label, i in normalized.items() if label.startswith("entail")), None)
+		self.contradiction_id = next((i for label, i in normalized.items() if label.startswith("contra")), None)
+		if self.entailment_id is None:
+			raise ValueError("NLI model config has no entailment label")
+
+	# ── premise windows ───────────────────────────────────────────────────────
+	def _token_offsets(self, text: str) -> List[Tuple[int, int]]:
+		"""Character span of every premise token (whitespace words for slow tokenizers)."""
+		try:
+			encoded = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+			return [tuple(span) for span in encoded["offset_mapping"]]
+		except (NotImplementedError, KeyError, TypeError, ValueError):
+			return [match.span() for match in _WORD_RE.finditer(text)]
+
+	def _token_count(self, text: str) -> int:
+		if not text:
+			return 0
+		try:
+			return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+		except (KeyError, TypeError, ValueError):
+			return len(_WORD_RE.findall(text))
+
+	def _special_tokens(self) -> int:
+		try:
+			return self.tokenizer.num_special_tokens_to_add(pair=True)
+		except (AttributeError, TypeError):
+			return 4  # RoBERTa pairs: <s> A </s></s> B </s>
+
+	def premise_windows(
+		self,
+		premise: str,
+		labels: Sequence[str],
+		suffix: str = "",
+		max_windows: int = 4,
+		overlap_tokens: int = 64,
+	) -> List[str]:
+		"""Split a premise into overlapping windows that fit the model's token budget.
+
+		Each window leaves room for the longest hypothesis, the special tokens and
+		`suffix` (appended to every window, e.g. a STAR focus question). When the
+		premise needs more than `max_windows` windows, evenly spaced ones are kept,
+		always including the first and the last so the end of an answer is scored.
+		"""
+		joiner = "\n" if suffix else ""
+		longest_hypothesis = max((self._token_count(self.hypothesis_template.format(label)) for label in labels), default=0)
+		budget = self.max_length - self._special_tokens() - longest_hypothesis - self._token_count(suffix) - 1
+		budget = max(budget, 16)
+
+		offsets = self._token_offsets(premise)
+		if len(offsets) <= budget:
+			return [premise + joiner + suffix]
+
+		step = max(1, budget - min(overlap_tokens, budget // 2))
+		starts = list(range(0, len(offsets) - budget + step, step))
+		starts[-1] = min(starts[-1], len(offsets) - budget)
+		if len(starts) > max_windows > 1:
+			picks = np.linspace(0, len(starts) - 1, num=max_windows)
+			starts = [starts[int(round(pick))] for pick in picks]
+		elif max_windows <= 1:
+			starts = starts[:1]
+
+		windows = []
+		for start in starts:
+			end = min(start + budget, len(offsets)) - 1
+			windows.append(premise[offsets[start][0]:offsets[end][1]] + joiner + suffix)
+		return windows
+
+	@classmethod
+	def from_transformers(cls, tokenizer, model, **kwargs) -> "ZeroShotClassifier":
+		return cls(tokenizer, torch_forward(model), model.config.label2id, **kwargs)
+
+	# ── scoring ───────────────────────────────────────────────────────────────
+	def pair_logits(self, premises: Sequence[str], hypotheses: Sequence[str]) -> np.ndarray:
+		"""Logits for each (premise, hypothesis) pair, length-sorted into padded sub-batches."""
+		order = sorted(range(len(premises)), key=lambda i: len(premises[i]) + len(hypotheses[i]))
+		logits: Optional[np.ndarray] = None
+		for start in range(0, len(order), self.max_pairs_per_pass):
+			chunk = order[start:start + self.max_pairs_per_pass]
+			encoded = self.tokenizer(
+				[premises[i] for i in chunk],
+				[hypotheses[i] for i in chunk],
+				padding=True,
+				truncation="only_first",
+				max_length=self.max_length,
+				return_tensors="np",
+			)
+			chunk_logits = np.asarray(self.forward_fn(dict(encoded)), dtype=np.float32)
+			if logits is None:
+				logits = np.empty((len(premises), chunk_logits.shape[1]), dtype=np.float32)
+			logits[chunk] = chunk_logits
+		return logits if logits is not None else np.zeros((0, 3), dtype=np.float32)
+
+	def label_scores(self, entailment_logits: np.ndarray, pair_logits: np.ndarray, multi_label: bool) -> np.ndarray:
+		if not multi_label or self.contradiction_id is None:
+			return _softmax(entailment_logits)
+		pair = pair_logits[:, [self.contradiction_id, self.entailment_id]]
+		return _softmax(pair, axis=-1)[:, 1]
+
+	def classify_many(
+		self,
+		specs: Sequence[Dict[str, Any]],
+		multi_label: bool = False,
+		aggregation: str = "max",
+	) -> List[Dict[str, Any]]:
+		"""Classify [{"premise": str, "labels": [str], "windows"?: [str], "multi_label"?: bool}, ...].
+
+		Specs with "windows" are scored per window and the per-label scores are
+		aggregated (`max` or `mean`); all pairs of all specs share one batch.
+		"""
+		if aggregation not in AGGREGATIONS:
+			raise ValueError(f"aggregation must be one of {AGGREGATIONS}")
+
+		premises: List[str] = []
+		hypotheses: List[str] = []
+		spans = []
+		for spec in specs:
+			windows = spec.get("windows") or [spec["premise"]]
+			spec_spans = []
+			for window in windows:
+				start = len(premises)
+				for label in spec["labels"]:
+					premises.append(window)
+					hypotheses.append(self.hypothesis_template.format(label))
+				spec_spans.append((start, len(premises)))
+			spans.append(spec_spans)
+
+		logits = self.pair_logits(premises, hypotheses)
+
+		results = []
+		for spec, spec_spans in zip(specs, spans):
+			spec_multi_label = spec.get("multi_label", multi_label)
+			window_scores = np.stack([
+				self.label_scores(logits[start:end, self.entailment_id], logits[start:end], spec_multi_label)
+				for start, end in spec_spans
+			])
+			scores = window_scores.max(axis=0) if aggregation == "max" else window_scores.mean(axis=0)
+			if not spec_multi_label and len(spec_spans) > 1:
+				scores = scores / scores.sum()  # keep single-label scores a distribution
+			ranked = np.argsort(-scores, kind="stable")
+			results.append({
+				"sequence": spec["premise"],
+				"labels": [spec["labels"][i] for i in ranked],
+				"scores": [float(scores[i]) for i in ranked],
+				"windows": len(spec_spans),
+			})
+		return results
+
+	def __call__(self, premise: str, candidate_labels: Sequence[str], multi_label: bool = False) -> Dict[str, Any]:
+		"""Pipeline-compatible single call: {"sequence", "labels", "scores"}."""
+		return self.classify_many([{"premise": premise, "labels": list(candidate_labels)}], multi_label=multi_label)[0]
@@ -30,3 +30,23 @@ api_bp.register_blueprint(hf_proxy_bp)
 def health():
 	return jsonify({"status": "ok"}), 200
 
+
+@api_bp.route("/supabase-stats", methods=["GET"])
+def supabase_stats():
+	"""Pool settings and per-table latency of the shared Supabase client."""
+	from app.supabase_client import get_supabase_client
+
+	return jsonify(get_supabase_client().stats()), 200
+
+
+@api_bp.route("/ready", methods=["GET"])
+def ready():
+	"""Readiness: 503 until the required AI models are loaded and warmed."""
+	from app.config import ai_config
+	from app.ai_module.warmup import get_warmup_manager
+
+	if not ai_config.WARMUP_ENABLED:
+		return jsonify({"ready": True, "warmup": "disabled"}), 200
+	status = get_warmup_manager().status()
+	return jsonify(status), 200 if status["ready"] else 503
+
@@ -1,9 +1,12 @@
 from flask import Blueprint, jsonify, request
 from app.services.analytics_service import AnalyticsService
+from app.services.rollup_service import ROLLUP_METRICS, RollupService
+from datetime import date
 from functools import wraps
 
 analytics_bp = Blueprint("analytics", __name__)
 _analytics_service = None
+_rollup_service = None
 
 
 def get_analytics_service():
@@ -14,6 +17,14 @@ def get_analytics_service():
     return _analytics_service
 
 
+def get_rollup_service():
+    """Lazy load rollup service on first use"""
+    global _rollup_service
+    if _rollup_service is None:
+        _rollup_service = RollupService()
+    return _rollup_service
+
+
 def require_admin(f):
     """Decorator to check if user is admin (placeholder - implement with real auth)"""
     @wraps(f)
@@ -23,13 +34,44 @@ def require_admin(f):
     return decorated_function
 
 
+def _snapshot_response(metric, **kwargs):
+    """Serve a cached dashboard snapshot with ETag / Cache-Control (304 when unchanged)."""
+    service = get_analytics_service()
+    force_refresh = request.args.get("refresh", "").lower() in ("1", "true", "yes")
+    result, meta = service.get_snapshot(metric, force_refresh=force_refresh, **kwargs)
+    status_code = result.get("status_code", 200)
+
+    response = jsonify(result)
+    response.status_code = status_code
+    if status_code != 200:
+        return response
+
+    max_age = max(0, int(meta["ttl"] - meta["age"]))
+    response.set_etag(meta["etag"], weak=True)
+    response.headers["Cache-Control"] = f"private, max-age={max_age}, stale-while-revalidate={int(service.snapshot_stale_ttl)}"
+    response.headers["X-Snapshot-State"] = meta["state"]
+    response.headers["Age"] = str(int(meta["age"]))
+    return response.make_conditional(request)
+
+
+@analytics_bp.route("/cache-stats", methods=["GET"])
+@require_admin
+def get_cache_stats():
+    """Dashboard snapshot cache counters"""
+    service = get_analytics_service()
+    return jsonify({
+        "success": True,
+        "data": {"ttls": service.snapshot_ttls, **service.snapshots.stats()},
+        "status_code": 200
+    }), 200
+
+
 @analytics_bp.route("/dashboard-metrics", methods=["GET"])
 @require_admin
 def get_dashboard_metrics():
     """Get all dashboard metrics for admin dashboard"""
     try:
-        result = get_analytics_service().get_dashboard_metrics()
-        return jsonify(result), result.get("status_code", 200)
+        return _snapshot_response("dashboard_metrics")
     
     except Exception as e:
         return jsonify({
@@ -43,7 +85,7 @@ def get_dashboard_metrics():
 def get_students_count():
     """Get total students count"""
     try:
-        result = get_analytics_service().get_students_count()
+        result = get_analytics_service().get_students_count(accuracy=request.args.get("accuracy", "exact"))
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
@@ -58,7 +100,7 @@ def get_students_count():
 def get_employers_count():
     """Get total employers/partner companies count"""
     try:
-        result = get_analytics_service().get_employers_count()
+        result = get_analytics_service().get_employers_count(accuracy=request.args.get("accuracy", "exact"))
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
@@ -74,7 +116,7 @@ def get_interviews_count():
     """Get total completed interviews count"""
     try:
         status = request.args.get("status", "completed")
-        result = get_analytics_service().get_interviews_count(status=status)
+        result = get_analytics_service().get_interviews_count(status=status, accuracy=request.args.get("accuracy", "exact"))
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
@@ -89,7 +131,7 @@ def get_interviews_count():
 def get_events_count():
     """Get active events count"""
     try:
-        result = get_analytics_service().get_events_count()
+        result = get_analytics_service().get_events_count(accuracy=request.args.get("accuracy", "exact"))
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
@@ -102,11 +144,14 @@ def get_events_count():
 @analytics_bp.route("/recent-activity", methods=["GET"])
 @require_admin
 def get_recent_activity():
-    """Get recent activity feed"""
+    """
+    Get recent activity feed
+    Query params:
+        - limit: number of events (default 10, max 50)
+    """
     try:
         limit = request.args.get("limit", 10, type=int)
-        result = get_analytics_service().get_recent_activity(limit=limit)
-        return jsonify(result), result.get("status_code", 200)
+        return _snapshot_response("recent_activity", limit=limit)
     
     except Exception as e:
         return jsonify({
@@ -120,8 +165,7 @@ def get_recent_activity():
 def get_user_stats():
     """Get user statistics by role"""
     try:
-        result = get_analytics_service().get_user_stats()
-        return jsonify(result), result.get("status_code", 200)
+        return _snapshot_response("user_stats")
     
     except Exception as e:
         return jsonify({
@@ -135,8 +179,7 @@ def get_user_stats():
 def get_job_stats():
     """Get job statistics"""
     try:
-        result = get_analytics_service().get_job_stats()
-        return jsonify(result), result.get("status_code", 200)
+        return _snapshot_response("job_stats")
     
     except Exception as e:
         return jsonify({
@@ -158,3 +201,79 @@ def get_applications_count():
             "success": False,
             "error": str(e)
         }), 500
+
+
+@analytics_bp.route("/timeseries", methods=["GET"])
+@require_admin
+def get_timeseries_metrics():
+    """List rollup metrics with their aggregation watermarks"""
+    try:
+        result = get_rollup_service().get_watermarks()
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@analytics_bp.route("/timeseries/<metric>", methods=["GET"])
+@require_admin
+def get_timeseries(metric):
+    """Daily/weekly/monthly counts from the rollup tables
+
+    Query params: start, end (YYYY-MM-DD, default last 30 days), granularity
+    (day|week|month), dimension (e.g. status=pending only), split=1 (one
+    series per dimension value).
+    """
+    try:
+        start = request.args.get("start")
+        end = request.args.get("end")
+        try:
+            start = date.fromisoformat(start) if start else None
+            end = date.fromisoformat(end) if end else None
+        except ValueError:
+            return jsonify({
+                "success": False,
+                "error": "start and end must be dates (YYYY-MM-DD)"
+            }), 400
+
+        result = get_rollup_service().get_timeseries(
+            metric,
+            start=start,
+            end=end,
+            granularity=request.args.get("granularity", "day"),
+            dimension=request.args.get("dimension"),
+            split=request.args.get("split", "").lower() in ("1", "true", "yes"),
+        )
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@analytics_bp.route("/timeseries/refresh", methods=["POST"])
+@require_admin
+def refresh_timeseries():
+    """Run the incremental rollup aggregator (body: {"metrics": [...], "reset": false})"""
+    try:
+        body = request.get_json(silent=True) or {}
+        metrics = body.get("metrics") or None
+        service = get_rollup_service()
+        if body.get("reset"):
+            for metric in metrics or list(ROLLUP_METRICS):
+                reset = service.reset(metric)
+                if not reset.get("success"):
+                    return jsonify(reset), reset.get("status_code", 500)
+        result = service.refresh(metrics)
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
@@ -29,18 +29,12 @@ def get_events():
     Get all career events
     Query params:
         - event_type: filter by event type (Job Fair, Workshop, Seminar, Webinar, Announcement)
-        - student_id: student ID to check registration status
+        - student_id: student ID to check registration status (adds isRegistered)
     """
     try:
         event_type = request.args.get("event_type", None)
         student_id = request.args.get("student_id", None)
-        result = get_event_service().get_all_events(event_type=event_type)
-        
-        # Add isRegistered flag for each event if student_id provided
-        if student_id and result.get("success") and "data" in result:
-            for event in result["data"]:
-                registered_students = event.get("registered_students", [])
-                event["isRegistered"] = student_id in registered_students
+        result = get_event_service().get_all_events(event_type=event_type, student_id=student_id)
         
         return jsonify(result), result.get("status_code", 200)
     
@@ -68,6 +62,21 @@ def create_event():
         }), 500
 
 
+@events_bp.route("/cache-stats", methods=["GET"])
+@require_admin
+def get_event_cache_stats():
+    """Event cache hit rate and entry counts (admin only)"""
+    try:
+        result = get_event_service().get_cache_stats()
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
 # Registration routes must come BEFORE generic /<event_id> routes
 @events_bp.route("/<event_id>/register", methods=["POST"])
 def register_for_event(event_id):
@@ -78,11 +87,6 @@ def register_for_event(event_id):
         
         result = get_event_service().register_for_event(event_id, student_id)
         
-        # Add isRegistered flag
-        if result.get("success") and "data" in result:
-            registered_students = result["data"].get("registered_students", [])
-            result["data"]["isRegistered"] = student_id in registered_students
-        
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
@@ -101,10 +105,29 @@ def unregister_from_event(event_id):
         
         result = get_event_service().unregister_from_event(event_id, student_id)
         
-        # Add isRegistered flag
-        if result.get("success") and "data" in result:
-            registered_students = result["data"].get("registered_students", [])
-            result["data"]["isRegistered"] = student_id in registered_students
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@events_bp.route("/<event_id>/registrants", methods=["GET"])
+@require_admin
+def get_event_registrants(event_id):
+    """
+    List the students registered for an event (admin only)
+    Query params:
+        - limit: page size (default 50, max 500)
+        - offset: registrations to skip
+    """
+    try:
+        limit = request.args.get("limit", 50, type=int)
+        offset = request.args.get("offset", 0, type=int)
+        
+        result = get_event_service().get_event_registrants(event_id, limit=limit, offset=offset)
         
         return jsonify(result), result.get("status_code", 200)
     
@@ -118,9 +141,9 @@ def unregister_from_event(event_id):
 # Generic event routes
 @events_bp.route("/<event_id>", methods=["GET"])
 def get_event(event_id):
-    """Get a specific event by ID"""
+    """Get a specific event by ID (query param student_id adds isRegistered)"""
     try:
-        result = get_event_service().get_event_by_id(event_id)
+        result = get_event_service().get_event_by_id(event_id, student_id=request.args.get("student_id"))
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
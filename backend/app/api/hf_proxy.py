@@ -1,94 +1,194 @@
 # backend/app/api/hf_proxy.py
 #
-# Two endpoints:
+# Endpoints:
 #   POST /hf-embed    — sentence embeddings  (Path 1: similarity scoring)
-#   POST /hf-classify — ZSL classification   (Path 2: per-dimension STAR scoring)
+#   POST /hf-similarity — answer vs reference cosine scores (Path 1, server-side)
+#   POST /hf-classify — ZSL classification   (Path 2: per-dimension STAR scoring, batched)
+#   GET  /hf-stats    — batching / inference / model-memory counters
 
 import json
 import traceback
 import threading
+import numpy as np
 from flask import request, jsonify, Blueprint
 
+from app.config import ai_config
+from app.ai_module.model_registry import get_model_registry
+from app.ai_module.roberta import onnx_models
+from app.ai_module.roberta.batcher import EmbeddingBatcher, ModelUnavailableError
+from app.ai_module.roberta.embedding_cache import EmbeddingCache, normalize_text
+from app.ai_module.roberta.question_embeddings import get_question_store
+from app.ai_module.roberta.similarity import cosine_matrix, to_unit_interval
+from app.ai_module.zero_shot.classifier import AGGREGATIONS, ZeroShotClassifier
+
 hf_proxy_bp = Blueprint('hf_proxy', __name__)
 
 # ── Embedding model (Path 1: all-roberta-large-v1) ───────────────────────────
-_model = None
+# Both models live in the shared model registry (app/ai_module/model_registry.py):
+# loaded on first use, unloaded when idle or over the memory budget, and
+# loaded before fork when gunicorn preloads the app. Startup warm-up is in
+# app/ai_module/warmup.py.
+EMBED_MODEL_KEY = 'embed'
+CLASSIFY_MODEL_KEY = 'zsl'
+
+def _load_onnx(loader, model_name, label):
+    """Load a model through ONNX Runtime; None means fall back to PyTorch."""
+    if ai_config.AI_INFERENCE_BACKEND != 'onnx':
+        return None
+    try:
+        print(f"Loading {model_name} via ONNX Runtime (int8={ai_config.ONNX_QUANTIZE})...", flush=True)
+        model = loader(model_name)
+        print(f"{label} loaded via ONNX Runtime.", flush=True)
+        return model
+    except Exception as e:
+        print(f"ONNX load of {model_name} failed, falling back to PyTorch: {e}", flush=True)
+        traceback.print_exc()
+        return None
+
+def _load_embed_model():
+    model = _load_onnx(onnx_models.load_sentence_encoder, ai_config.EMBED_MODEL_NAME, "Embedding model")
+    if model is not None:
+        return model
 
-def _prewarm_model():
-    """Pre-warm the embedding model so the first request isn't slow."""
-    get_model()
+    print(f"Loading {ai_config.EMBED_MODEL_NAME}...", flush=True)
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(
+        ai_config.EMBED_MODEL_NAME,
+        device='cpu'
+    )
+    print("Model loaded successfully.", flush=True)
+    return model
 
 def get_model():
-    global _model
-    if _model is None:
-        try:
-            print("Loading all-roberta-large-v1...", flush=True)
-            from sentence_transformers import SentenceTransformer
-            _model = SentenceTransformer(
-                'sentence-transformers/all-roberta-large-v1',
-                device='cpu'
-            )
-            print("Model loaded successfully.", flush=True)
-        except Exception as e:
-            print(f"FAILED to load embedding model: {e}", flush=True)
-            traceback.print_exc()
-            return None
-    return _model
+    """The embedding model, or None if it failed to load."""
+    return get_model_registry().get(EMBED_MODEL_KEY)
+
+# ── Embedding micro-batcher ─────────────────────────────────────────────────
+# Concurrent /hf-embed requests are coalesced into one length-sorted forward
+# pass instead of one tiny batch per HTTP request.
+_embed_batcher = None
+_embed_batcher_lock = threading.Lock()
+
+def get_embed_batcher():
+    global _embed_batcher
+    if _embed_batcher is None:
+        with _embed_batcher_lock:
+            if _embed_batcher is None:
+                _embed_batcher = EmbeddingBatcher(
+                    get_model,
+                    max_wait_ms=ai_config.EMBED_BATCH_MAX_WAIT_MS,
+                    max_batch_size=ai_config.EMBED_BATCH_MAX_SIZE,
+                    max_batch_tokens=ai_config.EMBED_BATCH_MAX_TOKENS,
+                )
+    return _embed_batcher
+
+def _encode(texts):
+    if ai_config.EMBED_BATCHING_ENABLED:
+        return get_embed_batcher().encode(texts, timeout=ai_config.EMBED_BATCH_TIMEOUT_SECONDS)
+
+    model = get_model()
+    if model is None:
+        raise ModelUnavailableError("Embedding model is not available")
+    return model.encode(texts, convert_to_numpy=True)
+
+# ── Embedding cache ─────────────────────────────────────────────────────────
+# Bank questions and ideal answers are re-sent on every evaluation; repeat
+# texts are served from the cache without touching the model.
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache():
+    global _embedding_cache
+    if _embedding_cache is None and ai_config.EMBED_CACHE_ENABLED:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(
+                    ai_config.EMBED_MODEL_NAME,
+                    max_entries=ai_config.EMBED_CACHE_MAX_ENTRIES,
+                    disk_dir=ai_config.EMBED_CACHE_DISK_DIR or None,
+                    disk_max_rows=ai_config.EMBED_CACHE_DISK_MAX_ROWS,
+                )
+    return _embedding_cache
+
+def _embed_with_cache(texts):
+    """Return (embeddings, cache_hits, cache_misses) for a list of strings."""
+    cache = get_embedding_cache()
+    if cache is None:
+        return _encode(texts), 0, len(texts)
+
+    vectors, keys = cache.lookup(texts)
+    missing = {}
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            missing.setdefault(keys[i], []).append(i)
+
+    if missing:
+        miss_keys = list(missing)
+        miss_texts = [normalize_text(texts[missing[key][0]]) for key in miss_keys]
+        encoded = _encode(miss_texts)
+        cache.store(miss_keys, encoded)
+        for key, vector in zip(miss_keys, encoded):
+            for i in missing[key]:
+                vectors[i] = vector
+
+    misses = sum(len(indices) for indices in missing.values())
+    return np.stack(vectors), len(texts) - misses, misses
+
+def embed_texts(texts):
+    """Embed a list of strings through the cache and the micro-batcher."""
+    embeddings, _, _ = _embed_with_cache(texts)
+    return embeddings
 
 # ── ZSL Classification model (Path 2: cross-encoder/nli-roberta-base) ─────────
-_classify_model = None
+# Both models honour AI_INFERENCE_BACKEND=onnx (see app/config/ai_config.py).
+def _load_classify_model():
+    model = _load_onnx(
+        lambda name: onnx_models.load_zero_shot_classifier(
+            name, max_pairs_per_pass=ai_config.ZSL_MAX_PAIRS_PER_PASS,
+        ),
+        ai_config.ZSL_MODEL_NAME,
+        "ZSL classification model",
+    )
+    if model is not None:
+        return model
+
+    print(f"Loading {ai_config.ZSL_MODEL_NAME} for ZSL...", flush=True)
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
-def _prewarm_classify_model():
-    """Pre-warm the ZSL model so the first classify request isn't slow."""
-    get_classify_model()
+    # Load tokenizer and model explicitly onto CPU.
+    # Do NOT rely on pipeline(device=-1) alone — when `accelerate` is installed,
+    # transformers may use device_map="auto" internally, placing weights on a
+    # "meta" device (no real tensors). Any computation then raises:
+    #   aten::_local_scalar_dense: attempted to run this operator with Meta tensors
+    # Explicitly constructing the model with low_cpu_mem_usage=False bypasses
+    # accelerate entirely and forces real CPU float32 tensors.
+    model_name = ai_config.ZSL_MODEL_NAME
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_name,
+        torch_dtype=torch.float32,  # explicit dtype — avoids bfloat16 meta init
+        low_cpu_mem_usage=False,     # disable accelerate meta-tensor trick
+    )
+    model.eval()
+
+    # Same scoring as pipeline("zero-shot-classification"), but every
+    # premise x label pair of a request goes through one forward pass.
+    classifier = ZeroShotClassifier.from_transformers(
+        tokenizer,
+        model,
+        max_pairs_per_pass=ai_config.ZSL_MAX_PAIRS_PER_PASS,
+    )
+    print("ZSL classification model loaded successfully.", flush=True)
+    return classifier
 
 def get_classify_model():
-    global _classify_model
-    if _classify_model is None:
-        try:
-            print("Loading cross-encoder/nli-roberta-base for ZSL...", flush=True)
-            import torch
-            from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
-
-            # Load tokenizer and model explicitly onto CPU.
-            # Do NOT rely on pipeline(device=-1) alone — when `accelerate` is installed,
-            # transformers may use device_map="auto" internally, placing weights on a
-            # "meta" device (no real tensors). Any computation then raises:
-            #   aten::_local_scalar_dense: attempted to run this operator with Meta tensors
-            # Explicitly constructing the model with low_cpu_mem_usage=False bypasses
-            # accelerate entirely and forces real CPU float32 tensors.
-            model_name = "cross-encoder/nli-roberta-base"
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForSequenceClassification.from_pretrained(
-                model_name,
-                torch_dtype=torch.float32,  # explicit dtype — avoids bfloat16 meta init
-                low_cpu_mem_usage=False,     # disable accelerate meta-tensor trick
-            )
-            model.eval()
-
-            _classify_model = pipeline(
-                "zero-shot-classification",
-                model=model,
-                tokenizer=tokenizer,
-                device=-1,      # CPU (redundant but explicit)
-                framework="pt",
-            )
-            print("ZSL classification model loaded successfully.", flush=True)
-        except Exception as e:
-            print(f"FAILED to load ZSL model: {e}", flush=True)
-            traceback.print_exc()
-            return None
-    return _classify_model
-
-def prewarm_all():
-    """
-    Called once at app startup (via threading.Thread) to warm both models
-    in parallel so neither the embed nor classify endpoint is slow on first hit.
-    """
-    t1 = threading.Thread(target=_prewarm_model,          daemon=True)
-    t2 = threading.Thread(target=_prewarm_classify_model, daemon=True)
-    t1.start()
-    t2.start()
+    """The ZSL classifier, or None if it failed to load."""
+    return get_model_registry().get(CLASSIFY_MODEL_KEY)
+
+_registry = get_model_registry()
+_registry.register(EMBED_MODEL_KEY, _load_embed_model, pinned=EMBED_MODEL_KEY in ai_config.MODEL_PINNED)
+_registry.register(CLASSIFY_MODEL_KEY, _load_classify_model, pinned=CLASSIFY_MODEL_KEY in ai_config.MODEL_PINNED)
 
 # ── /hf-embed (Path 1) ──────────────────────────────────────────────────────
 @hf_proxy_bp.route('/hf-embed', methods=['POST'])
@@ -104,14 +204,98 @@ def hf_embed():
     inputs = data.get('inputs')
     if not inputs or not isinstance(inputs, list) or len(inputs) < 1:
         return jsonify({'error': 'inputs must be a list of 1 or more strings'}), 400
+    if not all(isinstance(text, str) for text in inputs):
+        return jsonify({'error': 'inputs must be a list of 1 or more strings'}), 400
 
-    model = get_model()
-    if model is None:
+    try:
+        embeddings, hits, misses = _embed_with_cache(inputs)
+        response = jsonify(embeddings.tolist())
+        response.headers['X-Embed-Cache-Hits'] = str(hits)
+        response.headers['X-Embed-Cache-Misses'] = str(misses)
+        return response, 200
+    except ModelUnavailableError:
         return jsonify({'error': 'Model failed to load — check Railway deploy logs'}), 500
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+# ── /hf-similarity (Path 1, server-side cosine) ─────────────────────────────
+# Accepts an answer (or answers) plus references given as raw text or as
+# question-bank / ideal-answer ids from the precomputed embedding store, and
+# returns only the cosine scores instead of two 1024-float vectors per pair.
+#
+#   { "answer": "...",
+#     "references": ["raw reference text", {"id": "<question uuid>"}, {"text": "..."}],
+#     "reference_ids": ["ideal:1"],          # optional shorthand for {"id": ...}
+#     "clamp": true }                        # clamp to [0, 1] like the frontend
+@hf_proxy_bp.route('/hf-similarity', methods=['POST'])
+def hf_similarity():
+
+    data = request.get_json(force=True, silent=True)
+    if data is None:
+        try:
+            data = json.loads(request.data.decode('utf-8'))
+        except Exception:
+            return jsonify({'error': 'Could not parse request body as JSON'}), 400
+
+    single = 'answers' not in data
+    answers = [data.get('answer')] if single else data.get('answers')
+    if not answers or not isinstance(answers, list) or not all(isinstance(a, str) and a.strip() for a in answers):
+        return jsonify({'error': 'answer must be a non-empty string (or answers a list of them)'}), 400
+
+    references = data.get('references') or []
+    reference_ids = data.get('reference_ids') or []
+    if not isinstance(references, list) or not isinstance(reference_ids, list):
+        return jsonify({'error': 'references and reference_ids must be lists'}), 400
+    references = references + [{'id': ref_id} for ref_id in reference_ids]
+    if not references:
+        return jsonify({'error': 'references must contain at least one text or id'}), 400
+
+    ref_texts, ref_ids = {}, {}
+    for position, ref in enumerate(references):
+        if isinstance(ref, str) and ref.strip():
+            ref_texts[position] = ref
+        elif isinstance(ref, dict) and isinstance(ref.get('text'), str) and ref['text'].strip():
+            ref_texts[position] = ref['text']
+        elif isinstance(ref, dict) and ref.get('id'):
+            ref_ids[position] = str(ref['id'])
+        else:
+            return jsonify({'error': f'reference {position} must be a string, {{"text"}} or {{"id"}}'}), 400
 
     try:
-        embeddings = model.encode(inputs, convert_to_numpy=True)
-        return jsonify(embeddings.tolist()), 200
+        stored = None
+        if ref_ids:
+            stored, missing = get_question_store().get_many(list(ref_ids.values()))
+            if missing:
+                return jsonify({'error': 'Unknown reference ids', 'missing_ids': missing}), 404
+
+        texts = answers + list(ref_texts.values())
+        embeddings, hits, misses = _embed_with_cache(texts)
+        answer_vectors = embeddings[:len(answers)]
+
+        ref_matrix = np.empty((len(references), embeddings.shape[1]), dtype=np.float32)
+        for row, position in enumerate(ref_texts):
+            ref_matrix[position] = embeddings[len(answers) + row]
+        for row, position in enumerate(ref_ids):
+            ref_matrix[position] = stored[row]
+
+        scores = cosine_matrix(answer_vectors, ref_matrix)
+        if data.get('clamp', True):
+            scores = to_unit_interval(scores)
+        scores = np.round(scores.astype(np.float64), 6)
+
+        best = scores.argmax(axis=1)
+        response = jsonify({
+            'scores': scores[0].tolist() if single else scores.tolist(),
+            'best_index': int(best[0]) if single else best.tolist(),
+        })
+        response.headers['X-Embed-Cache-Hits'] = str(hits)
+        response.headers['X-Embed-Cache-Misses'] = str(misses)
+        return response, 200
+    except ModelUnavailableError:
+        return jsonify({'error': 'Model failed to load — check Railway deploy logs'}), 500
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -125,7 +309,77 @@ def hf_embed():
 # where hypothesis is one candidate label at a time.
 # A safe premise length is ~350 chars (~87 tokens), leaving room for the
 # longest label (~15 tokens) + special tokens + template overhead.
+# That cut only applies in "truncate" mode; "chunk" mode (default) splits the
+# premise into overlapping token windows that each fit the 512-token budget
+# and aggregates the per-window label scores.
 _MAX_CLASSIFY_INPUT_CHARS = 350
+_CHUNKING_MODES = ('chunk', 'truncate')
+
+def _parse_classify_specs(data):
+    """
+    Normalize the three accepted /hf-classify bodies into classifier specs:
+      {"inputs": str,        "candidate_labels": [...]}          legacy, one premise
+      {"inputs": [str, ...], "candidate_labels": [...]}          many premises, shared labels
+      {"dimensions": [{"key", "inputs", "candidate_labels"}, ...]}  one spec per STAR dimension
+    An optional "premise_suffix" (top level or per dimension) is appended to
+    every window, so a focus question survives chunking of a long answer.
+    Returns (specs, keys, error).
+    """
+    dimensions = data.get('dimensions')
+    if dimensions is not None:
+        if not isinstance(dimensions, list) or not dimensions:
+            return None, None, 'dimensions must be a non-empty list'
+        specs, keys = [], []
+        for i, dim in enumerate(dimensions):
+            if not isinstance(dim, dict):
+                return None, None, f'dimensions[{i}] must be an object'
+            inputs = dim.get('inputs')
+            labels = dim.get('candidate_labels')
+            if not inputs or not isinstance(inputs, str):
+                return None, None, f'dimensions[{i}].inputs must be a string'
+            if not labels or not isinstance(labels, list) or not all(isinstance(l, str) for l in labels):
+                return None, None, f'dimensions[{i}].candidate_labels must be a list of strings'
+            suffix = dim.get('premise_suffix', data.get('premise_suffix')) or ''
+            if not isinstance(suffix, str):
+                return None, None, f'dimensions[{i}].premise_suffix must be a string'
+            specs.append({'premise': inputs, 'labels': labels, 'suffix': suffix})
+            keys.append(dim.get('key', i))
+        return specs, keys, None
+
+    inputs = data.get('inputs')
+    candidate_labels = data.get('candidate_labels')
+
+    if isinstance(inputs, list):
+        if not inputs or not all(isinstance(text, str) and text for text in inputs):
+            return None, None, 'inputs must be a string or a list of non-empty strings'
+    elif not inputs or not isinstance(inputs, str):
+        return None, None, 'inputs must be a string'
+    if not candidate_labels or not isinstance(candidate_labels, list):
+        return None, None, 'candidate_labels must be a list'
+    suffix = data.get('premise_suffix') or ''
+    if not isinstance(suffix, str):
+        return None, None, 'premise_suffix must be a string'
+
+    premises = inputs if isinstance(inputs, list) else [inputs]
+    return [{'premise': text, 'labels': candidate_labels, 'suffix': suffix} for text in premises], None, None
+
+def _prepare_premises(classifier, specs, chunking):
+    """Truncate (legacy) or split each spec's premise into token windows, in place."""
+    for spec in specs:
+        suffix = spec.pop('suffix')
+        if chunking == 'truncate':
+            joined = f"{spec['premise']}\n{suffix}" if suffix else spec['premise']
+            spec['premise'] = joined[:_MAX_CLASSIFY_INPUT_CHARS]
+            continue
+        premise = spec['premise'][:ai_config.ZSL_MAX_INPUT_CHARS]
+        spec['windows'] = classifier.premise_windows(
+            premise,
+            spec['labels'],
+            suffix=suffix,
+            max_windows=ai_config.ZSL_MAX_WINDOWS,
+            overlap_tokens=ai_config.ZSL_WINDOW_OVERLAP_TOKENS,
+        )
+        spec['premise'] = premise
 
 @hf_proxy_bp.route('/hf-classify', methods=['POST'])
 def hf_classify():
@@ -137,29 +391,64 @@ def hf_classify():
         except Exception:
             return jsonify({'error': 'Could not parse request body as JSON'}), 400
 
-    inputs = data.get('inputs')
-    candidate_labels = data.get('candidate_labels')
-
-    if not inputs or not isinstance(inputs, str):
-        return jsonify({'error': 'inputs must be a string'}), 400
-    if not candidate_labels or not isinstance(candidate_labels, list):
-        return jsonify({'error': 'candidate_labels must be a list'}), 400
+    specs, keys, error = _parse_classify_specs(data)
+    if error:
+        return jsonify({'error': error}), 400
 
-    # Truncate before hitting the model — prevents token-overflow 500s on long answers.
-    safe_inputs = inputs[:_MAX_CLASSIFY_INPUT_CHARS]
+    chunking = data.get('chunking', ai_config.ZSL_CHUNKING_MODE)
+    aggregation = data.get('aggregation', ai_config.ZSL_CHUNK_AGGREGATION)
+    if chunking not in _CHUNKING_MODES:
+        return jsonify({'error': f'chunking must be one of {list(_CHUNKING_MODES)}'}), 400
+    if aggregation not in AGGREGATIONS:
+        return jsonify({'error': f'aggregation must be one of {list(AGGREGATIONS)}'}), 400
 
     classifier = get_classify_model()
     if classifier is None:
         return jsonify({'error': 'ZSL model failed to load'}), 500
 
     try:
-        result = classifier(safe_inputs, candidate_labels, multi_label=False)
+        # Windows (or the legacy truncation) keep every pair inside 512 tokens.
+        _prepare_premises(classifier, specs, chunking)
+        results = classifier.classify_many(
+            specs,
+            multi_label=bool(data.get('multi_label', False)),
+            aggregation=aggregation,
+        )
+        if keys is not None:
+            return jsonify({
+                'results': [
+                    {'key': key, 'labels': result['labels'], 'scores': result['scores'], 'windows': result['windows']}
+                    for key, result in zip(keys, results)
+                ],
+            }), 200
+        if isinstance(data.get('inputs'), list):
+            return jsonify({
+                'results': [{'labels': r['labels'], 'scores': r['scores'], 'windows': r['windows']} for r in results],
+            }), 200
         return jsonify({
-            'labels': result['labels'],
-            'scores': result['scores'],
+            'labels': results[0]['labels'],
+            'scores': results[0]['scores'],
         }), 200
     except Exception as e:
         return jsonify({
             'error': str(e),
             'traceback': traceback.format_exc()
-        }), 500
\ No newline at end of file
+        }), 500
+
+# ── /hf-stats ───────────────────────────────────────────────────────────────
+def _runtime_name(key):
+    model = get_model_registry().peek(key)
+    return type(model).__name__ if model is not None else None
+
+@hf_proxy_bp.route('/hf-stats', methods=['GET'])
+def hf_stats():
+    embed_cache = get_embedding_cache()
+    return jsonify({
+        'inference_backend': ai_config.AI_INFERENCE_BACKEND,
+        'embed_model_runtime': _runtime_name(EMBED_MODEL_KEY),
+        'classify_model_runtime': _runtime_name(CLASSIFY_MODEL_KEY),
+        'embed_batching_enabled': ai_config.EMBED_BATCHING_ENABLED,
+        'embed_batcher': get_embed_batcher().stats(),
+        'embed_cache': embed_cache.stats() if embed_cache is not None else None,
+        'model_registry': get_model_registry().stats(),
+    }), 200
@@ -44,7 +44,7 @@ def get_user_interviews_count(user_id):
     """Get the count of interviews for a specific user"""
     try:
         status = request.args.get("status", None)
-        result = get_interview_service().get_user_interviews_count(user_id, status=status)
+        result = get_interview_service().get_user_interviews_count(user_id, status=status, accuracy=request.args.get("accuracy", "exact"))
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
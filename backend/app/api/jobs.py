@@ -1,9 +1,13 @@
 from flask import Blueprint, jsonify, request
 from app.services.job_service import JobService
+from app.services.recommendation_service import RecommendationService
+from app.services.matching_service import MatchingService
 from functools import wraps
 
 jobs_bp = Blueprint("jobs", __name__)
 _job_service = None
+_recommendation_service = None
+_matching_service = None
 
 
 def get_job_service():
@@ -14,6 +18,22 @@ def get_job_service():
     return _job_service
 
 
+def get_recommendation_service():
+    """Lazy load recommendation service (sharing the job service's recommender) on first use"""
+    global _recommendation_service
+    if _recommendation_service is None:
+        _recommendation_service = RecommendationService(get_job_service())
+    return _recommendation_service
+
+
+def get_matching_service():
+    """Lazy load semantic matching service on first use"""
+    global _matching_service
+    if _matching_service is None:
+        _matching_service = MatchingService()
+    return _matching_service
+
+
 def require_admin(f):
     """Decorator to check if user is admin (placeholder - implement with real auth)"""
     @wraps(f)
@@ -144,17 +164,57 @@ def delete_job(job_id):
 
 @jobs_bp.route("/search", methods=["GET"])
 def search_jobs():
-    """Search jobs by keyword"""
+    """
+    Search jobs (ranked, paginated)
+    Query params:
+        - q: search terms (any term may match; prefixes and single typos are tolerated)
+        - job_type, location, category: facet filters
+        - status: defaults to active
+        - limit (default 20, max 100), offset
+    """
     try:
         keyword = request.args.get("q", "")
+        job_type = request.args.get("job_type", None)
+        location = request.args.get("location", None)
+        category = request.args.get("category", None)
         
-        if not keyword:
+        if not keyword and not (job_type or location or category):
             return jsonify({
                 "success": False,
                 "error": "Search keyword is required"
             }), 400
         
-        result = get_job_service().search_jobs(keyword)
+        result = get_job_service().search_jobs(
+            keyword,
+            job_type=job_type,
+            location=location,
+            category=category,
+            status=request.args.get("status", "active"),
+            limit=request.args.get("limit", 20, type=int),
+            offset=request.args.get("offset", 0, type=int)
+        )
+        
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@jobs_bp.route("/recommendations/<student_id>", methods=["GET"])
+def get_job_recommendations(student_id):
+    """
+    Recommended active jobs for a student (TF-IDF match on profile and resume)
+    Query params:
+        - limit: number of jobs (default 4, max 50)
+    """
+    try:
+        result = get_recommendation_service().get_recommendations(
+            student_id,
+            limit=request.args.get("limit", 4, type=int)
+        )
         
         return jsonify(result), result.get("status_code", 200)
     
@@ -163,3 +223,41 @@ def search_jobs():
             "success": False,
             "error": str(e)
         }), 500
+
+
+@jobs_bp.route("/<job_id>/candidates", methods=["GET"])
+@require_admin
+def get_job_candidates(job_id):
+    """
+    Students whose parsed resumes best match a job posting (semantic similarity)
+    Query params:
+        - limit: number of students (default 10, max 50)
+    """
+    try:
+        result = get_matching_service().get_candidates_for_job(
+            job_id,
+            limit=request.args.get("limit", 10, type=int)
+        )
+        
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@jobs_bp.route("/match-index/stats", methods=["GET"])
+@require_admin
+def get_match_index_stats():
+    """Rows and search mode (exact/ivf) of the job and resume embedding indexes"""
+    try:
+        result = get_matching_service().get_index_stats()
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
@@ -1,16 +1,11 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from typing import List, Dict, Any
+from typing import Dict, Any
 import io
 import re
 
-router = APIRouter()
+from app.utils.skill_extractor import extract_skills
 
-# Example skill extraction from text
-SKILL_KEYWORDS = [
-    'python', 'java', 'c++', 'javascript', 'react', 'node', 'sql', 'excel', 'communication',
-    'leadership', 'teamwork', 'problem solving', 'project management', 'data analysis',
-    'machine learning', 'marketing', 'finance', 'design', 'writing', 'public speaking',
-]
+router = APIRouter()
 
 # Dummy PDF/DOCX text extraction (replace with pdfminer, python-docx, textract, etc.)
 def extract_text_from_file(file_bytes: bytes, filename: str) -> str:
@@ -21,17 +16,6 @@ def extract_text_from_file(file_bytes: bytes, filename: str) -> str:
     except Exception:
         return ''
 
-# Extract skills from text
-def extract_skills(text: str) -> List[str]:
-    text_lower = text.lower()
-    found = set()
-    for skill in SKILL_KEYWORDS:
-        if skill in text_lower:
-            found.add(skill)
-    # Also extract capitalized words as possible skills
-    found.update(re.findall(r'\b([A-Z][a-zA-Z]+)\b', text))
-    return list(found)
-
 # Extract ratings (dummy: look for lines like "Rating: 4/5" or "Score: 90")
 def extract_ratings(text: str) -> Dict[str, Any]:
     ratings = {}
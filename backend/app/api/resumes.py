@@ -1,11 +1,14 @@
 from flask import Blueprint, jsonify, request
 from app.services.resume_service import ResumeService
+from app.services.matching_service import MatchingService
+from app.utils.resume_extraction import ParseQueueFullError, get_resume_parse_executor
+from app.utils.parse_cache import file_digest, get_parse_cache
 from functools import wraps
-import io
-import re
+import os
 
 resumes_bp = Blueprint("resumes", __name__)
 _resume_service = None
+_matching_service = None
 
 
 def get_resume_service():
@@ -16,6 +19,14 @@ def get_resume_service():
     return _resume_service
 
 
+def get_matching_service():
+    """Lazy load semantic matching service on first use"""
+    global _matching_service
+    if _matching_service is None:
+        _matching_service = MatchingService()
+    return _matching_service
+
+
 def require_auth(f):
     """Decorator to check if user is authenticated (placeholder - implement with real auth)"""
     @wraps(f)
@@ -25,55 +36,50 @@ def require_auth(f):
     return decorated_function
 
 
-SKILL_KEYWORDS = [
-    'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
-    'node', 'html', 'css', 'sql', 'mysql', 'postgresql', 'mongodb', 'git',
-    'docker', 'kubernetes', 'aws', 'azure', 'linux', 'c++', 'c#', 'php',
-    'rest api', 'machine learning', 'data analysis', 'figma', 'photoshop',
-    'excel', 'powerpoint', 'word', 'microsoft office', 'agile', 'scrum',
-    'communication', 'leadership', 'teamwork', 'problem solving',
-    'project management', 'teaching', 'curriculum', 'child development',
-]
-
-
-def _extract_text_from_file(file) -> str:
-    """Extract plain text from PDF or DOCX file object."""
-    filename = (file.filename or '').lower()
-    file_bytes = file.read()
-
-    if filename.endswith('.pdf'):
-        import pdfplumber
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            return '\n'.join(page.extract_text() or '' for page in pdf.pages)
-
-    if filename.endswith('.docx'):
-        import docx
-        doc = docx.Document(io.BytesIO(file_bytes))
-        return '\n'.join(para.text for para in doc.paragraphs)
-
-    # DOC or unknown — best-effort UTF-8 decode
-    return file_bytes.decode('utf-8', errors='ignore')
-
-
-def _extract_skills(text: str) -> list:
-    text_lower = text.lower()
-    return [skill for skill in SKILL_KEYWORDS if skill in text_lower]
+# Files up to this size are parsed while the request waits (up to
+# RESUME_PARSE_SYNC_WAIT_SECONDS); larger files get a job id to poll.
+RESUME_PARSE_SYNC_MAX_BYTES = int(os.getenv("RESUME_PARSE_SYNC_MAX_BYTES", str(512 * 1024)))
+RESUME_PARSE_SYNC_WAIT_SECONDS = float(os.getenv("RESUME_PARSE_SYNC_WAIT_SECONDS", "8"))
+RESUME_PARSE_MAX_WAIT_SECONDS = 30.0
 
 
-def _extract_ratings(text: str) -> dict:
-    ratings = {}
-    for match in re.finditer(r'([\w ]+?)\s*[:\-]\s*(\d+)\s*/\s*(\d+)', text):
-        key = match.group(1).strip().lower()
-        ratings[key] = f'{match.group(2)}/{match.group(3)}'
-    for match in re.finditer(r'([\w ]+?)\s*[:\-]\s*(\d+)\s*%', text):
-        key = match.group(1).strip().lower()
-        ratings.setdefault(key, match.group(2))
-    return ratings
+def _parse_response(record):
+    """HTTP response for a parse job record (pending -> 202, finished -> the parse payload)."""
+    status = record["status"]
+    if status == "done":
+        return jsonify({"success": True, "job_id": record["job_id"], "status": status, **record["result"]}), 200
+    if status == "pending":
+        return jsonify({
+            "success": True,
+            "job_id": record["job_id"],
+            "status": status,
+            "poll_url": f"/api/resumes/parse/{record['job_id']}",
+        }), 202
+    return jsonify({
+        "success": False,
+        "job_id": record["job_id"],
+        "status": status,
+        "error": record.get("error"),
+        "resume_text": "",
+        "skills": [],
+        "ratings": {},
+    }), 504 if status == "timeout" else 422
 
 
 @resumes_bp.route("/parse", methods=["POST"])
 def parse_resume():
-    """Extract text, skills, and ratings from an uploaded resume file."""
+    """
+    Extract text, skills, and ratings from an uploaded resume file.
+
+    Parsing runs in a worker process. Small files are answered inline (200)
+    when they finish within RESUME_PARSE_SYNC_WAIT_SECONDS; otherwise the
+    response is 202 with a job_id for GET /parse/<job_id>. Files parsed
+    before (same bytes, same extractor version) are answered from the parse
+    cache without queueing.
+    Form fields: file, optional wait=false to always get a job id.
+    Nothing is stored or embedded here: saving the resume (POST/PUT /api/resumes)
+    embeds the stored row for semantic job matching.
+    """
     try:
         if 'file' not in request.files:
             return jsonify({"success": False, "error": "No file provided"}), 400
@@ -82,16 +88,24 @@ def parse_resume():
         if not file.filename:
             return jsonify({"success": False, "error": "No file selected"}), 400
 
-        resume_text = _extract_text_from_file(file)
-        skills = _extract_skills(resume_text)
-        ratings = _extract_ratings(resume_text)
-
-        return jsonify({
-            "success": True,
-            "resume_text": resume_text,
-            "skills": skills,
-            "ratings": ratings,
-        }), 200
+        file_bytes = file.read()
+        executor = get_resume_parse_executor()
+        cache = get_parse_cache()
+        digest = file_digest(file_bytes)
+        extractor = cache.extractor_key(file.filename, executor.max_pages)
+        cached = cache.get(digest, extractor)
+        if cached is not None:
+            return jsonify({"success": True, "status": "done", "cached": True, **cached}), 200
+
+        try:
+            job_id = executor.submit(file_bytes, file.filename, on_done=lambda parsed: cache.put(digest, extractor, parsed))
+        except ParseQueueFullError as e:
+            return jsonify({"success": False, "error": str(e)}), 503
+
+        wait = 0.0
+        if len(file_bytes) <= RESUME_PARSE_SYNC_MAX_BYTES and request.form.get('wait', 'true').lower() != 'false':
+            wait = RESUME_PARSE_SYNC_WAIT_SECONDS
+        return _parse_response(executor.result(job_id, wait=wait))
 
     except Exception as e:
         return jsonify({
@@ -103,6 +117,36 @@ def parse_resume():
         }), 500
 
 
+@resumes_bp.route("/parse/<job_id>", methods=["GET"])
+def get_parse_result(job_id):
+    """
+    Poll a resume parse job
+    Query params:
+        - wait: seconds to wait for the job to finish (default 0, max 30)
+    """
+    try:
+        wait = min(max(request.args.get("wait", 0.0, type=float), 0.0), RESUME_PARSE_MAX_WAIT_SECONDS)
+        record = get_resume_parse_executor().result(job_id, wait=wait)
+        if record is None:
+            return jsonify({"success": False, "error": "Unknown or expired parse job"}), 404
+        return _parse_response(record)
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@resumes_bp.route("/parse-stats", methods=["GET"])
+def get_parse_stats():
+    """Worker pool size, queue depth, outcome counters and parse cache hit rates of the resume parser"""
+    return jsonify({
+        "success": True,
+        "data": {**get_resume_parse_executor().stats(), "cache": get_parse_cache().stats()}
+    }), 200
+
+
 @resumes_bp.route("/user/<user_id>", methods=["GET"])
 def get_user_resumes(user_id):
     """Get all resumes for a specific user"""
@@ -185,7 +229,29 @@ def delete_resume(resume_id):
 def get_user_resumes_count(user_id):
     """Get the count of resumes for a specific user"""
     try:
-        result = get_resume_service().get_user_resumes_count(user_id)
+        result = get_resume_service().get_user_resumes_count(user_id, accuracy=request.args.get("accuracy", "exact"))
+        return jsonify(result), result.get("status_code", 200)
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@resumes_bp.route("/<resume_id>/job-matches", methods=["GET"])
+def get_resume_job_matches(resume_id):
+    """
+    Active jobs that best match a parsed resume (semantic similarity)
+    Query params:
+        - limit: number of jobs (default 10, max 50)
+    """
+    try:
+        result = get_matching_service().get_jobs_for_resume(
+            resume_id,
+            limit=request.args.get("limit", 10, type=int)
+        )
+        
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
@@ -117,7 +117,7 @@ def delete_student(student_id):
 def get_students_count():
     """Get total students count"""
     try:
-        result = get_student_service().get_students_count()
+        result = get_student_service().get_students_count(accuracy=request.args.get("accuracy", "exact"))
         return jsonify(result), result.get("status_code", 200)
     
     except Exception as e:
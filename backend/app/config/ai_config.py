@@ -0,0 +1,102 @@
+import os
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+	return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+# ── Inference backend ────────────────────────────────────────────────────────
+# "pytorch" (eager float32) or "onnx" (ONNX Runtime, optionally int8-quantized).
+# The ONNX graphs are exported by export_onnx_models.py, or on first load when
+# ONNX_EXPORT_ON_DEMAND is set; any ONNX failure falls back to PyTorch.
+AI_INFERENCE_BACKEND = os.getenv("AI_INFERENCE_BACKEND", "pytorch").strip().lower()
+ONNX_MODELS_DIR = os.getenv("ONNX_MODELS_DIR", os.path.join(_BACKEND_DIR, "data", "onnx_models"))
+ONNX_QUANTIZE = _env_flag("ONNX_QUANTIZE", "false")
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 = ONNX Runtime default
+ONNX_EXPORT_ON_DEMAND = _env_flag("ONNX_EXPORT_ON_DEMAND", "true")
+
+# ── Model registry ───────────────────────────────────────────────────────────
+# Heavy models (embed, zsl, whisper) are owned by app/ai_module/model_registry.py.
+# MODEL_MEMORY_BUDGET_MB caps the RSS the loaded models may add (0 = no cap;
+# least recently used unpinned models are unloaded first). Models idle longer
+# than MODEL_IDLE_UNLOAD_SECONDS are unloaded (0 = never). MODEL_PRELOAD lists
+# models to load at app creation — with GUNICORN_PRELOAD=true this happens in
+# the master, so workers share the weights copy-on-write. A model whose load
+# failed (e.g. Whisper on a flaky download) is retried after
+# MODEL_LOAD_RETRY_SECONDS instead of on every request.
+MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+MODEL_IDLE_UNLOAD_SECONDS = float(os.getenv("MODEL_IDLE_UNLOAD_SECONDS", "0"))
+MODEL_PRELOAD = [name.strip() for name in os.getenv("MODEL_PRELOAD", "").split(",") if name.strip()]
+MODEL_LOAD_RETRY_SECONDS = float(os.getenv("MODEL_LOAD_RETRY_SECONDS", "60"))
+MODEL_PINNED = [name.strip() for name in os.getenv("MODEL_PINNED", "").split(",") if name.strip()]
+GUNICORN_PRELOAD = _env_flag("GUNICORN_PRELOAD", "false")
+
+# ── Warm-up / readiness ──────────────────────────────────────────────────────
+# WARMUP_MODELS are loaded in parallel at startup and run one dummy inference
+# each (whisper: 1s of silence; ollama: an empty prompt with keep_alive).
+# /api/ready returns 503 until every READY_REQUIRED_MODELS entry is warm.
+WARMUP_ENABLED = _env_flag("WARMUP_ENABLED", "true")
+WARMUP_MODELS = [name.strip() for name in os.getenv("WARMUP_MODELS", "embed,zsl,whisper,ollama").split(",") if name.strip()]
+READY_REQUIRED_MODELS = [name.strip() for name in os.getenv("READY_REQUIRED_MODELS", "embed,zsl").split(",") if name.strip()]
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+WARMUP_OLLAMA_TIMEOUT_SECONDS = float(os.getenv("WARMUP_OLLAMA_TIMEOUT_SECONDS", "120"))
+
+# ── Embedding model (Path 1) ─────────────────────────────────────────────────
+EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "sentence-transformers/all-roberta-large-v1")
+
+# Dynamic micro-batching in front of the embedding model. Concurrent /hf-embed
+# calls are held for up to EMBED_BATCH_MAX_WAIT_MS and run as one forward pass,
+# capped by text count and by padded token count (batch size x longest text).
+EMBED_BATCHING_ENABLED = _env_flag("EMBED_BATCHING_ENABLED", "true")
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "8"))
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "64"))
+EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "8192"))
+EMBED_BATCH_TIMEOUT_SECONDS = float(os.getenv("EMBED_BATCH_TIMEOUT_SECONDS", "120"))
+
+# Content-addressed embedding cache (model name + normalized text hash).
+# The disk tier is opt-in: point EMBED_CACHE_DISK_DIR at a persistent volume.
+EMBED_CACHE_ENABLED = _env_flag("EMBED_CACHE_ENABLED", "true")
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "4096"))
+EMBED_CACHE_DISK_DIR = os.getenv("EMBED_CACHE_DISK_DIR", "").strip()
+EMBED_CACHE_DISK_MAX_ROWS = int(os.getenv("EMBED_CACHE_DISK_MAX_ROWS", "200000"))
+
+# Precomputed question-bank / ideal-answer embeddings (built offline by
+# build_question_embeddings.py, refreshed when questions are added or rated).
+QUESTION_EMBEDDINGS_PATH = os.getenv(
+	"QUESTION_EMBEDDINGS_PATH",
+	os.path.join(_BACKEND_DIR, "data", "embeddings", "question_bank"),
+)
+QUESTION_EMBEDDINGS_DTYPE = os.getenv("QUESTION_EMBEDDINGS_DTYPE", "float16")
+QUESTION_EMBEDDINGS_AUTO_REFRESH = _env_flag("QUESTION_EMBEDDINGS_AUTO_REFRESH", "true")
+
+# Semantic resume <-> job matching: job postings and parsed resumes embedded
+# with EMBED_MODEL_NAME into the same kind of store (build_match_embeddings.py
+# builds both; job writes and resume saves keep them current when
+# MATCH_EMBEDDINGS_AUTO_REFRESH is on). Search is exact until a store reaches
+# MATCH_IVF_MIN_ROWS rows, then an IVF index probes MATCH_IVF_NPROBE clusters.
+JOB_EMBEDDINGS_PATH = os.getenv("JOB_EMBEDDINGS_PATH", os.path.join(_BACKEND_DIR, "data", "embeddings", "jobs"))
+RESUME_EMBEDDINGS_PATH = os.getenv("RESUME_EMBEDDINGS_PATH", os.path.join(_BACKEND_DIR, "data", "embeddings", "resumes"))
+MATCH_EMBEDDINGS_DTYPE = os.getenv("MATCH_EMBEDDINGS_DTYPE", "float16")
+MATCH_EMBEDDINGS_AUTO_REFRESH = _env_flag("MATCH_EMBEDDINGS_AUTO_REFRESH", "true")
+MATCH_RESUME_MAX_CHARS = int(os.getenv("MATCH_RESUME_MAX_CHARS", "4000"))
+MATCH_IVF_MIN_ROWS = int(os.getenv("MATCH_IVF_MIN_ROWS", "20000"))  # 0 = always exact
+MATCH_IVF_NPROBE = int(os.getenv("MATCH_IVF_NPROBE", "8"))
+
+# ── ZSL classification (Path 2) ──────────────────────────────────────────────
+ZSL_MODEL_NAME = os.getenv("ZSL_MODEL_NAME", "cross-encoder/nli-roberta-base")
+
+# Upper bound on premise x hypothesis pairs per NLI forward pass; a batched
+# /hf-classify request larger than this is split into length-sorted chunks.
+ZSL_MAX_PAIRS_PER_PASS = int(os.getenv("ZSL_MAX_PAIRS_PER_PASS", "64"))
+
+# Long answers: "chunk" splits the premise into overlapping token windows
+# (at most ZSL_MAX_WINDOWS per dimension, all in the same batched pass) and
+# aggregates per-label scores with ZSL_CHUNK_AGGREGATION (max|mean).
+# "truncate" keeps the old 350-character cut.
+ZSL_CHUNKING_MODE = os.getenv("ZSL_CHUNKING_MODE", "chunk").strip().lower()
+ZSL_CHUNK_AGGREGATION = os.getenv("ZSL_CHUNK_AGGREGATION", "max").strip().lower()
+ZSL_MAX_WINDOWS = int(os.getenv("ZSL_MAX_WINDOWS", "4"))
+ZSL_WINDOW_OVERLAP_TOKENS = int(os.getenv("ZSL_WINDOW_OVERLAP_TOKENS", "64"))
+ZSL_MAX_INPUT_CHARS = int(os.getenv("ZSL_MAX_INPUT_CHARS", "8000"))
@@ -1,12 +1,36 @@
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import logging
-import requests
+from app.supabase_client import get_supabase_client
+from app.utils.query_executor import QueryResult, get_query_executor
+from app.utils.snapshot_cache import SnapshotCache, compute_etag, is_successful_result
 
 logger = logging.getLogger(__name__)
 logger.info("Initializing analytics_service module")
 
+# Seconds a dashboard snapshot is served as fresh; override with
+# ANALYTICS_CACHE_TTLS="dashboard_metrics=30,recent_activity=10".
+DEFAULT_SNAPSHOT_TTLS = {
+    "dashboard_metrics": 30,
+    "user_stats": 60,
+    "job_stats": 60,
+    "recent_activity": 15,
+}
+
+# recent_activity limits are rounded up to one of these, so the snapshot
+# cache holds a handful of entries whatever ?limit= callers send.
+RECENT_ACTIVITY_LIMITS = (5, 10, 20, 50)
+
+
+def _snapshot_ttls() -> Dict[str, float]:
+    ttls = dict(DEFAULT_SNAPSHOT_TTLS)
+    for item in os.getenv("ANALYTICS_CACHE_TTLS", "").split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
 
 class AnalyticsService:
     """Service for handling analytics and reporting operations"""
@@ -17,6 +41,21 @@ class AnalyticsService:
         
         logger.info(f"AnalyticsService __init__: SUPABASE_URL={self.supabase_url}, has_key={bool(self.supabase_key)}")
         
+        self.client = get_supabase_client()
+        self.query_executor = get_query_executor()
+        # Dashboard fan-out deadline: slower sub-queries are reported, not awaited.
+        self.query_deadline_seconds = float(os.getenv("ANALYTICS_QUERY_DEADLINE_SECONDS", "5"))
+        # Dashboard snapshots: fresh for the per-metric TTL, then served stale
+        # (while one background refresh runs) for up to stale_ttl more seconds.
+        self.snapshot_ttls = _snapshot_ttls()
+        self.snapshot_stale_ttl = float(os.getenv("ANALYTICS_CACHE_STALE_SECONDS", "300"))
+        self.snapshots = SnapshotCache(
+            default_stale_ttl=self.snapshot_stale_ttl,
+            # Partial fan-out results (a source missed its deadline) are not kept.
+            cacheable=lambda result: is_successful_result(result) and not result.get("partial"),
+            # The ETag covers the payload only, not timings_ms that differ on every load.
+            etag_of=lambda result: result.get("data") if isinstance(result, dict) else result,
+        )
         if self.supabase_url and self.supabase_key:
             self.api_url = f"{self.supabase_url}/rest/v1"
             self.headers = {
@@ -30,69 +69,17 @@ class AnalyticsService:
             self.headers = None
 
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make a request to Supabase REST API"""
-        if not self.api_url or not self.headers:
-            return {
-                "success": False,
-                "error": "Supabase not configured",
-                "status_code": 500
-            }
-
-        try:
-            url = f"{self.api_url}{endpoint}"
-            
-            if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params)
-            elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method == "PUT":
-                response = requests.put(url, headers=self.headers, json=data)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers)
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unsupported HTTP method: {method}",
-                    "status_code": 400
-                }
-
-            if response.status_code in [200, 201]:
-                return {
-                    "success": True,
-                    "data": response.json() if response.text else None,
-                    "status_code": response.status_code
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.text or f"HTTP {response.status_code}",
-                    "status_code": response.status_code
-                }
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params)
 
-        except Exception as e:
-            logger.error(f"Error making request to {endpoint}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "status_code": 500
-            }
-
-    def get_students_count(self) -> Dict[str, Any]:
-        """Get total students count"""
+    def get_students_count(self, accuracy: str = "exact") -> Dict[str, Any]:
+        """Get total students count (server-side COUNT, see SupabaseClient.count)"""
         try:
             params = {
-                "role": "eq.student",
-                "select": "id"
+                "role": "eq.student"
             }
-            
-            result = self._make_request("GET", "/profiles", params=params)
-            
-            if result.get("success"):
-                count = len(result.get("data", []))
-                result["count"] = count
-                result["data"] = {"count": count}
-            
-            return result
+
+            return self.client.count("/profiles", params=params, mode=accuracy)
         
         except Exception as e:
             logger.error(f"Error getting students count: {str(e)}")
@@ -102,19 +89,12 @@ class AnalyticsService:
                 "status_code": 500
             }
 
-    def get_employers_count(self) -> Dict[str, Any]:
+    def get_employers_count(self, accuracy: str = "exact") -> Dict[str, Any]:
         """Get total employers count"""
         try:
-            params = {"select": "id"}
-            
-            result = self._make_request("GET", "/employers", params=params)
-            
-            if result.get("success"):
-                count = len(result.get("data", []))
-                result["count"] = count
-                result["data"] = {"count": count}
-            
-            return result
+            params = {}
+
+            return self.client.count("/employers", params=params, mode=accuracy)
         
         except Exception as e:
             logger.error(f"Error getting employers count: {str(e)}")
@@ -124,24 +104,15 @@ class AnalyticsService:
                 "status_code": 500
             }
 
-    def get_interviews_count(self, status: str = "completed") -> Dict[str, Any]:
+    def get_interviews_count(self, status: str = "completed", accuracy: str = "exact") -> Dict[str, Any]:
         """Get interviews count by status"""
         try:
-            params = {
-                "select": "id"
-            }
+            params = {}
             
             if status:
                 params["status"] = f"eq.{status}"
-            
-            result = self._make_request("GET", "/interviews", params=params)
-            
-            if result.get("success"):
-                count = len(result.get("data", []))
-                result["count"] = count
-                result["data"] = {"count": count}
-            
-            return result
+
+            return self.client.count("/interviews", params=params, mode=accuracy)
         
         except Exception as e:
             logger.error(f"Error getting interviews count: {str(e)}")
@@ -151,22 +122,14 @@ class AnalyticsService:
                 "status_code": 500
             }
 
-    def get_events_count(self) -> Dict[str, Any]:
+    def get_events_count(self, accuracy: str = "exact") -> Dict[str, Any]:
         """Get active events count"""
         try:
             params = {
-                "select": "id",
-                "gte": f"end_date.gte.{datetime.utcnow().isoformat()}"
+                "end_date": f"gte.{datetime.utcnow().isoformat()}"
             }
-            
-            result = self._make_request("GET", "/career_events", params=params)
-            
-            if result.get("success"):
-                count = len(result.get("data", []))
-                result["count"] = count
-                result["data"] = {"count": count}
-            
-            return result
+
+            return self.client.count("/career_events", params=params, mode=accuracy)
         
         except Exception as e:
             logger.error(f"Error getting events count: {str(e)}")
@@ -177,19 +140,17 @@ class AnalyticsService:
             }
 
     def get_user_stats(self) -> Dict[str, Any]:
-        """Get user statistics by role"""
+        """Get user statistics by role (one server-side GROUP BY, see SupabaseClient.group_count)"""
         try:
-            params = {"select": "role"}
-            
-            result = self._make_request("GET", "/profiles", params=params)
+            result = self.client.group_count("/profiles", "role")
             
             if result.get("success"):
-                data = result.get("data", [])
+                roles = result.get("data", {})
                 stats = {
-                    "students": sum(1 for u in data if u.get("role") == "student"),
-                    "admins": sum(1 for u in data if u.get("role") == "admin"),
-                    "employers": sum(1 for u in data if u.get("role") == "employer"),
-                    "total": len(data)
+                    "students": roles.get("student", 0),
+                    "admins": roles.get("admin", 0),
+                    "employers": roles.get("employer", 0),
+                    "total": result.get("total", 0)
                 }
                 result["data"] = stats
             
@@ -204,19 +165,17 @@ class AnalyticsService:
             }
 
     def get_job_stats(self) -> Dict[str, Any]:
-        """Get job statistics"""
+        """Get job statistics by status"""
         try:
-            params = {"select": "status"}
-            
-            result = self._make_request("GET", "/jobs", params=params)
+            result = self.client.group_count("/jobs", "status")
             
             if result.get("success"):
-                data = result.get("data", [])
+                statuses = result.get("data", {})
                 stats = {
-                    "active": sum(1 for j in data if j.get("status") == "active"),
-                    "closed": sum(1 for j in data if j.get("status") == "closed"),
-                    "archived": sum(1 for j in data if j.get("status") == "archived"),
-                    "total": len(data)
+                    "active": statuses.get("active", 0),
+                    "closed": statuses.get("closed", 0),
+                    "archived": statuses.get("archived", 0),
+                    "total": result.get("total", 0)
                 }
                 result["data"] = stats
             
@@ -254,53 +213,95 @@ class AnalyticsService:
                 "status_code": 500
             }
 
+    def get_snapshot(self, metric: str, force_refresh: bool = False, **kwargs) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Serve get_<metric>(**kwargs) from the snapshot cache; returns (result, cache meta)"""
+        if metric not in self.snapshot_ttls:
+            raise ValueError(f"Unknown dashboard metric: {metric}")
+        loader = getattr(self, f"get_{metric}")
+        if metric == "recent_activity":
+            limit = max(1, int(kwargs.get("limit") or 10))
+            if limit > RECENT_ACTIVITY_LIMITS[-1]:
+                return {
+                    "success": False,
+                    "error": f"limit must be at most {RECENT_ACTIVITY_LIMITS[-1]}",
+                    "status_code": 400
+                }, {}
+            kwargs["limit"] = next(size for size in RECENT_ACTIVITY_LIMITS if size >= limit)
+        key = (metric, tuple(sorted(kwargs.items())))
+        result, meta = self.snapshots.get(
+            key,
+            lambda: loader(**kwargs),
+            ttl=self.snapshot_ttls[metric],
+            force_refresh=force_refresh,
+        )
+        if metric == "recent_activity" and isinstance(result.get("data"), list) and len(result["data"]) > limit:
+            # The snapshot holds the rounded-up limit: trim a copy, and tag it on its own.
+            result = {**result, "data": result["data"][:limit]}
+            meta = {**meta, "etag": compute_etag(result["data"])}
+        return result, meta
+
+    def invalidate_snapshots(self, metric: Optional[str] = None) -> int:
+        """Drop cached dashboard snapshots (all, or one metric)"""
+        return self.snapshots.invalidate(prefix=metric) if metric else self.snapshots.invalidate()
+
+    @staticmethod
+    def _query_report(results: Dict[str, QueryResult]) -> Dict[str, Any]:
+        """Per-source error flags and timings for a fanned-out request."""
+        return {
+            "partial": any(not r.ok for r in results.values()),
+            "errors": {name: r.error for name, r in results.items() if not r.ok},
+            "timings_ms": {name: round(r.elapsed_ms or 0.0, 1) for name, r in results.items()},
+        }
+
     def get_recent_activity(self, limit: int = 10) -> Dict[str, Any]:
         """Get recent activity feed combining various events"""
         try:
             activities = []
-            
-            # Recent interviews
-            interviews_result = self._make_request("GET", "/interviews", params={
-                "select": "user_id,created_at",
-                "order": "created_at.desc",
-                "limit": str(limit // 3)
-            })
-            
-            if interviews_result.get("success"):
-                for interview in interviews_result.get("data", []):
+            per_source = str(limit // 3)
+
+            # The three feeds are independent: fetch them concurrently.
+            results = self.query_executor.run({
+                # Recent interviews
+                "interviews": lambda: self._make_request("GET", "/interviews", params={
+                    "select": "user_id,created_at",
+                    "order": "created_at.desc",
+                    "limit": per_source
+                }),
+                # Recent student registrations
+                "registrations": lambda: self._make_request("GET", "/profiles", params={
+                    "select": "full_name,created_at",
+                    "role": "eq.student",
+                    "order": "created_at.desc",
+                    "limit": per_source
+                }),
+                # Recent job postings
+                "jobs": lambda: self._make_request("GET", "/jobs", params={
+                    "select": "title,employer_id,created_at",
+                    "order": "created_at.desc",
+                    "limit": per_source
+                }),
+            }, deadline_seconds=self.query_deadline_seconds)
+
+            if results["interviews"].ok:
+                for interview in results["interviews"].value.get("data") or []:
                     activities.append({
                         "type": "interview",
                         "text": f"Student {interview.get('user_id', 'Unknown')} completed mock interview",
                         "timestamp": interview.get("created_at"),
                         "time_ago": self._get_time_ago(interview.get("created_at"))
                     })
-            
-            # Recent student registrations
-            profiles_result = self._make_request("GET", "/profiles", params={
-                "select": "full_name,created_at",
-                "eq": "role.eq.student",
-                "order": "created_at.desc",
-                "limit": str(limit // 3)
-            })
-            
-            if profiles_result.get("success"):
-                for profile in profiles_result.get("data", []):
+
+            if results["registrations"].ok:
+                for profile in results["registrations"].value.get("data") or []:
                     activities.append({
                         "type": "registration",
                         "text": f"New student registration: {profile.get('full_name', 'Unknown')}",
                         "timestamp": profile.get("created_at"),
                         "time_ago": self._get_time_ago(profile.get("created_at"))
                     })
-            
-            # Recent job postings
-            jobs_result = self._make_request("GET", "/jobs", params={
-                "select": "title,employer_id,created_at",
-                "order": "created_at.desc",
-                "limit": str(limit // 3)
-            })
-            
-            if jobs_result.get("success"):
-                for job in jobs_result.get("data", []):
+
+            if results["jobs"].ok:
+                for job in results["jobs"].value.get("data") or []:
                     activities.append({
                         "type": "job",
                         "text": f"New job posted: {job.get('title', 'Unknown')}",
@@ -309,12 +310,13 @@ class AnalyticsService:
                     })
             
             # Sort by timestamp and limit
-            activities.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+            activities.sort(key=lambda x: x.get("timestamp") or "", reverse=True)
             activities = activities[:limit]
             
             return {
                 "success": True,
                 "data": activities,
+                **self._query_report(results),
                 "status_code": 200
             }
         
@@ -327,24 +329,25 @@ class AnalyticsService:
             }
 
     def get_dashboard_metrics(self) -> Dict[str, Any]:
-        """Get all dashboard metrics"""
+        """Get all dashboard metrics (counts fetched concurrently; failed ones report 0 plus an error flag)"""
         try:
             metrics = {}
             
             # Get all counts
-            students = self.get_students_count()
-            employers = self.get_employers_count()
-            interviews = self.get_interviews_count()
-            events = self.get_events_count()
-            
-            metrics["total_students"] = students.get("data", {}).get("count", 0) if students.get("success") else 0
-            metrics["total_employers"] = employers.get("data", {}).get("count", 0) if employers.get("success") else 0
-            metrics["total_interviews"] = interviews.get("data", {}).get("count", 0) if interviews.get("success") else 0
-            metrics["active_events"] = events.get("data", {}).get("count", 0) if events.get("success") else 0
+            results = self.query_executor.run({
+                "total_students": self.get_students_count,
+                "total_employers": self.get_employers_count,
+                "total_interviews": self.get_interviews_count,
+                "active_events": self.get_events_count,
+            }, deadline_seconds=self.query_deadline_seconds)
+
+            for name, result in results.items():
+                metrics[name] = result.value.get("data", {}).get("count", 0) if result.ok else 0
             
             return {
                 "success": True,
                 "data": metrics,
+                **self._query_report(results),
                 "status_code": 200
             }
         
@@ -1,5 +1,5 @@
 import os
-import requests
+from app.supabase_client import get_supabase_client
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -9,6 +9,7 @@ class ApplicationService:
     def __init__(self):
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_KEY')
+        self.client = get_supabase_client()
         self.headers = {
             'apikey': self.supabase_key,
             'Content-Type': 'application/json'
@@ -36,7 +37,7 @@ class ApplicationService:
                 'cover_letter_id': cover_letter_id
             }
             
-            response = requests.post(
+            response = self.client.post(
                 f'{self.supabase_url}/rest/v1/applications',
                 json=data,
                 headers=headers
@@ -71,7 +72,7 @@ class ApplicationService:
             
             query = f'student_id=eq.{student_id}&limit={limit}&offset={offset}&order=application_date.desc'
             
-            response = requests.get(
+            response = self.client.get(
                 f'{self.supabase_url}/rest/v1/applications?{query}',
                 headers=headers
             )
@@ -106,7 +107,7 @@ class ApplicationService:
             
             query = f'job_id=eq.{job_id}&limit={limit}&offset={offset}&order=application_date.desc'
             
-            response = requests.get(
+            response = self.client.get(
                 f'{self.supabase_url}/rest/v1/applications?{query}',
                 headers=headers
             )
@@ -146,7 +147,7 @@ class ApplicationService:
             if employer_id:
                 query += f'&employer_id=eq.{employer_id}'
             
-            response = requests.get(
+            response = self.client.get(
                 f'{self.supabase_url}/rest/v1/applications?{query}',
                 headers=headers
             )
@@ -178,7 +179,7 @@ class ApplicationService:
             if auth_token:
                 headers['Authorization'] = f'Bearer {auth_token}'
             
-            response = requests.get(
+            response = self.client.get(
                 f'{self.supabase_url}/rest/v1/applications?id=eq.{application_id}',
                 headers=headers
             )
@@ -223,7 +224,7 @@ class ApplicationService:
             if reviewed_by:
                 data['reviewed_by'] = reviewed_by
             
-            response = requests.patch(
+            response = self.client.patch(
                 f'{self.supabase_url}/rest/v1/applications?id=eq.{application_id}',
                 json=data,
                 headers=headers
@@ -257,7 +258,7 @@ class ApplicationService:
             
             query = f'student_id=eq.{student_id}&job_id=eq.{job_id}&status=neq.withdrawn'
             
-            response = requests.get(
+            response = self.client.get(
                 f'{self.supabase_url}/rest/v1/applications?{query}',
                 headers=headers
             )
@@ -284,44 +285,23 @@ class ApplicationService:
             }
     
     def get_application_stats(self, auth_token: str = None) -> Dict[str, Any]:
-        """Get application statistics"""
+        """Get application statistics (one GROUP BY status, see SupabaseClient.group_count)"""
         try:
             headers = self.headers.copy()
             if auth_token:
                 headers['Authorization'] = f'Bearer {auth_token}'
             
-            # Get total applications
-            total_response = requests.get(
-                f'{self.supabase_url}/rest/v1/applications?select=id',
-                headers=headers
-            )
-            
-            # Get pending applications
-            pending_response = requests.get(
-                f'{self.supabase_url}/rest/v1/applications?status=eq.pending&select=id',
-                headers=headers
-            )
-            
-            # Get accepted applications
-            accepted_response = requests.get(
-                f'{self.supabase_url}/rest/v1/applications?status=eq.accepted&select=id',
-                headers=headers
-            )
-            
-            # Get rejected applications
-            rejected_response = requests.get(
-                f'{self.supabase_url}/rest/v1/applications?status=eq.rejected&select=id',
-                headers=headers
-            )
+            result = self.client.group_count('/applications', 'status', headers=headers)
             
-            if all(resp.status_code == 200 for resp in [total_response, pending_response, accepted_response, rejected_response]):
+            if result.get('success'):
+                statuses = result.get('data', {})
                 return {
                     'success': True,
                     'data': {
-                        'total': len(total_response.json()),
-                        'pending': len(pending_response.json()),
-                        'accepted': len(accepted_response.json()),
-                        'rejected': len(rejected_response.json())
+                        'total': result.get('total', 0),
+                        'pending': statuses.get('pending', 0),
+                        'accepted': statuses.get('accepted', 0),
+                        'rejected': statuses.get('rejected', 0)
                     },
                     'status_code': 200
                 }
@@ -351,7 +331,7 @@ class ApplicationService:
                 'updated_at': datetime.utcnow().isoformat()
             }
             
-            response = requests.patch(
+            response = self.client.patch(
                 f'{self.supabase_url}/rest/v1/applications?id=eq.{application_id}',
                 json=data,
                 headers=headers
@@ -2,7 +2,7 @@ import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
-import requests
+from app.supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,7 @@ class EmployerService:
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
         self.key = os.getenv("SUPABASE_KEY")
+        self.client = get_supabase_client()
         self.headers = {
             "apikey": self.key,
             "Authorization": f"Bearer {self.key}",
@@ -66,7 +67,7 @@ class EmployerService:
             endpoint = f"{self.url}/rest/v1/employers"
             # Add Prefer header to get the created record back
             headers_with_prefer = {**self.headers, "Prefer": "return=representation"}
-            response = requests.post(endpoint, json=data, headers=headers_with_prefer)
+            response = self.client.post(endpoint, json=data, headers=headers_with_prefer)
             response.raise_for_status()
             
             result_data = response.json() if response.text else []
@@ -100,7 +101,7 @@ class EmployerService:
         try:
             # Use Supabase REST API directly
             endpoint = f"{self.url}/rest/v1/employers?select=*"
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.client.get(endpoint, headers=self.headers)
             response.raise_for_status()
             
             data = response.json() if response.text else []
@@ -136,7 +137,7 @@ class EmployerService:
         """
         try:
             endpoint = f"{self.url}/rest/v1/employers?id=eq.{employer_id}&select=*"
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.client.get(endpoint, headers=self.headers)
             response.raise_for_status()
             
             data = response.json() if response.text else []
@@ -188,7 +189,7 @@ class EmployerService:
             endpoint = f"{self.url}/rest/v1/employers?id=eq.{employer_id}"
             # Add Prefer header to get the updated record back
             headers_with_prefer = {**self.headers, "Prefer": "return=representation"}
-            response = requests.patch(endpoint, json=data, headers=headers_with_prefer)
+            response = self.client.patch(endpoint, json=data, headers=headers_with_prefer)
             response.raise_for_status()
             
             result_data = response.json() if response.text else []
@@ -224,7 +225,7 @@ class EmployerService:
         """
         try:
             endpoint = f"{self.url}/rest/v1/employers?id=eq.{employer_id}"
-            response = requests.delete(endpoint, headers=self.headers)
+            response = self.client.delete(endpoint, headers=self.headers)
             response.raise_for_status()
             
             return {
@@ -254,7 +255,7 @@ class EmployerService:
         try:
             # Get all employers first
             endpoint = f"{self.url}/rest/v1/employers?select=*"
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.client.get(endpoint, headers=self.headers)
             response.raise_for_status()
             
             employers = response.json() if response.text else []
@@ -305,7 +306,7 @@ class EmployerService:
         """
         try:
             endpoint = f"{self.url}/rest/v1/employers?select=*"
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.client.get(endpoint, headers=self.headers)
             response.raise_for_status()
             
             employers = response.json() if response.text else []
@@ -1,55 +1,23 @@
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime
 import logging
 import uuid
-import requests
-import json
+from app.supabase_client import get_supabase_client
+from app.utils.registration_store import get_registration_store
+from app.utils.snapshot_cache import SnapshotCache
 
 logger = logging.getLogger(__name__)
 logger.info("Initializing event_service module")
 
 # Temporary in-memory storage for career events while debugging PostgREST schema cache issue
 _events_db: Dict[str, Dict[str, Any]] = {}
-# In-memory storage for event registrations: {event_id: [student_ids]}
-_registrations_db: Dict[str, List[str]] = {}
-
-# File path for persistent registration storage
-import sys
-_backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-REGISTRATIONS_FILE = os.path.join(_backend_dir, "data", "registrations.json")
-print(f"[INIT] REGISTRATIONS_FILE = {REGISTRATIONS_FILE}", flush=True)
-
-def _ensure_registrations_file():
-    """Ensure registrations file exists"""
-    os.makedirs(os.path.dirname(REGISTRATIONS_FILE), exist_ok=True)
-    if not os.path.exists(REGISTRATIONS_FILE):
-        with open(REGISTRATIONS_FILE, 'w') as f:
-            json.dump({}, f)
-
-def _load_registrations():
-    """Load registrations from file"""
-    try:
-        _ensure_registrations_file()
-        with open(REGISTRATIONS_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading registrations: {e}")
-        return {}
-
-def _save_registrations(registrations: Dict[str, List[str]]):
-    """Save registrations to file"""
-    try:
-        print(f"[SAVE] Attempting to save to {REGISTRATIONS_FILE}", flush=True)
-        _ensure_registrations_file()
-        print(f"[SAVE] File ensured", flush=True)
-        with open(REGISTRATIONS_FILE, 'w') as f:
-            json.dump(registrations, f, indent=2)
-        print(f"[SAVE] Wrote {len(registrations)} events", flush=True)
-        logger.info(f"Saved registrations for {len(registrations)} events to {REGISTRATIONS_FILE}")
-    except Exception as e:
-        print(f"[SAVE] ERROR: {e}", flush=True)
-        logger.error(f"Error saving registrations to {REGISTRATIONS_FILE}: {e}")
+# Event registrations live in a SQLite store shared by all workers
+# (app/utils/registration_store.py); the old data/registrations.json is
+# imported into it on first use.
+
+# Cache keys: the full career_events list, and one entry per event id.
+EVENT_LIST_KEY = ("events", "all")
 
 
 class EventService:
@@ -61,19 +29,24 @@ class EventService:
     """
 
     def __init__(self):
-        print(f"[INIT] REGISTRATIONS_FILE = {REGISTRATIONS_FILE}", flush=True)
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_KEY")
         self.use_mock_data = True  # Temporarily use in-memory storage
+        self.client = get_supabase_client()
         
-        # Load persistent registrations from file
-        global _registrations_db
-        print(f"[INIT] Loading registrations from {REGISTRATIONS_FILE}...", flush=True)
-        _registrations_db = _load_registrations()
-        print(f"[INIT] Loaded {len(_registrations_db)} events from file", flush=True)
+        self.registrations = get_registration_store()
+        # Read-through cache for career_events rows (registration counts are
+        # added per request and never cached). Writes through this service
+        # invalidate it; edits made elsewhere show up within the TTL.
+        self.event_cache = SnapshotCache(
+            default_ttl=float(os.getenv("EVENT_CACHE_TTL_SECONDS", "60")),
+            default_stale_ttl=float(os.getenv("EVENT_CACHE_STALE_SECONDS", "300")),
+            # "Not found" / failed lookups come back as None; don't pin them.
+            cacheable=lambda value: value is not None,
+        )
         
         logger.info(f"EventService __init__: SUPABASE_URL={self.supabase_url}, has_key={bool(self.supabase_key)}")
-        logger.info(f"Loaded {len(_registrations_db)} events with registrations from file")
+        logger.info(f"Registration store {self.registrations.path}: {self.registrations.stats()}")
         
         if self.supabase_url and self.supabase_key:
             # Use direct REST API endpoint for career_events table
@@ -88,7 +61,7 @@ class EventService:
             self.api_url = None
             self.headers = None
         
-        logger.info("EventService initialized with persistent file storage for registrations")
+        logger.info("EventService initialized with SQLite storage for registrations")
 
     def _fetch_event_from_supabase(self, event_id: str) -> Optional[Dict[str, Any]]:
         if not self.api_url or not self.headers:
@@ -100,7 +73,7 @@ class EventService:
                 "id": f"eq.{event_id}",
                 "limit": "1"
             }
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            response = self.client.get(url, headers=self.headers, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             return data[0] if data else None
@@ -108,6 +81,56 @@ class EventService:
             logger.error(f"Error fetching event {event_id} from Supabase: {e}", exc_info=True)
             return None
 
+    def _load_all_events(self) -> List[Dict[str, Any]]:
+        """Fetch every career event (Supabase, or memory storage when not configured)"""
+        if self.api_url and self.headers:
+            url = f"{self.api_url}/career_events"
+            response = self.client.get(url, headers=self.headers, timeout=10)
+            response.raise_for_status()
+            all_events = response.json()
+            logger.info(f"Fetched {len(all_events)} career events from Supabase")
+        else:
+            # Fallback to memory storage if Supabase not configured
+            all_events = [dict(e) for e in _events_db.values()]
+            logger.info(f"Fetched {len(all_events)} career events from memory storage")
+        return all_events
+
+    def _load_event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """One event: from the cached full list when it is fresh, else Supabase, else memory"""
+        cached_events = self.event_cache.peek(EVENT_LIST_KEY)
+        if cached_events is not None:
+            for event in cached_events:
+                if event.get("id") == event_id:
+                    return event
+        event = self._fetch_event_from_supabase(event_id)
+        if not event and event_id in _events_db:
+            event = dict(_events_db[event_id])
+        return event
+
+    def _get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        event, _ = self.event_cache.get(("event", event_id), lambda: self._load_event(event_id))
+        return event
+
+    def invalidate_event_cache(self, event_id: Optional[str] = None) -> None:
+        """Drop the cached list (and one event, or every event when no id is given)"""
+        self.event_cache.invalidate(key=EVENT_LIST_KEY)
+        if event_id:
+            self.event_cache.invalidate(key=("event", event_id))
+        else:
+            self.event_cache.invalidate(prefix="event")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Event cache counters (hit rate, entries)"""
+        return {
+            "success": True,
+            "data": {
+                "ttl": self.event_cache.default_ttl,
+                "stale_ttl": self.event_cache.default_stale_ttl,
+                **self.event_cache.stats()
+            },
+            "status_code": 200
+        }
+
     def create_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new career event
@@ -151,8 +174,7 @@ class EventService:
 
             # Store in memory
             _events_db[event_id] = data
-            # Initialize empty registrations for this event
-            _registrations_db[event_id] = []
+            self.invalidate_event_cache(event_id)
             logger.info(f"Created event {event_id} in memory storage")
             
             return {
@@ -170,40 +192,29 @@ class EventService:
                 "status_code": 500
             }
 
-    def get_all_events(self, event_type: Optional[str] = None) -> Dict[str, Any]:
+    def get_all_events(self, event_type: Optional[str] = None, student_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get all career events, optionally filtered by type
         
         Args:
             event_type: Optional filter by event type
+            student_id: Optional student to compute isRegistered for
         
         Returns:
             List of all events with registration counts
         """
         try:
-            # Fetch from Supabase via REST API
-            if self.api_url and self.headers:
-                url = f"{self.api_url}/career_events"
-                params = {}
-                if event_type:
-                    params["event_type"] = f"eq.{event_type}"
-                
-                response = requests.get(url, headers=self.headers, params=params, timeout=10)
-                response.raise_for_status()
-                all_events = response.json()
-                
-                logger.info(f"Fetched {len(all_events)} career events from Supabase")
-            else:
-                # Fallback to memory storage if Supabase not configured
-                all_events = list(_events_db.values())
-                
-                if event_type:
-                    all_events = [e for e in all_events if e.get("event_type") == event_type]
-                
-                logger.info(f"Fetched {len(all_events)} career events from memory storage")
+            all_events, _ = self.event_cache.get(EVENT_LIST_KEY, self._load_all_events)
+            
+            # Filtered views come from the cached full list
+            if event_type:
+                all_events = [e for e in all_events if e.get("event_type") == event_type]
             
-            # Add registration count to each event
-            all_events = [self._add_registration_count(e) for e in all_events]
+            # Add registration count (and the student's flag) to each event:
+            # one read of the count table plus one reverse-index lookup
+            counts = self.registrations.counts()
+            registered_ids = self.registrations.events_for_student(student_id) if student_id else None
+            all_events = [self._add_registration_count(e, counts, registered_ids) for e in all_events]
             
             # Sort by date descending
             all_events.sort(key=lambda x: x.get("date", ""), reverse=True)
@@ -224,29 +235,28 @@ class EventService:
                 "status_code": 500
             }
 
-    def get_event_by_id(self, event_id: str) -> Dict[str, Any]:
+    def get_event_by_id(self, event_id: str, student_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get a specific event by ID
         
         Args:
             event_id: UUID of the event
+            student_id: Optional student to compute isRegistered for
         
         Returns:
             Event data with registration count or error response
         """
         try:
-            event = self._fetch_event_from_supabase(event_id)
+            event = self._get_event(event_id)
             if not event:
-                if event_id in _events_db:
-                    event = _events_db[event_id]
-                else:
-                    return {
-                        "success": False,
-                        "error": "Event not found",
-                        "status_code": 404
-                    }
+                return {
+                    "success": False,
+                    "error": "Event not found",
+                    "status_code": 404
+                }
 
-            event = self._add_registration_count(event)
+            registered_ids = self.registrations.events_for_student(student_id) if student_id else None
+            event = self._add_registration_count(event, registered_ids=registered_ids)
             return {
                 "success": True,
                 "data": event,
@@ -298,6 +308,7 @@ class EventService:
                 event["location"] = event_data["location"].strip()
             
             event["updated_at"] = datetime.utcnow().isoformat()
+            self.invalidate_event_cache(event_id)
             
             logger.info(f"Updated event {event_id} in memory storage")
             
@@ -329,10 +340,9 @@ class EventService:
         try:
             if event_id in _events_db:
                 del _events_db[event_id]
+                self.invalidate_event_cache(event_id)
                 # Also delete registrations for this event
-                if event_id in _registrations_db:
-                    del _registrations_db[event_id]
-                    _save_registrations(_registrations_db)  # Persist deletion
+                self.registrations.delete_event(event_id)
                 logger.info(f"Deleted event {event_id} from memory storage")
                 return {
                     "success": True,
@@ -367,32 +377,19 @@ class EventService:
             Updated event data or error response
         """
         try:
-            event = self._fetch_event_from_supabase(event_id)
+            event = self._get_event(event_id)
             if not event:
-                if event_id in _events_db:
-                    event = _events_db[event_id]
-                else:
-                    return {
-                        "success": False,
-                        "error": "Event not found",
-                        "status_code": 404
-                    }
-            
-            # Initialize registrations list if needed
-            if event_id not in _registrations_db:
-                _registrations_db[event_id] = []
+                return {
+                    "success": False,
+                    "error": "Event not found",
+                    "status_code": 404
+                }
             
             # Add student if not already registered
-            print(f"[REG] Checking if {student_id} in {_registrations_db[event_id]}", flush=True)
-            if student_id not in _registrations_db[event_id]:
-                print(f"[REG] Adding student", flush=True)
-                _registrations_db[event_id].append(student_id)
-                _save_registrations(_registrations_db)  # Persist to file
+            if self.registrations.register(event_id, student_id):
                 logger.info(f"Student {student_id} registered for event {event_id}")
-            else:
-                print(f"[REG] Student already registered, skipping save", flush=True)
             
-            event = self._add_registration_count(event)
+            event = self._add_registration_count(event, registered_ids={event_id})
             return {
                 "success": True,
                 "data": event,
@@ -420,28 +417,19 @@ class EventService:
             Updated event data or error response
         """
         try:
-            event = self._fetch_event_from_supabase(event_id)
+            event = self._get_event(event_id)
             if not event:
-                if event_id in _events_db:
-                    event = _events_db[event_id]
-                else:
-                    return {
-                        "success": False,
-                        "error": "Event not found",
-                        "status_code": 404
-                    }
-            
-            # Initialize registrations list if needed
-            if event_id not in _registrations_db:
-                _registrations_db[event_id] = []
+                return {
+                    "success": False,
+                    "error": "Event not found",
+                    "status_code": 404
+                }
             
             # Remove student if registered
-            if student_id in _registrations_db[event_id]:
-                _registrations_db[event_id].remove(student_id)
-                _save_registrations(_registrations_db)  # Persist to file
+            if self.registrations.unregister(event_id, student_id):
                 logger.info(f"Student {student_id} unregistered from event {event_id}")
             
-            event = self._add_registration_count(event)
+            event = self._add_registration_count(event, registered_ids=set())
             return {
                 "success": True,
                 "data": event,
@@ -457,19 +445,62 @@ class EventService:
                 "status_code": 500
             }
 
-    def _add_registration_count(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def get_event_registrants(self, event_id: str, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        List the students registered for an event, one page at a time
+        
+        Args:
+            event_id: UUID of the event
+            limit: Page size (1-500)
+            offset: Number of registrations to skip
+        
+        Returns:
+            Page of {student_id, registered_at} in sign-up order plus the total
+        """
+        try:
+            limit = max(1, min(int(limit), 500))
+            offset = max(0, int(offset))
+            registrants = self.registrations.registrants(event_id, limit=limit, offset=offset)
+            
+            return {
+                "success": True,
+                "data": registrants,
+                "count": len(registrants),
+                "total": self.registrations.count(event_id),
+                "limit": limit,
+                "offset": offset,
+                "status_code": 200
+            }
+
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Error listing registrants: {error_msg}", exc_info=True)
+            return {
+                "success": False,
+                "error": error_msg,
+                "status_code": 500
+            }
+
+    def _add_registration_count(
+        self,
+        event: Dict[str, Any],
+        counts: Optional[Dict[str, int]] = None,
+        registered_ids: Optional[Set[str]] = None,
+    ) -> Dict[str, Any]:
         """
         Helper method to add registration count to event data
         
         Args:
             event: Event dictionary
+            counts: Optional prefetched {event_id: registered} (list views)
+            registered_ids: Optional event ids the requesting student is registered for
         
         Returns:
-            Event dictionary with registered count and list of registered students
+            Event dictionary with registered count (and isRegistered when a student is known)
         """
         event_copy = event.copy()
         event_id = event_copy.get("id")
-        registered_students = _registrations_db.get(event_id, [])
-        event_copy["registered"] = len(registered_students)
-        event_copy["registered_students"] = registered_students  # Include list of registered students
+        event_copy["registered"] = counts.get(event_id, 0) if counts is not None else self.registrations.count(event_id)
+        if registered_ids is not None:
+            event_copy["isRegistered"] = event_id in registered_ids
         return event_copy
@@ -2,7 +2,9 @@ import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
-import requests
+import threading
+from app.supabase_client import get_supabase_client
+from app.config import ai_config
 from app.ai_module.whisper.transcriber import WhisperTranscriber
 from app.ai_module.phi3 import Phi3FollowupGenerator
 
@@ -19,6 +21,7 @@ class InterviewService:
         
         logger.info(f"InterviewService __init__: SUPABASE_URL={self.supabase_url}, has_key={bool(self.supabase_key)}")
         
+        self.client = get_supabase_client()
         if self.supabase_url and self.supabase_key:
             # Use direct REST API endpoint for interviews table
             self.api_url = f"{self.supabase_url}/rest/v1"
@@ -35,60 +38,8 @@ class InterviewService:
         self.phi3_followup_generator = Phi3FollowupGenerator()
 
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make a request to Supabase REST API"""
-        if not self.api_url or not self.headers:
-            return {
-                "success": False,
-                "error": "Supabase not configured",
-                "status_code": 500
-            }
-
-        try:
-            url = f"{self.api_url}{endpoint}"
-            
-            if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params)
-            elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method == "PUT":
-                response = requests.put(url, headers=self.headers, json=data)
-            elif method == "PATCH":
-                response = requests.patch(url, headers=self.headers, json=data)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers)
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unsupported HTTP method: {method}",
-                    "status_code": 400
-                }
-
-            if response.status_code in [200, 201]:
-                return {
-                    "success": True,
-                    "data": response.json() if response.text else None,
-                    "status_code": response.status_code
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "Not found",
-                    "status_code": 404
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.text or f"HTTP {response.status_code}",
-                    "status_code": response.status_code
-                }
-
-        except Exception as e:
-            logger.error(f"Error making request to {endpoint}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "status_code": 500
-            }
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params)
 
     @staticmethod
     def _normalize_question_text(text: Optional[str]) -> str:
@@ -119,6 +70,31 @@ class InterviewService:
 
         return records[0].get("id")
 
+    def _schedule_question_embedding_refresh(self, question_ids: List[str]) -> None:
+        """Re-embed the given question bank rows in the background (add/rate hooks)."""
+        question_ids = [str(question_id) for question_id in question_ids if question_id]
+        if not ai_config.QUESTION_EMBEDDINGS_AUTO_REFRESH or not question_ids:
+            return
+
+        def _refresh():
+            try:
+                from app.ai_module.roberta.question_embeddings import refresh_question_rows
+
+                result = self._make_request(
+                    "GET",
+                    "/interview_question_bank",
+                    params={"select": "*", "id": f"in.({','.join(question_ids)})"},
+                )
+                if not result.get("success"):
+                    logger.warning(f"Question embedding refresh skipped: {result.get('error')}")
+                    return
+                summary = refresh_question_rows(result.get("data") or [], question_ids)
+                logger.info(f"Question embedding store refreshed: {summary}")
+            except Exception as e:
+                logger.warning(f"Question embedding refresh failed for {question_ids}: {str(e)}")
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
     def _persist_generated_followup_question(
         self,
         *,
@@ -167,6 +143,7 @@ class InterviewService:
             created_records = insert_result.get("data") or []
             created_id = created_records[0].get("id") if created_records else None
             if created_id:
+                self._schedule_question_embedding_refresh([created_id])
                 return {
                     "success": True,
                     "question_bank_id": created_id,
@@ -213,25 +190,17 @@ class InterviewService:
                 "status_code": 500
             }
 
-    def get_user_interviews_count(self, user_id: str, status: Optional[str] = None) -> Dict[str, Any]:
+    def get_user_interviews_count(self, user_id: str, status: Optional[str] = None, accuracy: str = "exact") -> Dict[str, Any]:
         """Get the count of interviews for a specific user"""
         try:
             params = {
-                "user_id": f"eq.{user_id}",
-                "select": "id"
+                "user_id": f"eq.{user_id}"
             }
             
             if status:
                 params["status"] = f"eq.{status}"
-            
-            result = self._make_request("GET", "/interviews", params=params)
-            
-            if result.get("success"):
-                count = len(result.get("data", []))
-                result["count"] = count
-                result["data"] = {"count": count}
-            
-            return result
+
+            return self.client.count("/interviews", params=params, mode=accuracy)
         
         except Exception as e:
             logger.error(f"Error getting interview count for user {user_id}: {str(e)}")
@@ -563,7 +532,7 @@ class InterviewService:
             "Authorization": f"Bearer {self.supabase_key}",
         }
         try:
-            response = requests.get(object_url, headers=headers, timeout=120)
+            response = self.client.get(object_url, headers=headers, timeout=(self.client.connect_timeout, 120))
             if response.status_code != 200:
                 return {
                     "success": False,
@@ -969,5 +938,6 @@ class InterviewService:
             data={"quality": quality},
         )
         if result.get("success"):
+            self._schedule_question_embedding_refresh([question_id])
             return {"success": True, "status_code": 200}
         return {"success": False, "error": result.get("error", "Failed to rate question"), "status_code": result.get("status_code", 500)}
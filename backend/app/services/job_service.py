@@ -1,12 +1,18 @@
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import logging
-import requests
+import threading
+import time
+from app.supabase_client import get_supabase_client
+from app.utils.job_search import JobSearchIndex
+from app.utils.job_recommender import JobRecommender
 
 logger = logging.getLogger(__name__)
 logger.info("Initializing job_service module")
 
+JOB_SELECT = "*,employer:employer_id(id,name,website)"
+
 
 class JobService:
     """Service for handling job posting operations"""
@@ -17,6 +23,7 @@ class JobService:
         
         logger.info(f"JobService __init__: SUPABASE_URL={self.supabase_url}, has_key={bool(self.supabase_key)}")
         
+        self.client = get_supabase_client()
         if self.supabase_url and self.supabase_key:
             # Use direct REST API endpoint for jobs table
             self.api_url = f"{self.supabase_url}/rest/v1"
@@ -30,59 +37,93 @@ class JobService:
             self.api_url = None
             self.headers = None
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make a request to Supabase REST API"""
-        if not self.api_url or not self.headers:
-            return {
-                "success": False,
-                "error": "Supabase not configured",
-                "status_code": 500
-            }
+        # In-process BM25 index over every job (see app/utils/job_search.py).
+        # Writes through this service update it in place; a background rebuild
+        # every JOB_SEARCH_REFRESH_SECONDS picks up changes made elsewhere.
+        self.search_index = JobSearchIndex()
+        # Sparse TF-IDF matrix over active jobs for recommendations
+        # (app/utils/job_recommender.py), kept in step with the search index.
+        self.recommender = JobRecommender()
+        self.search_refresh_seconds = float(os.getenv("JOB_SEARCH_REFRESH_SECONDS", "300"))
+        self._search_build_lock = threading.Lock()
+        self._search_refreshing = False
+        # Writes made while a rebuild is fetching jobs: ("add", job) or ("remove", id),
+        # replayed on top of the rebuilt indexes (None when no rebuild is running).
+        self._index_lock = threading.RLock()
+        self._pending_writes: Optional[List[Tuple[str, Any]]] = None
+
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None,
+                      headers: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params, headers=headers)
+
+    def _index_written_jobs(self, result: Dict[str, Any]) -> None:
+        """Fold the rows returned by a write (Prefer: return=representation) into the search indexes"""
+        rows = result.get("data")
+        jobs = rows if isinstance(rows, list) else [rows] if isinstance(rows, dict) else []
+        self._apply_index_writes([("add", job) for job in jobs])
+        # Dense vectors for semantic resume matching are re-embedded off the request thread.
+        from app.services.matching_service import schedule_job_embedding_refresh
+        schedule_job_embedding_refresh(jobs)
 
+    def _apply_index_writes(self, writes: List[Tuple[str, Any]], replay: bool = False) -> None:
+        """Apply ("add", job) / ("remove", job_id) writes to both indexes, logging them while a rebuild runs"""
+        with self._index_lock:
+            for op, value in writes:
+                if op == "add":
+                    self.search_index.add(value)
+                    self.recommender.add(value)
+                else:
+                    self.search_index.remove(value)
+                    self.recommender.remove(value)
+            if self._pending_writes is not None and not replay:
+                self._pending_writes.extend(writes)
+
+    def build_search_index(self) -> Dict[str, Any]:
+        """(Re)build the search index and recommender from every job, whatever its status"""
+        with self._index_lock:
+            self._pending_writes = []
         try:
-            url = f"{self.api_url}{endpoint}"
-            
-            if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params)
-            elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method == "PUT":
-                response = requests.put(url, headers=self.headers, json=data)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers)
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unsupported HTTP method: {method}",
-                    "status_code": 400
-                }
+            result = self.get_all_jobs(status=None)
+            if result.get("success"):
+                jobs = result.get("data") or []
+                with self._index_lock:
+                    self.recommender.rebuild(jobs)
+                    self.search_index.rebuild(jobs)
+                    # The fetch may predate writes made through this service meanwhile.
+                    pending, self._pending_writes = self._pending_writes or [], None
+                    self._apply_index_writes(pending, replay=True)
+                logger.info(f"Job search index built: {self.search_index.stats()}")
+            return result
+        finally:
+            with self._index_lock:
+                self._pending_writes = None
 
-            if response.status_code in [200, 201]:
-                return {
-                    "success": True,
-                    "data": response.json() if response.text else None,
-                    "status_code": response.status_code
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "Not found",
-                    "status_code": 404
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.text or f"HTTP {response.status_code}",
-                    "status_code": response.status_code
-                }
+    def _ensure_search_index(self) -> Optional[Dict[str, Any]]:
+        """Build the index on first use; refresh it in the background once it is old. Returns an error result or None."""
+        if self.search_index.built_at is None:
+            with self._search_build_lock:
+                if self.search_index.built_at is None:
+                    result = self.build_search_index()
+                    if not result.get("success"):
+                        return result
+            return None
 
-        except Exception as e:
-            logger.error(f"Error making request to {endpoint}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "status_code": 500
-            }
+        if time.time() - self.search_index.built_at >= self.search_refresh_seconds and not self._search_refreshing:
+            with self._search_build_lock:
+                if self._search_refreshing:
+                    return None
+                self._search_refreshing = True
+            threading.Thread(target=self._refresh_search_index, name="job-search-refresh", daemon=True).start()
+        return None
+
+    def _refresh_search_index(self) -> None:
+        try:
+            result = self.build_search_index()
+            if not result.get("success"):
+                logger.error(f"Job search index refresh failed: {result.get('error')}")
+        finally:
+            self._search_refreshing = False
 
     def get_all_jobs(self, status: Optional[str] = "active", category: Optional[str] = None, 
                      job_type: Optional[str] = None, location: Optional[str] = None) -> Dict[str, Any]:
@@ -104,7 +145,7 @@ class JobService:
                 params["location"] = f"ilike.%{location}%"
             
             # Add select with employer info and order by deadline
-            params["select"] = "*,employer:employer_id(id,name,website)"
+            params["select"] = JOB_SELECT
             params["order"] = "deadline.asc"
             
             result = self._make_request("GET", "/jobs", params=params)
@@ -159,7 +200,7 @@ class JobService:
         try:
             params = {
                 "id": f"eq.{job_id}",
-                "select": "*,employer:employer_id(id,name,website)"
+                "select": JOB_SELECT
             }
             
             result = self._make_request("GET", "/jobs", params=params)
@@ -200,7 +241,10 @@ class JobService:
             data["status"] = data.get("status", "active")
             data["applications_count"] = data.get("applications_count", 0)
             
-            result = self._make_request("POST", "/jobs", data=data)
+            result = self._make_request("POST", "/jobs", data=data, params={"select": JOB_SELECT},
+                                        headers={"Prefer": "return=representation"})
+            if result.get("success"):
+                self._index_written_jobs(result)
             
             return result
         
@@ -217,7 +261,10 @@ class JobService:
         try:
             # Use id filter for update
             endpoint = f"/jobs?id=eq.{job_id}"
-            result = self._make_request("PUT", endpoint, data=data)
+            result = self._make_request("PUT", endpoint, data=data, params={"select": JOB_SELECT},
+                                        headers={"Prefer": "return=representation"})
+            if result.get("success"):
+                self._index_written_jobs(result)
             
             return result
         
@@ -233,7 +280,19 @@ class JobService:
         """Delete a job posting"""
         try:
             endpoint = f"/jobs?id=eq.{job_id}"
-            result = self._make_request("DELETE", endpoint)
+            # Without return=representation PostgREST answers 204, which
+            # make_request does not count as success.
+            result = self._make_request("DELETE", endpoint, headers={"Prefer": "return=representation"})
+            if result.get("success") and not result.get("data"):
+                return {
+                    "success": False,
+                    "error": "Job not found",
+                    "status_code": 404
+                }
+            if result.get("success"):
+                self._apply_index_writes([("remove", job_id)])
+                from app.services.matching_service import schedule_job_embedding_refresh
+                schedule_job_embedding_refresh([], removals=[job_id])
             
             return result
         
@@ -245,22 +304,35 @@ class JobService:
                 "status_code": 500
             }
 
-    def search_jobs(self, keyword: str) -> Dict[str, Any]:
-        """Search jobs by keyword in title, description, or requirements"""
+    def search_jobs(self, keyword: str, job_type: Optional[str] = None, location: Optional[str] = None,
+                    category: Optional[str] = None, status: Optional[str] = "active",
+                    limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Search jobs in title, description, requirements, category and employer name (BM25-ranked)"""
         try:
-            # Using full-text search or simple LIKE filtering
-            params = {
-                "or": f"(title.ilike.%{keyword}%,description.ilike.%{keyword}%)",
-                "status": "eq.active",
-                "order": "created_at.desc"
-            }
-            
-            result = self._make_request("GET", "/jobs", params=params)
+            error = self._ensure_search_index()
+            if error:
+                return error
             
-            if result.get("success"):
-                result["count"] = len(result.get("data", []))
+            limit = max(1, min(int(limit), 100))
+            offset = max(0, int(offset))
+            found = self.search_index.search(
+                keyword,
+                filters={"job_type": job_type, "location": location, "category": category, "status": status},
+                limit=limit,
+                offset=offset,
+            )
             
-            return result
+            return {
+                "success": True,
+                "data": [{**job, "score": score} for job, score in found["results"]],
+                "count": len(found["results"]),
+                "total": found["total"],
+                "limit": limit,
+                "offset": offset,
+                "facets": found["facets"],
+                "took_ms": found["took_ms"],
+                "status_code": 200
+            }
         
         except Exception as e:
             logger.error(f"Error searching jobs with keyword '{keyword}': {str(e)}")
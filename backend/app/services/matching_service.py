@@ -0,0 +1,197 @@
+import threading
+from typing import Dict, List, Optional, Any
+import logging
+from app.config import ai_config
+from app.supabase_client import get_supabase_client
+from app.services.job_service import JOB_SELECT
+from app.ai_module.roberta.batcher import ModelUnavailableError
+from app.ai_module.roberta.match_index import (
+    get_job_index,
+    get_resume_index,
+    refresh_job_rows,
+    refresh_resume_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+RESUME_MATCH_SELECT = "id,user_id,file_name,skills,resume_text"
+MAX_MATCHES = 50
+
+
+def schedule_job_embedding_refresh(jobs: List[Dict[str, Any]], removals: Optional[List[str]] = None) -> None:
+    """Re-embed written job rows (and drop deleted ones) in the background"""
+    if not ai_config.MATCH_EMBEDDINGS_AUTO_REFRESH or not (jobs or removals):
+        return
+
+    def _refresh():
+        try:
+            summary = refresh_job_rows(jobs, removals=removals or [])
+            logger.info(f"Job embedding store refreshed: {summary}")
+        except Exception as e:
+            logger.warning(f"Job embedding refresh failed: {str(e)}")
+
+    threading.Thread(target=_refresh, daemon=True).start()
+
+
+def schedule_resume_embedding_refresh(resumes: List[Dict[str, Any]], removals: Optional[List[str]] = None) -> None:
+    """Embed parsed resumes (and drop deleted ones) in the background"""
+    if not ai_config.MATCH_EMBEDDINGS_AUTO_REFRESH or not (resumes or removals):
+        return
+
+    def _refresh():
+        try:
+            summary = refresh_resume_rows(resumes, removals=removals or [])
+            logger.info(f"Resume embedding store refreshed: {summary}")
+        except Exception as e:
+            logger.warning(f"Resume embedding refresh failed: {str(e)}")
+
+    threading.Thread(target=_refresh, daemon=True).start()
+
+
+class MatchingService:
+    """Semantic resume <-> job matching over the dense embedding indexes"""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params)
+
+    def _fetch_one(self, endpoint: str, entry_id: str, select: str, label: str) -> Dict[str, Any]:
+        result = self._make_request("GET", endpoint, params={"select": select, "id": f"eq.{entry_id}"})
+        if not result.get("success"):
+            return result
+        if not result.get("data"):
+            return {
+                "success": False,
+                "error": f"{label} not found",
+                "status_code": 404
+            }
+        return {"success": True, "data": result["data"][0]}
+
+    @staticmethod
+    def _unavailable() -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": "Embedding model is not available",
+            "status_code": 503
+        }
+
+    def get_jobs_for_resume(self, resume_id: str, limit: int = 10) -> Dict[str, Any]:
+        """Active jobs closest to a parsed resume (embedding it first if it is new or changed)"""
+        try:
+            resume = self._fetch_one("/resumes", resume_id, RESUME_MATCH_SELECT, "Resume")
+            if not resume.get("success"):
+                return resume
+            if not (resume["data"].get("resume_text") or "").strip():
+                return {
+                    "success": False,
+                    "error": "Resume has no extracted text yet",
+                    "status_code": 422
+                }
+
+            refresh_resume_rows([resume["data"]])
+            vector = get_resume_index().vector(str(resume_id))
+            limit = max(1, min(int(limit), MAX_MATCHES))
+            hits = get_job_index().search(vector, k=limit, where={"status": "active"})
+            if not hits:
+                return {"success": True, "data": [], "count": 0, "status_code": 200}
+
+            jobs = self._make_request("GET", "/jobs", params={
+                "select": JOB_SELECT,
+                "id": f"in.({','.join(job_id for job_id, _, _ in hits)})"
+            })
+            if not jobs.get("success"):
+                return jobs
+            by_id = {str(job.get("id")): job for job in jobs.get("data") or []}
+            data = [
+                {**by_id[job_id], "similarity": round(score, 4)}
+                for job_id, score, _ in hits
+                if job_id in by_id and by_id[job_id].get("status") == "active"
+            ]
+
+            return {
+                "success": True,
+                "data": data,
+                "count": len(data),
+                "status_code": 200
+            }
+
+        except ModelUnavailableError:
+            return self._unavailable()
+        except Exception as e:
+            logger.error(f"Error matching jobs for resume {resume_id}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status_code": 500
+            }
+
+    def get_candidates_for_job(self, job_id: str, limit: int = 10) -> Dict[str, Any]:
+        """Students whose parsed resumes are closest to a job posting (best resume per student)"""
+        try:
+            job = self._fetch_one("/jobs", job_id, "*", "Job")
+            if not job.get("success"):
+                return job
+
+            refresh_job_rows([job["data"]])
+            vector = get_job_index().vector(str(job_id))
+            if vector is None:
+                return {
+                    "success": False,
+                    "error": "Job has no text to match on",
+                    "status_code": 422
+                }
+
+            limit = max(1, min(int(limit), MAX_MATCHES))
+            # Students may have several resumes: over-fetch, keep each student's best.
+            best: Dict[str, Any] = {}
+            for resume_id, score, meta in get_resume_index().search(vector, k=limit * 3):
+                user_id = meta.get("user_id")
+                if user_id not in best:
+                    best[user_id] = (resume_id, score)
+                if len(best) == limit:
+                    break
+            if not best:
+                return {"success": True, "data": [], "count": 0, "status_code": 200}
+
+            profiles = self._make_request("GET", "/profiles", params={
+                "select": "id,full_name,email,major",
+                "id": f"in.({','.join(str(user_id) for user_id in best)})"
+            })
+            by_id = {str(p.get("id")): p for p in profiles.get("data") or []} if profiles.get("success") else {}
+            data = [
+                {
+                    "student_id": user_id,
+                    "resume_id": resume_id,
+                    "similarity": round(score, 4),
+                    "profile": by_id.get(str(user_id))
+                }
+                for user_id, (resume_id, score) in best.items()
+            ]
+
+            return {
+                "success": True,
+                "data": data,
+                "count": len(data),
+                "status_code": 200
+            }
+
+        except ModelUnavailableError:
+            return self._unavailable()
+        except Exception as e:
+            logger.error(f"Error matching candidates for job {job_id}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status_code": 500
+            }
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Row counts and search mode of both embedding indexes"""
+        return {
+            "success": True,
+            "data": {"jobs": get_job_index().stats(), "resumes": get_resume_index().stats()},
+            "status_code": 200
+        }
@@ -0,0 +1,101 @@
+import os
+from typing import Dict, Optional, Any
+import logging
+from app.services.job_service import JobService
+from app.utils.job_recommender import student_document
+from app.utils.query_executor import get_query_executor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 4
+MAX_TOP_K = 50
+
+
+class RecommendationService:
+    """Job recommendations for students, scored server-side against the job catalogue"""
+
+    def __init__(self, job_service: Optional[JobService] = None):
+        # Shares the JobService whose writes keep the recommender matrix current.
+        self.job_service = job_service or JobService()
+        self.client = self.job_service.client
+        self.query_executor = get_query_executor()
+        self.query_deadline_seconds = float(os.getenv("RECOMMENDATION_QUERY_DEADLINE_SECONDS", "5"))
+
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params)
+
+    def get_recommendations(self, student_id: str, limit: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+        """Top-k active jobs for a student's profile and latest resume, excluding jobs already applied to"""
+        try:
+            error = self.job_service._ensure_search_index()
+            if error:
+                return error
+
+            results = self.query_executor.run({
+                "profile": lambda: self._make_request("GET", "/profiles", params={"id": f"eq.{student_id}"}),
+                "resume": lambda: self._make_request("GET", "/resumes", params={
+                    "user_id": f"eq.{student_id}",
+                    "order": "created_at.desc",
+                    "limit": "1"
+                }),
+                "applications": lambda: self._make_request("GET", "/applications", params={
+                    "select": "job_id",
+                    "student_id": f"eq.{student_id}"
+                }),
+            }, deadline_seconds=self.query_deadline_seconds)
+
+            if not results["profile"].ok:
+                return {
+                    "success": False,
+                    "error": results["profile"].error,
+                    "status_code": 502
+                }
+            profiles = results["profile"].value.get("data") or []
+            if not profiles:
+                return {
+                    "success": False,
+                    "error": "Student not found",
+                    "status_code": 404
+                }
+
+            resumes = (results["resume"].value.get("data") or []) if results["resume"].ok else []
+            # Without the applied list we would recommend jobs already applied to.
+            if not results["applications"].ok:
+                return {
+                    "success": False,
+                    "error": results["applications"].error,
+                    "status_code": 502
+                }
+            applied = {str(row.get("job_id")) for row in results["applications"].value.get("data") or []}
+
+            limit = max(1, min(int(limit), MAX_TOP_K))
+            recommendations = self.job_service.recommender.recommend(
+                student_document(profiles[0], resumes[0] if resumes else None),
+                preferences=profiles[0],
+                exclude=applied,
+                top_k=limit,
+            )
+
+            return {
+                "success": True,
+                "data": [
+                    {
+                        **rec["job"],
+                        "score": rec["score"],
+                        "similarity": rec["similarity"],
+                        "matchedSkills": rec["matchedSkills"]
+                    }
+                    for rec in recommendations
+                ],
+                "count": len(recommendations),
+                "status_code": 200
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting job recommendations for {student_id}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status_code": 500
+            }
@@ -2,7 +2,7 @@ import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
-import requests
+from app.supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 logger.info("Initializing resume_service module")
@@ -17,6 +17,7 @@ class ResumeService:
         
         logger.info(f"ResumeService __init__: SUPABASE_URL={self.supabase_url}, has_key={bool(self.supabase_key)}")
         
+        self.client = get_supabase_client()
         if self.supabase_url and self.supabase_key:
             # Use direct REST API endpoint for resumes table
             self.api_url = f"{self.supabase_url}/rest/v1"
@@ -30,59 +31,20 @@ class ResumeService:
             self.api_url = None
             self.headers = None
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make a request to Supabase REST API"""
-        if not self.api_url or not self.headers:
-            return {
-                "success": False,
-                "error": "Supabase not configured",
-                "status_code": 500
-            }
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None,
+                      headers: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params, headers=headers)
 
-        try:
-            url = f"{self.api_url}{endpoint}"
-            
-            if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params)
-            elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method == "PUT":
-                response = requests.put(url, headers=self.headers, json=data)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers)
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unsupported HTTP method: {method}",
-                    "status_code": 400
-                }
-
-            if response.status_code in [200, 201]:
-                return {
-                    "success": True,
-                    "data": response.json() if response.text else None,
-                    "status_code": response.status_code
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "Not found",
-                    "status_code": 404
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.text or f"HTTP {response.status_code}",
-                    "status_code": response.status_code
-                }
-
-        except Exception as e:
-            logger.error(f"Error making request to {endpoint}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "status_code": 500
-            }
+    @staticmethod
+    def _embed_written_resumes(result: Dict[str, Any]) -> None:
+        """Queue parsed resumes returned by a write (Prefer: return=representation) for semantic matching"""
+        rows = result.get("data")
+        resumes = rows if isinstance(rows, list) else [rows] if isinstance(rows, dict) else []
+        parsed = [resume for resume in resumes if resume.get("resume_text")]
+        if parsed:
+            from app.services.matching_service import schedule_resume_embedding_refresh
+            schedule_resume_embedding_refresh(parsed)
 
     def get_user_resumes(self, user_id: str) -> Dict[str, Any]:
         """Get all resumes for a specific user"""
@@ -107,22 +69,14 @@ class ResumeService:
                 "status_code": 500
             }
 
-    def get_user_resumes_count(self, user_id: str) -> Dict[str, Any]:
+    def get_user_resumes_count(self, user_id: str, accuracy: str = "exact") -> Dict[str, Any]:
         """Get the count of resumes for a specific user"""
         try:
             params = {
-                "user_id": f"eq.{user_id}",
-                "select": "id"
+                "user_id": f"eq.{user_id}"
             }
-            
-            result = self._make_request("GET", "/resumes", params=params)
-            
-            if result.get("success"):
-                count = len(result.get("data", []))
-                result["count"] = count
-                result["data"] = {"count": count}
-            
-            return result
+
+            return self.client.count("/resumes", params=params, mode=accuracy)
         
         except Exception as e:
             logger.error(f"Error getting resume count for user {user_id}: {str(e)}")
@@ -173,7 +127,9 @@ class ResumeService:
                         "status_code": 400
                     }
             
-            result = self._make_request("POST", "/resumes", data=data)
+            result = self._make_request("POST", "/resumes", data=data, headers={"Prefer": "return=representation"})
+            if result.get("success"):
+                self._embed_written_resumes(result)
             
             return result
         
@@ -189,7 +145,9 @@ class ResumeService:
         """Update a resume record"""
         try:
             endpoint = f"/resumes?id=eq.{resume_id}"
-            result = self._make_request("PUT", endpoint, data=data)
+            result = self._make_request("PUT", endpoint, data=data, headers={"Prefer": "return=representation"})
+            if result.get("success"):
+                self._embed_written_resumes(result)
             
             return result
         
@@ -205,7 +163,18 @@ class ResumeService:
         """Delete a resume record"""
         try:
             endpoint = f"/resumes?id=eq.{resume_id}"
-            result = self._make_request("DELETE", endpoint)
+            # Without return=representation PostgREST answers 204, which
+            # make_request does not count as success.
+            result = self._make_request("DELETE", endpoint, headers={"Prefer": "return=representation"})
+            if result.get("success") and not result.get("data"):
+                return {
+                    "success": False,
+                    "error": "Resume not found",
+                    "status_code": 404
+                }
+            if result.get("success"):
+                from app.services.matching_service import schedule_resume_embedding_refresh
+                schedule_resume_embedding_refresh([], removals=[resume_id])
             
             return result
         
@@ -0,0 +1,195 @@
+import os
+from typing import Dict, List, Optional, Any, Iterable
+from datetime import date, datetime, timedelta
+import logging
+from app.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Metrics maintained by public.refresh_analytics_rollup
+# (database/create_analytics_rollups.sql) and what their dimension means.
+ROLLUP_METRICS = {
+    "registrations": "role",
+    "interviews": "status",
+    "applications": "status",
+    "event_signups": None,
+}
+GRANULARITIES = ("day", "week", "month")
+DEFAULT_RANGE_DAYS = 30
+# Upper bound on a single time-series request (about three academic years).
+MAX_RANGE_DAYS = 1100
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """First day of the day/week (ISO, Monday)/month bucket containing `day`."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def iter_buckets(start: date, end: date, granularity: str) -> Iterable[date]:
+    """Every bucket start from the bucket holding `start` through the one holding `end`."""
+    current = bucket_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+
+
+class RollupService:
+    """Daily analytics rollups: incremental aggregation and time-series reads"""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+        # Rows younger than this are left for the next run (in-flight transactions).
+        self.settle_seconds = int(os.getenv("ANALYTICS_ROLLUP_SETTLE_SECONDS", "120"))
+
+    def _make_request(self, method: str, endpoint: str, data: Optional[Any] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params)
+
+    @staticmethod
+    def _unknown_metric(metric: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": f"Unknown metric: {metric} (expected one of {', '.join(ROLLUP_METRICS)})",
+            "status_code": 400
+        }
+
+    def refresh(self, metrics: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fold rows created since each metric's watermark into the daily rollups"""
+        metrics = metrics or list(ROLLUP_METRICS)
+        unknown = [m for m in metrics if m not in ROLLUP_METRICS]
+        if unknown:
+            return self._unknown_metric(unknown[0])
+
+        runs = {}
+        errors = {}
+        for metric in metrics:
+            result = self._make_request("POST", "/rpc/refresh_analytics_rollup", data={
+                "metric_name": metric,
+                "settle_seconds": self.settle_seconds
+            })
+            if result.get("success"):
+                runs[metric] = result.get("data")
+            else:
+                errors[metric] = result.get("error")
+                logger.error(f"Rollup refresh for {metric} failed: {result.get('error')}")
+
+        return {
+            "success": not errors,
+            "data": runs,
+            "errors": errors,
+            "status_code": 200 if not errors else 502
+        }
+
+    def reset(self, metric: str) -> Dict[str, Any]:
+        """Drop one metric's rollups and watermark so the next refresh rebuilds it"""
+        if metric not in ROLLUP_METRICS:
+            return self._unknown_metric(metric)
+        return self._make_request("POST", "/rpc/reset_analytics_rollup", data={"metric_name": metric})
+
+    def get_watermarks(self) -> Dict[str, Any]:
+        """Last aggregated timestamp per metric"""
+        result = self._make_request("GET", "/analytics_rollup_watermarks", params={
+            "select": "metric,last_created_at,last_run_at,rows_processed"
+        })
+        if result.get("success"):
+            marks = {row["metric"]: row for row in result.get("data") or []}
+            result["data"] = {
+                metric: {"dimension": dimension, **(marks.get(metric) or {"last_created_at": None})}
+                for metric, dimension in ROLLUP_METRICS.items()
+            }
+        return result
+
+    def get_timeseries(
+        self,
+        metric: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        granularity: str = "day",
+        dimension: Optional[str] = None,
+        split: bool = False,
+    ) -> Dict[str, Any]:
+        """Counts per day/week/month read from the rollups, zero-filled over [start, end]"""
+        try:
+            if metric not in ROLLUP_METRICS:
+                return self._unknown_metric(metric)
+            if granularity not in GRANULARITIES:
+                return {
+                    "success": False,
+                    "error": f"Unsupported granularity: {granularity} (expected one of {', '.join(GRANULARITIES)})",
+                    "status_code": 400
+                }
+
+            end = end or datetime.utcnow().date()
+            start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+            if start > end:
+                return {
+                    "success": False,
+                    "error": "start must not be after end",
+                    "status_code": 400
+                }
+            if (end - start).days >= MAX_RANGE_DAYS:
+                return {
+                    "success": False,
+                    "error": f"Date range is limited to {MAX_RANGE_DAYS} days",
+                    "status_code": 400
+                }
+
+            params = {
+                "select": "bucket_date,dimension,count",
+                "metric": f"eq.{metric}",
+                "and": f"(bucket_date.gte.{start.isoformat()},bucket_date.lte.{end.isoformat()})",
+                "order": "bucket_date.asc"
+            }
+            if dimension is not None:
+                params["dimension"] = f"eq.{dimension}"
+
+            result = self._make_request("GET", "/analytics_daily_rollups", params=params)
+            if not result.get("success"):
+                return result
+
+            buckets = list(iter_buckets(start, end, granularity))
+            totals = {bucket: 0 for bucket in buckets}
+            by_dimension: Dict[str, Dict[date, int]] = {}
+            for row in result.get("data") or []:
+                bucket = bucket_start(date.fromisoformat(row["bucket_date"]), granularity)
+                count = int(row.get("count") or 0)
+                totals[bucket] = totals.get(bucket, 0) + count
+                if split:
+                    series = by_dimension.setdefault(row.get("dimension") or "", {})
+                    series[bucket] = series.get(bucket, 0) + count
+
+            data = {
+                "metric": metric,
+                "dimension": ROLLUP_METRICS[metric],
+                "granularity": granularity,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "series": [{"bucket": b.isoformat(), "count": totals[b]} for b in buckets],
+                "total": sum(totals.values())
+            }
+            if split:
+                data["by_dimension"] = {
+                    value: [{"bucket": b.isoformat(), "count": series.get(b, 0)} for b in buckets]
+                    for value, series in sorted(by_dimension.items())
+                }
+
+            return {
+                "success": True,
+                "data": data,
+                "status_code": 200
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting {metric} time series: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status_code": 500
+            }
@@ -2,7 +2,7 @@ import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
-import requests
+from app.supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 logger.info("Initializing student_service module")
@@ -17,6 +17,7 @@ class StudentService:
         
         logger.info(f"StudentService __init__: SUPABASE_URL={self.supabase_url}, has_key={bool(self.supabase_key)}")
         
+        self.client = get_supabase_client()
         if self.supabase_url and self.supabase_key:
             self.api_url = f"{self.supabase_url}/rest/v1"
             self.headers = {
@@ -30,58 +31,8 @@ class StudentService:
             self.headers = None
 
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make a request to Supabase REST API"""
-        if not self.api_url or not self.headers:
-            return {
-                "success": False,
-                "error": "Supabase not configured",
-                "status_code": 500
-            }
-
-        try:
-            url = f"{self.api_url}{endpoint}"
-            
-            if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params)
-            elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method == "PUT":
-                response = requests.put(url, headers=self.headers, json=data)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers)
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unsupported HTTP method: {method}",
-                    "status_code": 400
-                }
-
-            if response.status_code in [200, 201]:
-                return {
-                    "success": True,
-                    "data": response.json() if response.text else None,
-                    "status_code": response.status_code
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "Not found",
-                    "status_code": 404
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.text or f"HTTP {response.status_code}",
-                    "status_code": response.status_code
-                }
-
-        except Exception as e:
-            logger.error(f"Error making request to {endpoint}: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "status_code": 500
-            }
+        """Make a request to Supabase REST API (pooled session, see app/supabase_client.py)"""
+        return self.client.make_request(method, endpoint, data=data, params=params)
 
     def get_all_students(self, search: Optional[str] = None, status: Optional[str] = None, 
                         limit: int = 50, offset: int = 0) -> Dict[str, Any]:
@@ -113,22 +64,14 @@ class StudentService:
                 "status_code": 500
             }
 
-    def get_students_count(self) -> Dict[str, Any]:
-        """Get total students count"""
+    def get_students_count(self, accuracy: str = "exact") -> Dict[str, Any]:
+        """Get total students count (server-side COUNT, see SupabaseClient.count)"""
         try:
             params = {
-                "role": "eq.student",
-                "select": "id"
+                "role": "eq.student"
             }
-            
-            result = self._make_request("GET", "/profiles", params=params)
-            
-            if result.get("success"):
-                count = len(result.get("data", []))
-                result["count"] = count
-                result["data"] = {"count": count}
-            
-            return result
+
+            return self.client.count("/profiles", params=params, mode=accuracy)
         
         except Exception as e:
             logger.error(f"Error getting students count: {str(e)}")
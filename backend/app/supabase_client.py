@@ -0,0 +1,477 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Verbs that can be retried without risking a duplicate write.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+# PostgREST count strategies: exact = COUNT(*), planned = planner estimate,
+# estimated = exact below db-max-rows, planner estimate above it.
+COUNT_MODES = ("exact", "planned", "estimated")
+# How group_count() asks for GROUP BY counts: "auto" tries the PostgREST
+# aggregate select first and falls back to the group_count RPC
+# (database/create_group_count_function.sql); "aggregate"/"rpc" force one path.
+GROUP_COUNT_STRATEGIES = ("auto", "aggregate", "rpc")
+
+
+def parse_content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Total from a PostgREST Content-Range header ("0-24/3573" or "*/3573")."""
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+class _CallStats:
+    """Latency counters for one (method, resource) pair."""
+
+    __slots__ = ("calls", "errors", "retries", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1),
+        }
+
+
+class SupabaseClient:
+    """Shared Supabase REST client: one pooled keep-alive session per process.
+
+    - `make_request()` keeps the services' result-dict convention
+      ({"success", "data", "error", "status_code"}).
+    - `get()/post()/patch()/...` return the raw `requests.Response` for code
+      that builds its own headers (per-user auth tokens, storage downloads).
+
+    Every call gets default connect/read timeouts, idempotent verbs are
+    retried with jittered exponential backoff on connection errors and
+    429/502/503/504, and per-resource latency is recorded (see `stats()`).
+    """
+
+    def __init__(
+        self,
+        supabase_url: Optional[str] = None,
+        supabase_key: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        slow_call_ms: Optional[float] = None,
+    ):
+        self.supabase_url = (supabase_url or os.getenv("SUPABASE_URL") or "").rstrip("/") or None
+        self.supabase_key = supabase_key or os.getenv("SUPABASE_KEY")
+        self.pool_size = pool_size if pool_size is not None else int(os.getenv("SUPABASE_POOL_SIZE", "16"))
+        self.connect_timeout = connect_timeout if connect_timeout is not None else _env_float("SUPABASE_CONNECT_TIMEOUT", "5")
+        self.read_timeout = read_timeout if read_timeout is not None else _env_float("SUPABASE_READ_TIMEOUT", "30")
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("SUPABASE_MAX_RETRIES", "2"))
+        self.backoff_base = backoff_base if backoff_base is not None else _env_float("SUPABASE_RETRY_BACKOFF", "0.2")
+        self.slow_call_ms = slow_call_ms if slow_call_ms is not None else _env_float("SUPABASE_SLOW_CALL_MS", "1000")
+        self.group_count_strategy = os.getenv("SUPABASE_GROUP_COUNT", "auto").strip().lower()
+        if self.group_count_strategy not in GROUP_COUNT_STRATEGIES:
+            self.group_count_strategy = "auto"
+        # Flipped off the first time PostgREST rejects an aggregate select, so
+        # later group counts go straight to the RPC instead of paying two trips.
+        self._aggregates_available = self.group_count_strategy != "rpc"
+
+        if self.supabase_url and self.supabase_key:
+            self.api_url = f"{self.supabase_url}/rest/v1"
+            self.headers = {
+                "Content-Type": "application/json",
+                "apikey": self.supabase_key,
+                "Authorization": f"Bearer {self.supabase_key}"
+            }
+        else:
+            self.api_url = None
+            self.headers = None
+
+        self._session: Optional[requests.Session] = None
+        self._session_pid: Optional[int] = None
+        self._session_lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _CallStats] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.api_url and self.headers)
+
+    # ── session ───────────────────────────────────────────────────────────
+    @property
+    def session(self) -> requests.Session:
+        # Sockets must not be shared with a forked parent (gunicorn preload).
+        if self._session is None or self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def _url(self, url: str) -> str:
+        if url.startswith("http://") or url.startswith("https://"):
+            return url
+        return f"{self.api_url}{url}"
+
+    # ── raw requests ──────────────────────────────────────────────────────
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Any = None,
+        retry: Optional[bool] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send one request through the pooled session; `url` may be a REST path ("/jobs")."""
+        method = method.upper()
+        full_url = self._url(url)
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        retries_allowed = self.max_retries if (method in IDEMPOTENT_METHODS if retry is None else retry) else 0
+        stats_key = (method, self._resource(full_url))
+
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                response = self.session.request(
+                    method,
+                    full_url,
+                    headers=headers if headers is not None else self.headers,
+                    timeout=timeout,
+                    **kwargs,
+                )
+                if response.status_code in RETRY_STATUS_CODES and attempt < retries_allowed:
+                    attempt += 1
+                    self._sleep_backoff(attempt, response.headers.get("Retry-After"))
+                    continue
+                self._record(stats_key, started, attempt, error=response.status_code >= 400)
+                return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt < retries_allowed:
+                    attempt += 1
+                    self._sleep_backoff(attempt)
+                    continue
+                self._record(stats_key, started, attempt, error=True)
+                raise
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def _sleep_backoff(self, attempt: int, retry_after: Optional[str] = None) -> None:
+        delay = random.uniform(0, self.backoff_base * (2 ** (attempt - 1)))  # full jitter
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), 5.0))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    # ── service convention ────────────────────────────────────────────────
+    def make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Any] = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Make a request to Supabase REST API"""
+        if not self.is_configured:
+            return {
+                "success": False,
+                "error": "Supabase not configured",
+                "status_code": 500
+            }
+
+        method = method.upper()
+        if method not in {"GET", "POST", "PUT", "PATCH", "DELETE"}:
+            return {
+                "success": False,
+                "error": f"Unsupported HTTP method: {method}",
+                "status_code": 400
+            }
+
+        try:
+            response = self.request(
+                method,
+                endpoint,
+                headers={**self.headers, **headers} if headers else self.headers,
+                params=params,
+                json=data if method != "GET" else None,
+            )
+
+            if response.status_code in [200, 201]:
+                return {
+                    "success": True,
+                    "data": response.json() if response.text else None,
+                    "status_code": response.status_code
+                }
+            elif response.status_code == 404:
+                return {
+                    "success": False,
+                    "error": "Not found",
+                    "status_code": 404
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": response.text or f"HTTP {response.status_code}",
+                    "status_code": response.status_code
+                }
+
+        except Exception as e:
+            logger.error(f"Error making request to {endpoint}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status_code": 500
+            }
+
+    def count(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        mode: str = "exact",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Count rows matching `params` without downloading them.
+
+        Sends HEAD with `Prefer: count=<mode>` and reads the total from the
+        Content-Range header, so the payload is constant whatever the row count.
+        """
+        if not self.is_configured:
+            return {
+                "success": False,
+                "error": "Supabase not configured",
+                "status_code": 500
+            }
+        if mode not in COUNT_MODES:
+            return {
+                "success": False,
+                "error": f"Unsupported count mode: {mode} (expected one of {', '.join(COUNT_MODES)})",
+                "status_code": 400
+            }
+
+        query = {key: value for key, value in (params or {}).items() if key not in ("limit", "offset", "order")}
+        query.setdefault("select", "id")
+        try:
+            response = self.head(
+                endpoint,
+                headers={**self.headers, **(headers or {}), "Prefer": f"count={mode}"},
+                params=query,
+            )
+            if response.status_code not in [200, 206]:
+                return {
+                    "success": False,
+                    "error": response.text or f"HTTP {response.status_code}",
+                    "status_code": response.status_code
+                }
+
+            count = parse_content_range_total(response.headers.get("Content-Range"))
+            if count is None:
+                return {
+                    "success": False,
+                    "error": "Supabase did not return a row count",
+                    "status_code": 502
+                }
+            return {
+                "success": True,
+                "count": count,
+                "count_mode": mode,
+                "data": {"count": count},
+                "status_code": 200
+            }
+
+        except Exception as e:
+            logger.error(f"Error counting {endpoint}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status_code": 500
+            }
+
+    def group_count(
+        self,
+        endpoint: str,
+        group_by: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Count rows per distinct value of `group_by` in one server-side query.
+
+        Returns {"success": True, "data": {value: count}, "total": n}; NULL
+        group values are reported under "null". `params` are PostgREST filters
+        ("status": "eq.active"); only `eq.` filters can be forwarded to the RPC
+        fallback. `headers` replace the service headers (per-user auth tokens).
+        """
+        if not self.is_configured:
+            return {
+                "success": False,
+                "error": "Supabase not configured",
+                "status_code": 500
+            }
+
+        filters = {key: value for key, value in (params or {}).items() if key not in ("select", "limit", "offset", "order")}
+        request_headers = headers if headers is not None else self.headers
+        try:
+            if self._aggregates_available:
+                response = self.get(
+                    endpoint,
+                    headers=request_headers,
+                    params={**filters, "select": f"{group_by},count()"},
+                )
+                if response.status_code == 200:
+                    rows = response.json() or []
+                    return self._group_result(((row.get(group_by), row.get("count")) for row in rows), "aggregate")
+                # Only PGRST123 (aggregate functions disabled on this project) switches
+                # to the RPC for good; any other error (bad column, missing table) is returned.
+                if self.group_count_strategy == "aggregate" or '"PGRST123"' not in (response.text or ""):
+                    return {
+                        "success": False,
+                        "error": response.text or f"HTTP {response.status_code}",
+                        "status_code": response.status_code
+                    }
+                logger.info("PostgREST aggregates disabled (PGRST123); using the group_count RPC")
+                self._aggregates_available = False
+
+            rpc_filters = {}
+            for key, value in filters.items():
+                if not isinstance(value, str) or not value.startswith("eq."):
+                    return {
+                        "success": False,
+                        "error": f"group_count RPC only supports eq. filters (got {key}={value})",
+                        "status_code": 400
+                    }
+                rpc_filters[key] = value[3:]
+
+            response = self.post(
+                "/rpc/group_count",
+                headers=request_headers,
+                json={"table_name": endpoint.strip("/"), "group_column": group_by, "filters": rpc_filters},
+                retry=True,  # read-only function
+            )
+            if response.status_code != 200:
+                return {
+                    "success": False,
+                    "error": response.text or f"HTTP {response.status_code}",
+                    "status_code": response.status_code
+                }
+            rows = response.json() or []
+            return self._group_result(((row.get("group_value"), row.get("row_count")) for row in rows), "rpc")
+
+        except Exception as e:
+            logger.error(f"Error grouping {endpoint} by {group_by}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status_code": 500
+            }
+
+    @staticmethod
+    def _group_result(pairs, source: str) -> Dict[str, Any]:
+        groups: Dict[str, int] = {}
+        for value, count in pairs:
+            key = "null" if value is None else str(value)
+            groups[key] = groups.get(key, 0) + int(count or 0)
+        return {
+            "success": True,
+            "data": groups,
+            "total": sum(groups.values()),
+            "source": source,
+            "status_code": 200
+        }
+
+    # ── instrumentation ───────────────────────────────────────────────────
+    @staticmethod
+    def _resource(url: str) -> str:
+        """Table / RPC / storage bucket a URL addresses, for grouping stats."""
+        path = urlsplit(url).path
+        for prefix in ("/rest/v1/", "/storage/v1/object/"):
+            if prefix in path:
+                rest = path.split(prefix, 1)[1]
+                head = rest.split("/", 2)
+                name = "/".join(head[:2]) if head[0] in ("rpc", "public", "sign") else head[0]
+                return name or "/"
+        return path or "/"
+
+    def _record(self, key: Tuple[str, str], started: float, retries: int, error: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _CallStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.retries += retries
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.last_ms = elapsed_ms
+        if elapsed_ms >= self.slow_call_ms:
+            logger.warning("Slow Supabase call %s %s: %.0f ms (retries=%d)", key[0], key[1], elapsed_ms, retries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            calls = {f"{method} {resource}": stats.as_dict() for (method, resource), stats in sorted(self._stats.items())}
+        return {
+            "pool_size": self.pool_size,
+            "timeouts": {"connect": self.connect_timeout, "read": self.read_timeout},
+            "max_retries": self.max_retries,
+            "calls": calls,
+        }
+
+
+_client: Optional[SupabaseClient] = None
+_client_lock = threading.Lock()
+
+
+def get_supabase_client() -> SupabaseClient:
+    """Process-wide Supabase client shared by every service."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SupabaseClient()
+    return _client
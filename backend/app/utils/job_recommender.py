@@ -0,0 +1,254 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Same tokenisation, weighting and thresholds as the browser implementation
+# this replaces (frontend/src/utils/jobRecommendations.ts), so rankings match.
+STOP_WORDS = frozenset("""
+a an the and or but if in on at to for of with by from as is are was were be been being have has had do does
+did will would could should may might shall can this that these those it its we you your our they their he
+she his her who what which when where how not no nor so yet both either neither also just more most other into
+than then about above after all any each few must only own same such too very during before through up out off
+over under again further once na none
+""".split())
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+MIN_SCORE_THRESHOLD = 0.05
+PREFERENCE_BOOST = 0.1
+MAX_RESUME_WORDS = 500
+
+
+def tokenize(text: Any) -> List[str]:
+    if not text:
+        return []
+    return [t for t in _NON_ALNUM.sub(" ", str(text).lower()).split() if len(t) > 2 and t not in STOP_WORDS]
+
+
+def _as_list(value: Any) -> List[Any]:
+    if isinstance(value, list):
+        return [v for v in value if v]
+    return []
+
+
+def job_document(job: Dict[str, Any]) -> List[str]:
+    return tokenize(" ".join(str(part) for part in [job.get("title"), job.get("description"), job.get("category"),
+                                                     *_as_list(job.get("requirements"))] if part))
+
+
+def student_document(profile: Dict[str, Any], resume: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Tokens describing a student: skills (weighted x3), education, experience, bio and resume text."""
+    profile = profile or {}
+    resume = resume or {}
+    skills: List[str] = []
+    if isinstance(profile.get("skills"), list):
+        skills.extend(str(s) for s in profile["skills"])
+    elif profile.get("skills"):
+        skills.extend(s.strip() for s in re.split(r"[\n,]", str(profile["skills"])) if s.strip())
+    for entry in _as_list(profile.get("skills_entries")):
+        skill = entry.get("skill") if isinstance(entry, dict) else entry
+        if skill:
+            skills.append(str(skill))
+    skills.extend(str(s) for s in _as_list(resume.get("skills")))
+
+    parts: List[Any] = skills * 3
+    if isinstance(profile.get("education_entries"), list):
+        for entry in profile["education_entries"]:
+            if isinstance(entry, dict):
+                parts.extend([entry.get("degree"), entry.get("field"), entry.get("school")])
+    else:
+        parts.append(profile.get("major"))
+    if isinstance(profile.get("work_experience_entries"), list):
+        for entry in profile["work_experience_entries"]:
+            if isinstance(entry, dict):
+                parts.extend([entry.get("title"), entry.get("company"), entry.get("description")])
+    else:
+        parts.append(profile.get("work_experience"))
+    parts.extend([profile.get("bio"), resume.get("file_name")])
+    resume_text = resume.get("resume_text")
+    if isinstance(resume_text, str) and resume_text:
+        parts.append(" ".join(resume_text.split()[:MAX_RESUME_WORDS]))
+
+    return [token for part in parts for token in tokenize(part)]
+
+
+class JobRecommender:
+    """Sparse TF-IDF matrix over active jobs, scored with one matrix product.
+
+    Each job is tokenised once, when it is added or replaced, into a sparse
+    term-frequency row over an append-only vocabulary. After a write the CSR
+    matrix is re-stacked from those cached rows and the IDF weights and row
+    norms recomputed with vector operations on the next query; nothing is
+    re-tokenised or re-fetched.
+    """
+
+    def __init__(self):
+        self._rows: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._vocabulary: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._dirty = True
+        self._job_ids: List[str] = []
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._df = np.zeros(0, dtype=np.int64)
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._job_type = np.zeros(0, dtype=object)
+        self._location = np.zeros(0, dtype=object)
+        self._category = np.zeros(0, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    # ── catalogue updates ─────────────────────────────────────────────────
+    def _row(self, job: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        counts = Counter(job_document(job))
+        total = sum(counts.values()) or 1
+        cols = np.fromiter((self._vocabulary.setdefault(term, len(self._vocabulary)) for term in counts),
+                           dtype=np.int64, count=len(counts))
+        return cols, np.fromiter((count / total for count in counts.values()), dtype=np.float32, count=len(counts))
+
+    def add(self, job: Dict[str, Any]) -> None:
+        """Index an active job (replacing its previous version); other statuses are dropped."""
+        job_id = str(job.get("id") or "")
+        if not job_id:
+            return
+        with self._lock:
+            if (job.get("status") or "active") != "active":
+                self._drop(job_id)
+                return
+            self._rows[job_id] = self._row(job)
+            self._jobs[job_id] = job
+            self._dirty = True
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._drop(str(job_id))
+
+    def _drop(self, job_id: str) -> None:
+        if self._jobs.pop(job_id, None) is not None:
+            self._rows.pop(job_id, None)
+            self._dirty = True
+
+    def rebuild(self, jobs: Iterable[Dict[str, Any]]) -> None:
+        """Replace every job; the vocabulary starts afresh so retired terms go away."""
+        with self._lock:
+            self._vocabulary = {}
+            self._rows = {}
+            self._jobs = {}
+            for job in jobs:
+                job_id = str(job.get("id") or "")
+                if job_id and (job.get("status") or "active") == "active":
+                    self._rows[job_id] = self._row(job)
+                    self._jobs[job_id] = job
+            self._dirty = True
+
+    def _assemble(self) -> None:
+        job_ids = list(self._jobs)
+        rows = [self._rows[job_id] for job_id in job_ids]
+        width = len(self._vocabulary)
+        lengths = np.fromiter((len(cols) for cols, _ in rows), dtype=np.int64, count=len(rows))
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        indices = np.concatenate([cols for cols, _ in rows]) if rows else np.zeros(0, dtype=np.int64)
+        tf = np.concatenate([values for _, values in rows]) if rows else np.zeros(0, dtype=np.float32)
+
+        df = np.bincount(indices, minlength=width)
+        idf = (np.log((len(job_ids) + 1) / (df + 1)) + 1).astype(np.float32)
+        data = tf * idf[indices]
+        # bincount, not reduceat: reduceat misreads empty rows (and fails on a trailing one).
+        row_of = np.repeat(np.arange(len(rows)), lengths)
+        norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=len(rows)))
+        norms[(lengths == 0) | (norms == 0)] = 1.0
+        data /= np.repeat(norms, lengths).astype(np.float32)
+
+        self._matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(job_ids), width))
+        self._idf = idf
+        self._df = df
+        self._job_ids = job_ids
+        self._job_type = np.array([self._jobs[j].get("job_type") or "" for j in job_ids], dtype=object)
+        self._location = np.array([str(self._jobs[j].get("location") or "").lower() for j in job_ids], dtype=object)
+        self._category = np.array([str(self._jobs[j].get("category") or "").lower() for j in job_ids], dtype=object)
+        self._dirty = False
+
+    # ── scoring ───────────────────────────────────────────────────────────
+    def _user_vector(self, tokens: Sequence[str]) -> sparse.csr_matrix:
+        counts = Counter(tokens)
+        cols, values = [], []
+        squared = 0.0
+        for term, count in counts.items():
+            tf = count / len(tokens)
+            col = self._vocabulary.get(term)
+            if col is not None and self._df[col]:
+                cols.append(col)
+                values.append(tf * self._idf[col])
+                squared += values[-1] ** 2
+            else:
+                # Terms no job uses cannot add to a dot product, but (with IDF 1,
+                # as in the browser version) they still count towards the norm.
+                squared += tf * tf
+        norm = math.sqrt(squared)
+        data = np.asarray(values, dtype=np.float32) / (norm or 1.0)
+        return sparse.csr_matrix((data, (np.zeros(len(cols), dtype=np.int64), cols)), shape=(1, len(self._vocabulary)))
+
+    def _preference_boost(self, preferences: Dict[str, Any]) -> np.ndarray:
+        matched = np.zeros(len(self._job_ids), dtype=np.float32)
+        total = 0
+        job_types = [t for t in _as_list(preferences.get("preferred_job_types"))]
+        if job_types:
+            total += 1
+            matched += np.isin(self._job_type, job_types)
+        for key, column in (("preferred_locations", self._location), ("preferred_industries", self._category)):
+            wanted = [str(v).lower() for v in _as_list(preferences.get(key))]
+            if wanted:
+                total += 1
+                matched += np.fromiter((any(w in value for w in wanted) for value in column), dtype=bool, count=len(column))
+        return PREFERENCE_BOOST * matched / total if total else matched
+
+    def recommend(
+        self,
+        tokens: Sequence[str],
+        preferences: Optional[Dict[str, Any]] = None,
+        exclude: Optional[Set[str]] = None,
+        top_k: int = 4,
+        min_score: float = MIN_SCORE_THRESHOLD,
+    ) -> List[Dict[str, Any]]:
+        """Top-k active jobs for a student's tokens: cosine similarity plus preference boost."""
+        if len(set(tokens)) < 3:
+            return []
+        with self._lock:
+            if self._dirty:
+                self._assemble()
+            if not self._job_ids:
+                return []
+            similarity = (self._matrix @ self._user_vector(tokens).T).toarray().ravel()
+            scores = similarity + self._preference_boost(preferences or {})
+            if exclude:
+                scores[np.isin(np.array(self._job_ids, dtype=object), list(exclude))] = -np.inf
+            scores[scores < min_score] = -np.inf
+
+            k = min(top_k, int(np.isfinite(scores).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            user_tokens = set(tokens)
+            return [
+                {
+                    "job": self._jobs[self._job_ids[i]],
+                    "score": round(float(scores[i]), 4),
+                    "similarity": round(float(similarity[i]), 4),
+                    "matchedSkills": [
+                        req for req in _as_list(self._jobs[self._job_ids[i]].get("requirements"))
+                        if user_tokens.intersection(tokenize(req))
+                    ][:3],
+                }
+                for i in top
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._dirty:
+                self._assemble()
+            return {"jobs": len(self._job_ids), "terms": len(self._vocabulary), "nnz": int(self._matrix.nnz)}
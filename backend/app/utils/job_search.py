@@ -0,0 +1,278 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Field weights for BM25F-style scoring: a hit in the title counts three
+# times as much as the same hit in the description.
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "category": 2.0,
+    "employer": 1.5,
+    "requirements": 1.5,
+    "description": 1.0,
+}
+FACETS = ("job_type", "location", "category", "status")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#]+|\.net|\.js)?")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the to was were will with you your we our".split()
+)
+# Discounts for query terms that only matched by prefix or with a typo.
+PREFIX_WEIGHT = 0.6
+FUZZY_WEIGHT = 0.5
+MAX_EXPANSIONS = 30
+
+
+def stem(token: str) -> str:
+    """Light English suffix stripping so "developers", "developing" and "develop" meet."""
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        token = token[:-3] + "y"
+    elif token.endswith("sses"):
+        token = token[:-2]
+    elif token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    if token.endswith("ing") and len(token) > 5:
+        token = token[:-3]
+        if len(token) > 2 and token[-1] == token[-2] and token[-1] not in "ls":
+            token = token[:-1]
+    elif token.endswith("ed") and len(token) > 4:
+        token = token[:-2]
+    if token.endswith("e") and len(token) > 4:
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: Any) -> List[str]:
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(part) for part in text if part)
+    return [stem(token) for token in _TOKEN_RE.findall(str(text).lower()) if token not in _STOPWORDS]
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True when a and b differ by one insert, delete, substitution or adjacent swap."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    i = 0
+    while i < la and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        if a[i + 1:] == b[i + 1:]:
+            return True
+        return i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+    return a[i:] == b[i + 1:]
+
+
+def _facet_value(value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+class JobSearchIndex:
+    """In-memory inverted index over job postings with BM25 ranking.
+
+    Postings map each (stemmed) term to {job_id: field-weighted term
+    frequency}; a sorted vocabulary gives prefix matching via bisect. Jobs
+    are added, replaced and removed one at a time, so writes never rebuild
+    the whole index.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []
+        self._doc_terms: Dict[str, Set[str]] = {}
+        self._doc_length: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._facets: Dict[str, Dict[str, str]] = {}
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    # ── writes ────────────────────────────────────────────────────────────
+    @staticmethod
+    def _fields(job: Dict[str, Any]) -> Dict[str, Any]:
+        employer = job.get("employer") or {}
+        return {
+            "title": job.get("title"),
+            "description": job.get("description"),
+            "requirements": job.get("requirements"),
+            "category": job.get("category"),
+            "employer": employer.get("name") if isinstance(employer, dict) else employer,
+        }
+
+    def add(self, job: Dict[str, Any]) -> None:
+        """Index a job, replacing any previous version with the same id."""
+        job_id = str(job.get("id") or "")
+        if not job_id:
+            return
+        frequencies: Dict[str, float] = {}
+        for field, text in self._fields(job).items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+
+        with self._lock:
+            self._remove(job_id)
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[job_id] = frequency
+            length = sum(frequencies.values())
+            self._doc_terms[job_id] = set(frequencies)
+            self._doc_length[job_id] = length
+            self._total_length += length
+            self._facets[job_id] = {facet: _facet_value(job.get(facet)) for facet in FACETS}
+            self._jobs[job_id] = job
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            return self._remove(str(job_id))
+
+    def _remove(self, job_id: str) -> bool:
+        terms = self._doc_terms.pop(job_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(job_id, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._vocabulary, term)
+                if index < len(self._vocabulary) and self._vocabulary[index] == term:
+                    del self._vocabulary[index]
+        self._total_length -= self._doc_length.pop(job_id, 0.0)
+        self._facets.pop(job_id, None)
+        self._jobs.pop(job_id, None)
+        return True
+
+    def rebuild(self, jobs: Iterable[Dict[str, Any]]) -> None:
+        """Replace the whole index with `jobs` (built aside, swapped in at once)."""
+        fresh = JobSearchIndex(self.k1, self.b)
+        for job in jobs:
+            fresh.add(job)
+        with self._lock:
+            self._postings = fresh._postings
+            self._vocabulary = fresh._vocabulary
+            self._doc_terms = fresh._doc_terms
+            self._doc_length = fresh._doc_length
+            self._total_length = fresh._total_length
+            self._facets = fresh._facets
+            self._jobs = fresh._jobs
+            self.built_at = time.time()
+
+    # ── queries ───────────────────────────────────────────────────────────
+    def _expand(self, term: str, prefix: bool) -> List[Tuple[str, float]]:
+        """Index terms a query term matches: itself, by prefix, else within one typo."""
+        matches: List[Tuple[str, float]] = []
+        if term in self._postings:
+            matches.append((term, 1.0))
+        if prefix and len(term) >= 3:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for candidate in self._vocabulary[start:start + MAX_EXPANSIONS + 1]:
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    matches.append((candidate, PREFIX_WEIGHT))
+        if not matches and len(term) >= 4:
+            for candidate in self._vocabulary:
+                if abs(len(candidate) - len(term)) <= 1 and candidate[0] == term[0] and _within_one_edit(term, candidate):
+                    matches.append((candidate, FUZZY_WEIGHT))
+                    if len(matches) >= MAX_EXPANSIONS:
+                        break
+        return matches
+
+    def _matches_filters(self, job_id: str, filters: Dict[str, str]) -> bool:
+        facets = self._facets[job_id]
+        for facet, wanted in filters.items():
+            # Location keeps the old ilike semantics (substring); the rest are exact.
+            if facet == "location":
+                if wanted not in facets["location"]:
+                    return False
+            elif facets.get(facet) != wanted:
+                return False
+        return True
+
+    def search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Optional[str]]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Rank jobs for `query` (any term may match; more and rarer matches rank higher).
+
+        The last query term also matches by prefix (search-as-you-type);
+        terms with no match fall back to index terms one typo away.
+
+        Returns {"results": [(job, score)], "total", "facets", "took_ms"}; an
+        empty query lists every job passing the filters.
+        """
+        started = time.perf_counter()
+        filters = {facet: _facet_value(value) for facet, value in (filters or {}).items() if facet in FACETS and value}
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._lock:
+            doc_count = len(self._jobs)
+            avg_length = self._total_length / doc_count if doc_count else 0.0
+            scores: Dict[str, float] = {}
+            if terms:
+                last = len(terms) - 1
+                for position, term in enumerate(terms):
+                    for index_term, weight in self._expand(term, prefix=position == last):
+                        postings = self._postings[index_term]
+                        df = len(postings)
+                        idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+                        for job_id, tf in postings.items():
+                            norm = self.k1 * (1.0 - self.b + self.b * self._doc_length[job_id] / avg_length)
+                            scores[job_id] = scores.get(job_id, 0.0) + weight * idf * tf * (self.k1 + 1.0) / (tf + norm)
+            else:
+                scores = {job_id: 0.0 for job_id in self._jobs}
+
+            if filters:
+                scores = {job_id: score for job_id, score in scores.items() if self._matches_filters(job_id, filters)}
+
+            facet_counts: Dict[str, Dict[str, int]] = {facet: {} for facet in ("job_type", "category")}
+            for job_id in scores:
+                for facet, counts in facet_counts.items():
+                    value = self._jobs[job_id].get(facet) or ""
+                    counts[value] = counts.get(value, 0) + 1
+
+            # Only the requested page needs ordering.
+            top = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            page = [(self._jobs[job_id], round(score, 4)) for job_id, score in top[offset:]]
+
+        return {
+            "results": page,
+            "total": len(scores),
+            "facets": facet_counts,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "jobs": len(self._jobs),
+                "terms": len(self._postings),
+                "built_at": self.built_at,
+            }
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DB_PATH = os.path.join(_backend_dir, "data", "resume_parse_cache.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_results (
+    sha256 TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (sha256, extractor)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_parse_results_used ON parse_results (used_at);
+"""
+
+
+def file_digest(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class ParseResultCache:
+    """Parsed-resume payloads keyed by SHA-256 of the file bytes and extractor version.
+
+    A bounded in-memory LRU sits over an optional SQLite tier shared by every
+    process on the host (web workers and the backfill script). The extractor
+    key names the extractor version plus anything else that changes the
+    output for the same bytes (file type, page limit); rows written by any
+    other extractor version are deleted when the cache is opened, so bumping
+    EXTRACTOR_VERSION or editing the skill taxonomy invalidates everything at
+    once.
+    """
+
+    def __init__(
+        self,
+        extractor_version: str,
+        max_entries: int = 256,
+        db_path: Optional[str] = None,
+        max_rows: int = 20000,
+    ):
+        self.extractor_version = extractor_version
+        self.max_entries = max(1, max_entries)
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                with self._connect() as conn:
+                    conn.executescript(_SCHEMA)
+                    dropped = conn.execute(
+                        "DELETE FROM parse_results WHERE extractor NOT LIKE ?", (f"{extractor_version}/%",)
+                    ).rowcount
+                if dropped:
+                    logger.info(f"Dropped {dropped} parse results from older extractor versions")
+            except sqlite3.Error as e:
+                logger.warning(f"Resume parse disk cache disabled ({db_path}): {e}")
+                self.db_path = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Short-lived connections: nothing is held across fork() or between threads.
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def extractor_key(self, filename: str, max_pages: Optional[int] = None) -> str:
+        """Extractor version plus the inputs besides the bytes that shape the output."""
+        kind = os.path.splitext((filename or "").lower())[1].lstrip(".")
+        kind = kind if kind in ("pdf", "docx") else "text"
+        return f"{self.extractor_version}/{kind}/{max_pages or 0}"
+
+    def _remember(self, key: str, payload: Dict[str, Any]) -> None:
+        # Called with self._lock held.
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, digest: str, extractor: str) -> Optional[Dict[str, Any]]:
+        key = f"{digest}:{extractor}"
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return payload
+
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT payload FROM parse_results WHERE sha256 = ? AND extractor = ?", (digest, extractor)
+                    ).fetchone()
+                    if row is not None:
+                        conn.execute(
+                            "UPDATE parse_results SET used_at = ? WHERE sha256 = ? AND extractor = ?",
+                            (time.time(), digest, extractor),
+                        )
+                if row is not None:
+                    payload = json.loads(row[0])
+                    with self._lock:
+                        self._remember(key, payload)
+                        self.disk_hits += 1
+                    return payload
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Resume parse disk cache read failed: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, digest: str, extractor: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(f"{digest}:{extractor}", payload)
+            self._writes += 1
+            trim = self._writes % 100 == 0
+        if not self.db_path:
+            return
+        try:
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO parse_results (sha256, extractor, payload, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (digest, extractor, json.dumps(payload), now, now),
+                )
+                if trim:
+                    # Least recently used rows beyond max_rows go first.
+                    conn.execute(
+                        "DELETE FROM parse_results WHERE (sha256, extractor) IN (SELECT sha256, extractor "
+                        "FROM parse_results ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_rows,),
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Resume parse disk cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "extractor_version": self.extractor_version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_enabled": bool(self.db_path),
+            }
+
+
+_cache: Optional[ParseResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseResultCache:
+    """Process-wide parse cache (RESUME_PARSE_CACHE_* environment variables)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from app.utils.resume_extraction import extractor_version
+
+                disk = os.getenv("RESUME_PARSE_CACHE_DISK", "true").strip().lower() in {"1", "true", "yes", "on"}
+                _cache = ParseResultCache(
+                    extractor_version(),
+                    max_entries=int(os.getenv("RESUME_PARSE_CACHE_ENTRIES", "256")),
+                    db_path=(os.getenv("RESUME_PARSE_CACHE_DB") or DEFAULT_DB_PATH) if disk else None,
+                    max_rows=int(os.getenv("RESUME_PARSE_CACHE_MAX_ROWS", "20000")),
+                )
+    return _cache
@@ -0,0 +1,96 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueryResult:
+    """Outcome of one sub-query: value or error, plus how long it took."""
+
+    __slots__ = ("name", "value", "error", "elapsed_ms", "timed_out")
+
+    def __init__(self, name: str, value: Any = None, error: Optional[str] = None,
+                 elapsed_ms: Optional[float] = None, timed_out: bool = False):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.elapsed_ms = elapsed_ms
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ConcurrentQueryExecutor:
+    """Run independent Supabase sub-queries in parallel under one deadline.
+
+    Each query is a zero-argument callable. A callable returning a service
+    result dict with "success": False counts as failed. Queries still running
+    at the deadline are reported as timed out (their threads finish in the
+    background), so callers can answer with partial results instead of
+    waiting for the slowest source.
+    """
+
+    def __init__(self, max_workers: int = 8, thread_name_prefix: str = "query"):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        # Worker threads do not survive fork; build a fresh pool per process.
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.thread_name_prefix)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    @staticmethod
+    def _timed(name: str, query: Callable[[], Any]) -> QueryResult:
+        started = time.perf_counter()
+        try:
+            value = query()
+            error = None
+            if isinstance(value, dict) and value.get("success") is False:
+                error = value.get("error") or "query failed"
+        except Exception as e:
+            value, error = None, str(e)
+        return QueryResult(name, value=value, error=error, elapsed_ms=(time.perf_counter() - started) * 1000)
+
+    def run(self, queries: Dict[str, Callable[[], Any]], deadline_seconds: float) -> Dict[str, QueryResult]:
+        """Run every query concurrently; return {name: QueryResult} once all finish or the deadline passes."""
+        started = time.perf_counter()
+        futures = {self.pool.submit(self._timed, name, query): name for name, query in queries.items()}
+        done, _ = wait(futures, timeout=max(0.0, deadline_seconds), return_when=ALL_COMPLETED)
+
+        results: Dict[str, QueryResult] = {}
+        for future, name in futures.items():
+            if future in done:
+                results[name] = future.result()
+            else:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                results[name] = QueryResult(name, error=f"timed out after {elapsed_ms:.0f} ms", elapsed_ms=elapsed_ms, timed_out=True)
+                logger.warning("Sub-query %s missed the %.1fs deadline", name, deadline_seconds)
+        return results
+
+
+_executor: Optional[ConcurrentQueryExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> ConcurrentQueryExecutor:
+    """Process-wide executor shared by the analytics endpoints."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ConcurrentQueryExecutor(max_workers=int(os.getenv("ANALYTICS_QUERY_WORKERS", "8")))
+    return _executor
@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DB_PATH = os.path.join(_backend_dir, "data", "registrations.sqlite3")
+# The JSON file EventService used to rewrite on every sign-up; imported once.
+LEGACY_JSON_PATH = os.path.join(_backend_dir, "data", "registrations.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations (
+    event_id TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    registered_at TEXT NOT NULL,
+    PRIMARY KEY (event_id, student_id)
+) WITHOUT ROWID;
+-- Reverse index: student -> registered events.
+CREATE INDEX IF NOT EXISTS idx_registrations_student ON registrations (student_id);
+-- Per-event counts kept in step by triggers, so listings never count rows.
+CREATE TABLE IF NOT EXISTS event_counts (
+    event_id TEXT PRIMARY KEY,
+    registered INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS registrations_count_insert AFTER INSERT ON registrations
+BEGIN
+    INSERT INTO event_counts (event_id, registered) VALUES (NEW.event_id, 1)
+    ON CONFLICT (event_id) DO UPDATE SET registered = registered + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS registrations_count_delete AFTER DELETE ON registrations
+BEGIN
+    UPDATE event_counts SET registered = registered - 1 WHERE event_id = OLD.event_id;
+    DELETE FROM event_counts WHERE event_id = OLD.event_id AND registered <= 0;
+END;
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class RegistrationStore:
+    """Event registrations in a SQLite database (WAL mode).
+
+    Every register/unregister is one indexed row write, not a rewrite of the
+    whole data set. SQLite's file locking serialises writers across gunicorn
+    workers, and WAL lets readers run while a write is in progress, so every
+    worker sees the same registrations without reloading anything.
+
+    SQLite connections must not be open across fork(): open the store lazily
+    in each worker (EventService does), or `close()` it before forking.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[Tuple[int, sqlite3.Connection]] = []
+        self._connections_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+        self._backfill_counts()
+
+    # ── connections ───────────────────────────────────────────────────────
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; connections must not cross a fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        # A connection inherited over fork is left open on purpose: closing it
+        # would drop this process's POSIX locks on the database file.
+        conn = sqlite3.connect(
+            self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        # WAL + NORMAL: durable across process crashes, one fsync per checkpoint.
+        conn.execute("PRAGMA synchronous = NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        with self._connections_lock:
+            self._connections.append((os.getpid(), conn))
+        return conn
+
+    def close(self) -> None:
+        """Close every connection this process opened (e.g. before forking)."""
+        pid = os.getpid()
+        with self._connections_lock:
+            own = [conn for owner, conn in self._connections if owner == pid]
+            self._connections = [(owner, conn) for owner, conn in self._connections if owner != pid]
+        for conn in own:
+            conn.close()
+        self._local = threading.local()
+
+    class _Transaction:
+        def __init__(self, conn: sqlite3.Connection):
+            self.conn = conn
+
+        def __enter__(self) -> sqlite3.Connection:
+            # IMMEDIATE takes the write lock up front instead of failing on upgrade.
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb) -> None:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+    def _write(self) -> "RegistrationStore._Transaction":
+        return self._Transaction(self._connect())
+
+    def _backfill_counts(self) -> None:
+        # Databases created before event_counts existed: count once, then the triggers take over.
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM store_meta WHERE key = 'event_counts'").fetchone() is not None:
+                return
+            conn.execute("DELETE FROM event_counts")
+            conn.execute(
+                "INSERT INTO event_counts (event_id, registered) "
+                "SELECT event_id, COUNT(*) FROM registrations GROUP BY event_id"
+            )
+            conn.execute("INSERT INTO store_meta (key, value) VALUES ('event_counts', 'v1')")
+
+    # ── writes ────────────────────────────────────────────────────────────
+    def register(self, event_id: str, student_id: str) -> bool:
+        """Add a registration; False if the student was already registered."""
+        with self._write() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO registrations (event_id, student_id, registered_at) VALUES (?, ?, ?)",
+                (event_id, student_id, datetime.utcnow().isoformat()),
+            )
+            return cursor.rowcount == 1
+
+    def unregister(self, event_id: str, student_id: str) -> bool:
+        """Remove a registration; False if there was none."""
+        with self._write() as conn:
+            cursor = conn.execute(
+                "DELETE FROM registrations WHERE event_id = ? AND student_id = ?",
+                (event_id, student_id),
+            )
+            return cursor.rowcount == 1
+
+    def delete_event(self, event_id: str) -> int:
+        """Drop every registration for an event; returns how many were removed."""
+        with self._write() as conn:
+            return conn.execute("DELETE FROM registrations WHERE event_id = ?", (event_id,)).rowcount
+
+    def add_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Insert (event_id, student_id) pairs in one transaction, skipping duplicates."""
+        now = datetime.utcnow().isoformat()
+        with self._write() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO registrations (event_id, student_id, registered_at) VALUES (?, ?, ?)",
+                ((event_id, student_id, now) for event_id, student_id in pairs),
+            )
+            return max(cursor.rowcount, 0)
+
+    # ── reads ─────────────────────────────────────────────────────────────
+    def is_registered(self, event_id: str, student_id: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM registrations WHERE event_id = ? AND student_id = ?", (event_id, student_id)
+        ).fetchone()
+        return row is not None
+
+    def students(self, event_id: str) -> List[str]:
+        """Student ids registered for an event, in sign-up order."""
+        rows = self._connect().execute(
+            "SELECT student_id FROM registrations WHERE event_id = ? ORDER BY registered_at, student_id",
+            (event_id,),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, event_id: str) -> int:
+        row = self._connect().execute(
+            "SELECT registered FROM event_counts WHERE event_id = ?", (event_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def counts(self) -> Dict[str, int]:
+        """{event_id: registered} for every event with registrations."""
+        return dict(self._connect().execute("SELECT event_id, registered FROM event_counts"))
+
+    def events_for_student(self, student_id: str) -> Set[str]:
+        """Ids of the events a student is registered for (reverse index)."""
+        rows = self._connect().execute(
+            "SELECT event_id FROM registrations WHERE student_id = ?", (student_id,)
+        )
+        return {row[0] for row in rows}
+
+    def registrants(self, event_id: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """One page of an event's registrations, in sign-up order."""
+        rows = self._connect().execute(
+            "SELECT student_id, registered_at FROM registrations WHERE event_id = ? "
+            "ORDER BY registered_at, student_id LIMIT ? OFFSET ?",
+            (event_id, limit, offset),
+        )
+        return [{"student_id": student_id, "registered_at": registered_at} for student_id, registered_at in rows]
+
+    def all(self) -> Dict[str, List[str]]:
+        """{event_id: [student_ids]} for every event with registrations."""
+        registrations: Dict[str, List[str]] = {}
+        rows = self._connect().execute(
+            "SELECT event_id, student_id FROM registrations ORDER BY event_id, registered_at, student_id"
+        )
+        for event_id, student_id in rows:
+            registrations.setdefault(event_id, []).append(student_id)
+        return registrations
+
+    def stats(self) -> Dict[str, int]:
+        total, events = self._connect().execute(
+            "SELECT COALESCE(SUM(registered), 0), COUNT(*) FROM event_counts"
+        ).fetchone()
+        return {"registrations": total, "events": events}
+
+    # ── migration ─────────────────────────────────────────────────────────
+    def import_legacy_json(self, json_path: str = LEGACY_JSON_PATH) -> int:
+        """Copy {event_id: [student_ids]} from the old JSON file, once per database."""
+        if not os.path.exists(json_path):
+            return 0
+        with self._write() as conn:
+            marker = conn.execute("SELECT value FROM store_meta WHERE key = 'legacy_json_imported'").fetchone()
+            if marker is not None:
+                return 0
+            try:
+                with open(json_path, "r") as f:
+                    legacy = json.load(f) or {}
+            except Exception as e:
+                logger.error(f"Could not read legacy registrations {json_path}: {e}")
+                legacy = {}
+            now = datetime.utcnow().isoformat()
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO registrations (event_id, student_id, registered_at) VALUES (?, ?, ?)",
+                ((event_id, student_id, now) for event_id, students in legacy.items() for student_id in students or []),
+            )
+            imported = max(cursor.rowcount, 0)
+            conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('legacy_json_imported', ?)",
+                (f"{json_path} @ {now}",),
+            )
+        logger.info(f"Imported {imported} registrations from {json_path}")
+        return imported
+
+
+_store: Optional[RegistrationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_registration_store() -> RegistrationStore:
+    """Process-wide registration store (REGISTRATIONS_DB_PATH, default data/registrations.sqlite3)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = RegistrationStore(os.getenv("REGISTRATIONS_DB_PATH") or DEFAULT_DB_PATH)
+                store.import_legacy_json()
+                _store = store
+    return _store
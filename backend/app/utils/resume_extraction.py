@@ -0,0 +1,319 @@
+import io
+import json
+import logging
+import os
+import re
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.skill_extractor import extract_skills, get_skill_extractor
+
+logger = logging.getLogger(__name__)
+
+# This module is imported by the parse worker processes: keep its imports light
+# (pdfplumber/python-docx are imported inside the worker functions).
+
+# Part of the parse cache key (app/utils/parse_cache.py) together with the
+# skill taxonomy fingerprint: bump it whenever a change here alters the
+# payload produced for the same file bytes.
+EXTRACTOR_VERSION = "3"
+
+_backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Job records hold the full resume text: keep them out of the shared /tmp.
+DEFAULT_RESULTS_DIR = os.path.join(_backend_dir, "data", "resume_parse_jobs")
+
+
+def extractor_version() -> str:
+    """EXTRACTOR_VERSION plus the fingerprint of the loaded skill taxonomy."""
+    return f"{EXTRACTOR_VERSION}.{get_skill_extractor().fingerprint}"
+
+
+class ParseTimeoutError(Exception):
+    """Raised inside a worker when one file takes longer than its time budget."""
+
+
+class ParseQueueFullError(Exception):
+    """Raised when the parse queue already holds `max_pending` files."""
+
+
+def extract_text(file_bytes: bytes, filename: str, max_pages: Optional[int] = None) -> Dict[str, Any]:
+    """Plain text from PDF, DOCX or (best effort) UTF-8 bytes: {"text", "pages", "truncated"}."""
+    name = (filename or '').lower()
+
+    if name.endswith('.pdf'):
+        import pdfplumber
+        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+            pages = pdf.pages if not max_pages else pdf.pages[:max_pages]
+            text = '\n'.join(page.extract_text() or '' for page in pages)
+            return {"text": text, "pages": len(pdf.pages), "truncated": len(pages) < len(pdf.pages)}
+
+    if name.endswith('.docx'):
+        import docx
+        doc = docx.Document(io.BytesIO(file_bytes))
+        return {"text": '\n'.join(para.text for para in doc.paragraphs), "pages": None, "truncated": False}
+
+    # DOC or unknown — best-effort UTF-8 decode
+    return {"text": file_bytes.decode('utf-8', errors='ignore'), "pages": None, "truncated": False}
+
+
+def extract_ratings(text: str) -> Dict[str, str]:
+    # Labels are capped at 60 characters: an unbounded lazy label rescans a
+    # whole run of words from every position, quadratic on long lines.
+    ratings = {}
+    for match in re.finditer(r'([\w ]{1,60}?)\s*[:\-]\s*(\d+)\s*/\s*(\d+)', text):
+        key = match.group(1).strip().lower()
+        ratings[key] = f'{match.group(2)}/{match.group(3)}'
+    for match in re.finditer(r'([\w ]{1,60}?)\s*[:\-]\s*(\d+)\s*%', text):
+        key = match.group(1).strip().lower()
+        ratings.setdefault(key, match.group(2))
+    return ratings
+
+
+def parse_resume_bytes(file_bytes: bytes, filename: str, max_pages: Optional[int] = None) -> Dict[str, Any]:
+    """Full parse payload: {"resume_text", "skills", "ratings", "pages", "truncated"}."""
+    extracted = extract_text(file_bytes, filename, max_pages=max_pages)
+    text = extracted["text"]
+    return {
+        "resume_text": text,
+        "skills": extract_skills(text),
+        "ratings": extract_ratings(text),
+        "pages": extracted["pages"],
+        "truncated": extracted["truncated"],
+    }
+
+
+def _on_alarm(signum, frame):
+    raise ParseTimeoutError("Resume parsing timed out")
+
+
+def parse_with_timeout(file_bytes: bytes, filename: str, max_pages: Optional[int], timeout_seconds: float) -> Dict[str, Any]:
+    """parse_resume_bytes for a pool worker: ParseTimeoutError once `timeout_seconds` have passed."""
+    # Tasks run on the worker's main thread, so a timer signal can interrupt
+    # pdfplumber mid-file and free the worker for the next job.
+    use_alarm = timeout_seconds > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        return parse_resume_bytes(file_bytes, filename, max_pages=max_pages)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def parse_pool_context():
+    """Start method for parse worker pools."""
+    # Forking a threaded process (web worker, download threads) can deadlock
+    # the child; forkserver/spawn do not fork it.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # The fork server would otherwise import __main__ (run.py -> create_app()).
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class ResumeParseExecutor:
+    """Resume parsing in a bounded pool of worker processes.
+
+    PDF extraction holds the GIL for seconds per file, so it never runs on a
+    request thread: `submit` hands the bytes to a worker process and returns
+    a job id at once, and `result` polls (or waits a bounded time) for the
+    outcome. Each file gets `timeout_seconds` and at most `max_pages` pages.
+
+    Job records are JSON files in `results_dir`, so any gunicorn worker can
+    answer a poll for a job another worker accepted. Finished records are
+    kept for `result_ttl_seconds`. They contain the extracted resume text, so
+    the directory is private to the service user (0700, records 0600).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 32,
+        timeout_seconds: float = 30.0,
+        max_pages: int = 20,
+        results_dir: Optional[str] = None,
+        result_ttl_seconds: float = 900.0,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout_seconds = timeout_seconds
+        self.max_pages = max_pages
+        self.results_dir = results_dir or DEFAULT_RESULTS_DIR
+        self.result_ttl_seconds = result_ttl_seconds
+        os.makedirs(self.results_dir, mode=0o700, exist_ok=True)
+        # makedirs leaves an existing directory's mode alone.
+        os.chmod(self.results_dir, 0o700)
+
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._futures: Dict[str, Future] = {}
+        self._stats = {"submitted": 0, "done": 0, "failed": 0, "timeout": 0, "rejected": 0}
+        self._last_prune = 0.0
+
+    # ── pool ──────────────────────────────────────────────────────────────
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Pools do not survive fork: each process (gunicorn worker) starts its own.
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=parse_pool_context())
+            self._pool_pid = os.getpid()
+            self._futures = {}
+        return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ── job records ───────────────────────────────────────────────────────
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        tmp_path = f"{self._path(record['job_id'])}.{os.getpid()}.tmp"
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self._path(record["job_id"]))
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _prune(self) -> None:
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        for name in os.listdir(self.results_dir):
+            path = os.path.join(self.results_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.result_ttl_seconds:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    # ── submit / poll ─────────────────────────────────────────────────────
+    def submit(
+        self,
+        file_bytes: bytes,
+        filename: str,
+        on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> str:
+        """Queue a file for parsing and return its job id (ParseQueueFullError when saturated)."""
+        self._prune()
+        job_id = uuid.uuid4().hex
+        record = {"job_id": job_id, "status": "pending", "filename": filename, "submitted_at": time.time()}
+        with self._lock:
+            pool = self._get_pool()
+            pending = sum(1 for future in self._futures.values() if not future.done())
+            if pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise ParseQueueFullError(f"{pending} resumes are already being parsed")
+            self._write(record)
+            try:
+                future = pool.submit(parse_with_timeout, file_bytes, filename, self.max_pages, self.timeout_seconds)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM on a hostile PDF): replace the pool once.
+                self._pool = None
+                future = self._get_pool().submit(parse_with_timeout, file_bytes, filename, self.max_pages, self.timeout_seconds)
+            self._futures[job_id] = future
+            self._stats["submitted"] += 1
+        future.add_done_callback(lambda f: self._finish(record, f, on_done))
+        return job_id
+
+    def _finish(self, record: Dict[str, Any], future: Future, on_done: Optional[Callable]) -> None:
+        finished = {**record, "finished_at": time.time()}
+        try:
+            finished.update(status="done", result=future.result())
+        except ParseTimeoutError:
+            finished.update(status="timeout", error=f"Parsing took longer than {self.timeout_seconds:g}s")
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+            finished.update(status="failed", error="Parser worker crashed")
+        except Exception as e:
+            finished.update(status="failed", error=str(e) or e.__class__.__name__)
+        try:
+            self._write(finished)
+        except OSError as e:
+            logger.error(f"Could not store resume parse result {record['job_id']}: {e}")
+        # Dropped only once the record is on disk: result() waits on this.
+        with self._lock:
+            self._stats[finished["status"]] += 1
+            self._futures.pop(record["job_id"], None)
+        if on_done is not None and finished["status"] == "done":
+            try:
+                on_done(finished["result"])
+            except Exception as e:
+                logger.warning(f"Resume parse callback failed for {record['job_id']}: {e}")
+
+    def result(self, job_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+        """The job record ({"status": pending|done|failed|timeout, ...}), waiting up to `wait` seconds; None if unknown."""
+        if not re.fullmatch(r"[0-9a-f]{32}", job_id or ""):
+            return None
+        future = self._futures.get(job_id)
+        if future is not None and wait > 0:
+            try:
+                future.exception(timeout=wait)
+            except Exception:
+                pass
+            # The done callback writes the record; give it a moment to land.
+            deadline = time.monotonic() + 1.0
+            while job_id in self._futures and future.done() and time.monotonic() < deadline:
+                time.sleep(0.005)
+        elif future is None and wait > 0:
+            # Accepted by another process: poll its record file.
+            deadline = time.monotonic() + wait
+            record = self._read(job_id)
+            while record is not None and record["status"] == "pending" and time.monotonic() < deadline:
+                time.sleep(0.1)
+                record = self._read(job_id)
+            return record
+
+        record = self._read(job_id)
+        if record is not None and record["status"] == "pending":
+            # Jobs stuck past their budget (e.g. a worker lost in a crash) are reported, not awaited forever.
+            if time.time() - record["submitted_at"] > self.timeout_seconds * 4 + 60:
+                record = {**record, "status": "timeout", "error": "Parsing did not finish"}
+        return record
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "pending": sum(1 for future in self._futures.values() if not future.done()),
+                "max_pending": self.max_pending,
+                **self._stats,
+            }
+
+
+_executor: Optional[ResumeParseExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_resume_parse_executor() -> ResumeParseExecutor:
+    """Process-wide parse executor configured from RESUME_PARSE_* environment variables."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ResumeParseExecutor(
+                    max_workers=int(os.getenv("RESUME_PARSE_WORKERS", "2")),
+                    max_pending=int(os.getenv("RESUME_PARSE_MAX_PENDING", "32")),
+                    timeout_seconds=float(os.getenv("RESUME_PARSE_TIMEOUT_SECONDS", "30")),
+                    max_pages=int(os.getenv("RESUME_PARSE_MAX_PAGES", "20")),
+                    results_dir=os.getenv("RESUME_PARSE_RESULTS_DIR") or None,
+                )
+    return _executor
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_TAXONOMY_PATH = os.path.join(_backend_dir, "data", "skills", "skill_taxonomy.json")
+
+# Tokens keep the punctuation that is part of skill names (c++, c#, node.js,
+# .net) and split on everything else, so "problem-solving" and "problem
+# solving" tokenize alike and a trailing full stop is never part of a token.
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+SkillEntry = Union[str, Dict[str, Any]]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class SkillExtractor:
+    """All taxonomy skills mentioned in a text, found in one pass.
+
+    Every skill name and alias is tokenized and compiled into an Aho–Corasick
+    automaton whose alphabet is tokens, not characters, so matches always sit
+    on token boundaries ('java' does not fire inside 'javascript', 'sql' not
+    inside 'postgresql') and extraction is linear in the length of the text
+    however many skills the taxonomy holds.
+
+    Taxonomy entries are skill names or dicts:
+        {"name": "javascript", "aliases": ["js", "ecmascript"], "match_name": true}
+    `match_name: false` keeps an ambiguous bare name (e.g. "word") out of the
+    automaton so that only its aliases ("microsoft word") count.
+    """
+
+    def __init__(self, skills: Iterable[SkillEntry], version: str = ""):
+        self.names: List[str] = []
+        self._rank: Dict[str, int] = {}
+        # Trie over tokens: per-state transitions, failure links and the
+        # (skill, phrase length in tokens) pairs ending there.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Tuple[str, int], ...]] = [()]
+
+        phrases = 0
+        for entry in skills:
+            if isinstance(entry, str):
+                entry = {"name": entry}
+            name = str(entry.get("name") or "").strip().lower()
+            if not name:
+                continue
+            if name not in self._rank:
+                self._rank[name] = len(self.names)
+                self.names.append(name)
+            terms = [str(alias) for alias in entry.get("aliases") or []]
+            if entry.get("match_name", True):
+                terms.insert(0, name)
+            for term in terms:
+                if self._add(tokenize(term), name):
+                    phrases += 1
+        self._link()
+        self.phrases = phrases
+
+        digest = hashlib.sha256(version.encode("utf-8"))
+        for name in self.names:
+            digest.update(name.encode("utf-8") + b"\0")
+        for state, out in enumerate(self._out):
+            if out:
+                digest.update(f"{state}:{out!r};".encode("utf-8"))
+        # Changes whenever the compiled taxonomy does (see EXTRACTOR_VERSION in resume_extraction).
+        self.fingerprint = digest.hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillExtractor":
+        """Load a JSON taxonomy: a list of entries or {"version": ..., "skills": [...]}."""
+        with open(path, "r", encoding="utf-8") as f:
+            taxonomy = json.load(f)
+        if isinstance(taxonomy, list):
+            return cls(taxonomy)
+        return cls(taxonomy.get("skills") or [], version=str(taxonomy.get("version") or ""))
+
+    def _add(self, tokens: List[str], name: str) -> bool:
+        if not tokens:
+            return False
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        if (name, len(tokens)) not in self._out[state]:
+            self._out[state] = self._out[state] + ((name, len(tokens)),)
+        return True
+
+    def _link(self) -> None:
+        # Breadth-first, so every failure target is finished before it is used.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                inherited = tuple(n for n in self._out[self._fail[child]] if n not in self._out[child])
+                if inherited:
+                    self._out[child] = self._out[child] + inherited
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def matches(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """(skill, first token, last token + 1) for every mention, overlapping ones included."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, token in enumerate(tokenize(text)):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for name, length in out[state]:
+                yield name, position + 1 - length, position + 1
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct skills mentioned in `text`, in taxonomy order."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for name, _ in out[state]:
+                found.add(name)
+        return sorted(found, key=self._rank.__getitem__)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"skills": len(self.names), "phrases": self.phrases, "states": len(self._goto), "fingerprint": self.fingerprint}
+
+
+_extractor: Optional[SkillExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_skill_extractor() -> SkillExtractor:
+    """Process-wide extractor compiled from SKILL_TAXONOMY_PATH (data/skills/skill_taxonomy.json)."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                path = os.getenv("SKILL_TAXONOMY_PATH") or DEFAULT_TAXONOMY_PATH
+                _extractor = SkillExtractor.from_file(path)
+                logger.info(f"Skill taxonomy loaded from {path}: {_extractor.stats()}")
+    return _extractor
+
+
+def extract_skills(text: str) -> List[str]:
+    return get_skill_extractor().extract(text)
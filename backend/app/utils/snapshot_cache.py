@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def compute_etag(value: Any) -> str:
+    """Opaque tag over the JSON form of a value (sent as a weak ETag)."""
+    payload = json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def is_successful_result(value: Any) -> bool:
+    """Service result dicts with "success": False are never cached."""
+    return not (isinstance(value, dict) and value.get("success") is False)
+
+
+class _Entry:
+    __slots__ = ("value", "etag", "stored_at", "ttl", "stale_ttl")
+
+    def __init__(self, value: Any, etag: str, ttl: float, stale_ttl: float):
+        self.value = value
+        self.etag = etag
+        self.stored_at = time.monotonic()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class _Load(Future):
+    """A pending load and the generation of its key when it started."""
+
+    def __init__(self, generation: int):
+        super().__init__()
+        self.generation = generation
+
+
+class SnapshotCache:
+    """In-memory snapshot cache with stale-while-revalidate.
+
+    - age < ttl: served from memory ("fresh").
+    - ttl <= age < ttl + stale_ttl: the stale value is served immediately and
+      one background refresh is started ("stale").
+    - older or missing: loaded synchronously ("miss"); concurrent misses for
+      the same key wait on a single load instead of each hitting the database.
+
+    invalidate() bumps the generation of the keys it drops; a load that was
+    already running when that happened returns its value to its callers but
+    does not store it, so a write is never undone by an in-flight refresh.
+    """
+
+    def __init__(self, default_ttl: float = 30.0, default_stale_ttl: float = 300.0,
+                 cacheable: Callable[[Any], bool] = is_successful_result,
+                 etag_of: Callable[[Any], Any] = lambda value: value):
+        self.default_ttl = default_ttl
+        self.default_stale_ttl = default_stale_ttl
+        self.cacheable = cacheable
+        # The part of a value the ETag covers (e.g. leave out per-load timings).
+        self.etag_of = etag_of
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, _Load] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"fresh": 0, "stale": 0, "miss": 0, "coalesced": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        force_refresh: bool = False,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Return (value, meta) where meta has state, etag, age and ttl."""
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.default_stale_ttl if stale_ttl is None else stale_ttl
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not force_refresh:
+                age = entry.age()
+                if age < entry.ttl:
+                    self._stats["fresh"] += 1
+                    return entry.value, self._meta("fresh", entry)
+                if age < entry.ttl + entry.stale_ttl:
+                    self._stats["stale"] += 1
+                    if key not in self._inflight:
+                        self._start_load(key, loader, ttl, stale_ttl, background=True)
+                    return entry.value, self._meta("stale", entry)
+
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._start_load(key, loader, ttl, stale_ttl, background=False)
+                owner = True
+                self._stats["miss"] += 1
+            else:
+                owner = False
+                self._stats["coalesced"] += 1
+
+        if owner:
+            self._load(key, loader, ttl, stale_ttl, future)
+        value = future.result()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.value is value:
+            return value, self._meta("miss", entry)
+        return value, {"state": "miss", "etag": compute_etag(self.etag_of(value)), "age": 0.0, "ttl": ttl}
+
+    def _start_load(self, key, loader, ttl, stale_ttl, background: bool) -> _Load:
+        future = _Load(self._generations.get(key, 0))
+        self._inflight[key] = future
+        if background:
+            threading.Thread(
+                target=self._load, args=(key, loader, ttl, stale_ttl, future),
+                name=f"snapshot-refresh-{key}", daemon=True,
+            ).start()
+        return future
+
+    def _finish_load(self, key, future: _Load) -> None:
+        # Called with self._lock held. An invalidated load may have been replaced by a newer one.
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def _load(self, key, loader, ttl, stale_ttl, future: _Load) -> None:
+        try:
+            value = loader()
+        except Exception as e:
+            logger.error(f"Snapshot refresh for {key} failed: {str(e)}")
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+                self._finish_load(key, future)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._stats["refreshes"] += 1
+            if not self.cacheable(value):
+                self._stats["refresh_errors"] += 1
+            elif self._generations.get(key, 0) == future.generation:
+                self._entries[key] = _Entry(value, compute_etag(self.etag_of(value)), ttl, stale_ttl)
+            self._finish_load(key, future)
+        future.set_result(value)
+
+    def peek(self, key: Hashable) -> Any:
+        """Cached value if it is still fresh, else None; never loads or counts."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.age() < entry.ttl:
+                return entry.value
+        return None
+
+    @staticmethod
+    def _meta(state: str, entry: _Entry) -> Dict[str, Any]:
+        return {"state": state, "etag": entry.etag, "age": round(entry.age(), 3), "ttl": entry.ttl}
+
+    def invalidate(self, key: Optional[Hashable] = None, prefix: Optional[str] = None) -> int:
+        """Drop one key, every key whose first element/str starts with `prefix`, or everything.
+
+        Loads in flight for those keys are discarded when they finish; the next
+        get() starts a new one. Returns the number of cached entries dropped.
+        """
+        with self._lock:
+            if key is not None:
+                victims = [key]
+            else:
+                victims = [
+                    k for k in set(self._entries) | set(self._inflight)
+                    if prefix is None or str(k[0] if isinstance(k, tuple) else k).startswith(prefix)
+                ]
+            dropped = 0
+            for k in victims:
+                self._generations[k] = self._generations.get(k, 0) + 1
+                self._inflight.pop(k, None)
+                dropped += self._entries.pop(k, None) is not None
+            return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["fresh"] + self._stats["stale"] + self._stats["miss"] + self._stats["coalesced"]
+            hits = lookups - self._stats["miss"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+            }
@@ -1,154 +1,438 @@
 """
-One-time backfill script: extracts text and skills from all existing resume files
-in Supabase Storage and updates the resumes table with resume_text and skills.
+Backfill script: extracts text, skills and ratings from existing resume files
+in Supabase Storage and writes resume_text/skills/ratings on the resumes table.
+
+Runs as a pipeline: resumes without text are streamed from the table a page
+at a time, downloaded by a pool of threads, parsed in worker processes (files
+parsed before are answered from the parse cache) and written back in batches.
+A checkpoint file records the last page that was completely written, so an
+interrupted run picks up where it stopped.
 
 Run from the backend directory:
-    python backfill_resume_text.py
+    python backfill_resume_text.py [--downloads 8] [--workers N] [--batch-size 50] [--limit N] [--restart]
 
 Requires the .env file to be present with SUPABASE_URL and SUPABASE_KEY.
 """
 
+import argparse
+import json
 import os
-import io
-import re
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import requests
-import pdfplumber
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from app.utils.parse_cache import file_digest, get_parse_cache  # noqa: E402  (reads env populated above)
+from app.utils.resume_extraction import ParseTimeoutError, parse_pool_context, parse_with_timeout  # noqa: E402
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 BUCKET = "resumes"
 
+# Same page limit and time budget as the upload parser, so both share parse cache entries.
+MAX_PAGES = int(os.getenv("RESUME_PARSE_MAX_PAGES", "20"))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("RESUME_PARSE_TIMEOUT_SECONDS", "30"))
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "backfill_resume_text.checkpoint.json")
+
+# Concurrent PATCH requests per written batch.
+WRITE_CONCURRENCY = 8
+RESULT_COLUMNS = ("resume_text", "skills", "ratings")
+MISSING_TEXT = "(resume_text.is.null,resume_text.eq.)"
+
 HEADERS = {
     "apikey": SUPABASE_KEY,
     "Authorization": f"Bearer {SUPABASE_KEY}",
     "Content-Type": "application/json",
 }
 
-SKILL_KEYWORDS = [
-    'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
-    'node', 'html', 'css', 'sql', 'mysql', 'postgresql', 'mongodb', 'git',
-    'docker', 'kubernetes', 'aws', 'azure', 'linux', 'c++', 'c#', 'php',
-    'rest api', 'machine learning', 'data analysis', 'figma', 'photoshop',
-    'excel', 'powerpoint', 'word', 'microsoft office', 'agile', 'scrum',
-    'communication', 'leadership', 'teamwork', 'problem solving',
-    'project management', 'teaching', 'curriculum', 'child development',
-    'github', 'notion',
-]
-
-
-def extract_text_from_bytes(file_bytes: bytes, filename: str) -> str:
-    filename_lower = filename.lower()
-    if filename_lower.endswith('.pdf'):
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            return '\n'.join(page.extract_text() or '' for page in pdf.pages)
-    if filename_lower.endswith('.docx'):
-        import docx
-        doc = docx.Document(io.BytesIO(file_bytes))
-        return '\n'.join(para.text for para in doc.paragraphs)
-    return file_bytes.decode('utf-8', errors='ignore')
-
-
-def extract_skills(text: str) -> list:
-    text_lower = text.lower()
-    return [skill for skill in SKILL_KEYWORDS if skill in text_lower]
-
-
-def extract_ratings(text: str) -> dict:
-    ratings = {}
-    for match in re.finditer(r'([\w ]+?)\s*[:\-]\s*(\d+)\s*/\s*(\d+)', text):
-        key = match.group(1).strip().lower()
-        ratings[key] = f'{match.group(2)}/{match.group(3)}'
-    for match in re.finditer(r'([\w ]+?)\s*[:\-]\s*(\d+)\s*%', text):
-        key = match.group(1).strip().lower()
-        ratings.setdefault(key, match.group(2))
-    return ratings
-
-
-def get_all_resumes():
-    resp = requests.get(
+session = requests.Session()
+session.headers.update(HEADERS)
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+
+# ── Supabase ─────────────────────────────────────────────────────────────────
+def count_pending(after_id):
+    """Resumes still without text after `after_id` (None when the count is unavailable)."""
+    params = {"select": "id", "or": MISSING_TEXT}
+    if after_id:
+        params["id"] = f"gt.{after_id}"
+    resp = session.head(
         f"{SUPABASE_URL}/rest/v1/resumes",
-        headers=HEADERS,
-        params={"select": "id,file_path,file_name,resume_text"}
+        params=params,
+        headers={"Prefer": "count=exact", "Range": "0-0"},
+        timeout=30,
     )
-    resp.raise_for_status()
-    return resp.json()
+    total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
 
 
-def get_signed_url(file_path: str) -> str:
-    resp = requests.post(
-        f"{SUPABASE_URL}/storage/v1/object/sign/{BUCKET}/{file_path}",
-        headers=HEADERS,
-        json={"expiresIn": 300}
+def iter_pages(after_id, page_size):
+    """Pages of resumes without text, in id order after `after_id` (keyset pagination)."""
+    while True:
+        params = {"select": "*", "or": MISSING_TEXT, "order": "id.asc", "limit": page_size}
+        if after_id:
+            params["id"] = f"gt.{after_id}"
+        resp = session.get(f"{SUPABASE_URL}/rest/v1/resumes", params=params, timeout=60)
+        resp.raise_for_status()
+        page = resp.json()
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        after_id = page[-1]["id"]
+
+
+def sign_urls(paths):
+    """Signed download URLs for a page of storage paths, in one request."""
+    resp = session.post(
+        f"{SUPABASE_URL}/storage/v1/object/sign/{BUCKET}",
+        json={"expiresIn": 3600, "paths": paths},
+        timeout=30,
     )
     resp.raise_for_status()
-    return resp.json()["signedURL"]
+    return {item.get("path"): item.get("signedURL") for item in resp.json() if item.get("signedURL")}
 
 
-def update_resume(resume_id: str, resume_text: str, skills: list, ratings: dict):
-    # Try with all fields first; fall back to resume_text only if skills/ratings columns don't exist
-    for payload in [
-        {"resume_text": resume_text, "skills": skills, "ratings": ratings},
-        {"resume_text": resume_text},
-    ]:
-        resp = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/resumes",
-            headers={**HEADERS, "Prefer": "return=minimal"},
-            params={"id": f"eq.{resume_id}"},
-            json=payload,
-        )
-        if resp.status_code == 400 and ("skills" in resp.text or "ratings" in resp.text):
-            continue  # column missing, retry with fewer fields
-        resp.raise_for_status()
-        return
+def download(signed_url):
+    resp = session.get(f"{SUPABASE_URL}/storage/v1{signed_url}", timeout=60)
     resp.raise_for_status()
+    return resp.content
 
 
-def main():
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        print("ERROR: SUPABASE_URL and SUPABASE_KEY must be set in .env")
-        return
+def _patch_row(row):
+    try:
+        resp = session.patch(
+            f"{SUPABASE_URL}/rest/v1/resumes",
+            params={"id": f"eq.{row['id']}"},
+            headers={"Prefer": "return=minimal"},
+            json={key: value for key, value in row.items() if key != "id"},
+            timeout=30,
+        )
+    except requests.RequestException as e:
+        # Recorded as this row's failure; the rest of the batch is still written.
+        return f"write failed: {e}"
+    return None if resp.ok else f"HTTP {resp.status_code}: {resp.text[:200]}"
+
+
+def write_batch(rows):
+    """Write parse results for a batch of resumes; returns {resume_id: error} for rows that failed.
+
+    Each row is a PATCH filtered on its id, never an upsert: a resume deleted
+    while the backfill ran matches nothing and stays deleted. The PATCHes of
+    a batch run concurrently over the shared connection pool.
+    """
+    with ThreadPoolExecutor(max_workers=min(WRITE_CONCURRENCY, len(rows)), thread_name_prefix="write") as pool:
+        errors = list(pool.map(_patch_row, rows))
+    return {row["id"]: error for row, error in zip(rows, errors) if error}
+
+
+# ── checkpoint / progress ────────────────────────────────────────────────────
+class Checkpoint:
+    """Last resume id up to which every page has been written (or recorded as failed)."""
+
+    def __init__(self, path, restart=False):
+        self.path = path
+        self.state = {"last_id": None, "updated": 0, "failed": {}}
+        if not restart and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+        self._pages = {}
+        self._next_page = 0
+
+    @property
+    def last_id(self):
+        return self.state["last_id"]
+
+    def add_page(self, page_no, last_id, size):
+        self._pages[page_no] = {"last_id": last_id, "remaining": size}
+
+    def finish(self, page_no):
+        self._pages[page_no]["remaining"] -= 1
+
+    def record(self, updated, failed):
+        self.state["updated"] += updated
+        self.state["failed"].update(failed)
+
+    def save(self):
+        # Pages finish out of order; only a contiguous prefix is safe to skip on restart.
+        while self._next_page in self._pages and self._pages[self._next_page]["remaining"] == 0:
+            self.state["last_id"] = self._pages.pop(self._next_page)["last_id"]
+            self._next_page += 1
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+class Progress:
+    def __init__(self, total, interval):
+        self.total = total
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._lock = threading.Lock()
+        self.counts = {"done": 0, "updated": 0, "failed": 0, "cached": 0, "bytes": 0}
+
+    def add(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self.counts[key] += value
+
+    def line(self):
+        with self._lock:
+            counts = dict(self.counts)
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = counts["done"] / elapsed
+        total = f"/{self.total}" if self.total is not None else ""
+        eta = ""
+        if self.total and rate > 0:
+            eta = f" | eta {max(self.total - counts['done'], 0) / rate / 60:.1f} min"
+        return (
+            f"  {counts['done']}{total} resumes | {rate:.1f}/s | updated {counts['updated']} "
+            f"| failed {counts['failed']} | cache hits {counts['cached']} "
+            f"| {counts['bytes'] / 1e6:.1f} MB downloaded{eta}"
+        )
 
-    print("Fetching all resumes from database...")
-    resumes = get_all_resumes()
-    print(f"Found {len(resumes)} resume(s).\n")
+    def maybe_report(self):
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            print(self.line(), flush=True)
+
+
+# ── pipeline ─────────────────────────────────────────────────────────────────
+def writer(results, checkpoint, progress, batch_size):
+    """Single consumer: batches results into DB writes, caches parses, advances the checkpoint."""
+    cache = get_parse_cache()
+    batch, pages, failures = [], [], {}
+
+    def flush():
+        not_written = write_batch([row for row, _ in batch]) if batch else {}
+        for page_no in [page_no for _, page_no in batch] + pages:
+            checkpoint.finish(page_no)
+        updated = len(batch) - len(not_written)
+        checkpoint.record(updated, {**failures, **not_written})
+        checkpoint.save()
+        progress.add(done=len(batch) + len(pages), updated=updated, failed=len(failures) + len(not_written))
+        batch.clear()
+        pages.clear()
+        failures.clear()
+
+    last_flush = time.monotonic()
+    while True:
+        try:
+            message = results.get(timeout=1.0)
+        except queue.Empty:
+            message = None
+        if message is not None:
+            kind = message[0]
+            if kind == "stop":
+                flush()
+                return
+            if kind == "page":
+                checkpoint.add_page(*message[1:])
+            elif kind == "parsed":
+                _, page_no, row, parsed, cache_key = message
+                if cache_key is not None:
+                    cache.put(*cache_key, parsed)
+                update = {"id": row["id"]}
+                update.update({key: parsed[key] for key in RESULT_COLUMNS if key in row})
+                batch.append((update, page_no))
+            elif kind == "failed":
+                _, page_no, resume_id, error = message
+                pages.append(page_no)
+                failures[resume_id] = error
+        if len(batch) + len(pages) >= batch_size or (time.monotonic() - last_flush >= 2.0 and (batch or pages)):
+            flush()
+            last_flush = time.monotonic()
+        progress.maybe_report()
+
+
+class Pipeline:
+    """Download threads -> parse processes -> writer thread, with a bound on files in flight."""
+
+    def __init__(self, downloads, workers, batch_size, checkpoint, progress):
+        self.results = queue.Queue()
+        self.downloads = ThreadPoolExecutor(max_workers=downloads, thread_name_prefix="download")
+        self.workers = workers
+        self.parse_pool = self._new_parse_pool()
+        self._pool_lock = threading.Lock()
+        self._aborted = False
+        self.writer_error = None
+        self.max_in_flight = downloads + workers * 2
+        self.in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self.cache = get_parse_cache()
+        self.progress = progress
+        self.writer = threading.Thread(
+            target=self._write, args=(checkpoint, progress, batch_size), name="writer", daemon=True
+        )
+        self.writer.start()
 
-    skipped = 0
-    updated = 0
-    failed = 0
+    def _write(self, checkpoint, progress, batch_size):
+        # Without a writer nothing is written or checkpointed: stop feeding it.
+        try:
+            writer(self.results, checkpoint, progress, batch_size)
+        except Exception as e:
+            self.writer_error = e
+            self._aborted = True
+
+    def _new_parse_pool(self):
+        # Ctrl-C is handled by the main process; workers ignore it instead of failing their files.
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=parse_pool_context(),
+            initializer=signal.signal,
+            initargs=(signal.SIGINT, signal.SIG_IGN),
+        )
 
-    for resume in resumes:
-        rid = resume['id']
-        file_path = resume.get('file_path', '')
-        file_name = resume.get('file_name', file_path)
-        already_has_text = resume.get('resume_text')
+    def _emit(self, message):
+        if not self._aborted:
+            self.results.put(message)
+        self.in_flight.release()
+
+    def submit_page(self, page_no, page, signed):
+        self.results.put(("page", page_no, page[-1]["id"], len(page)))
+        for row in page:
+            if self._aborted:
+                break
+            self.in_flight.acquire()
+            url = signed.get(row.get("file_path"))
+            if url is None:
+                self._emit(("failed", page_no, row["id"], "could not sign storage URL"))
+                continue
+            self.downloads.submit(self._fetch, page_no, row, url)
+
+    def _fetch(self, page_no, row, url):
+        if self._aborted:
+            self._emit(None)
+            return
+        try:
+            file_bytes = download(url)
+        except Exception as e:
+            self._emit(("failed", page_no, row["id"], f"download failed: {e}"))
+            return
+        self.progress.add(bytes=len(file_bytes))
+        file_name = row.get("file_name") or row.get("file_path") or ""
+        digest = file_digest(file_bytes)
+        extractor = self.cache.extractor_key(file_name, MAX_PAGES)
+        parsed = self.cache.get(digest, extractor)
+        if parsed is not None:
+            self.progress.add(cached=1)
+            self._emit(("parsed", page_no, row, parsed, None))
+            return
+        args = (parse_with_timeout, file_bytes, file_name, MAX_PAGES, PARSE_TIMEOUT_SECONDS)
+        pool = self.parse_pool
+        try:
+            future = pool.submit(*args)
+        except BrokenProcessPool:
+            future = self._replace_parse_pool(pool).submit(*args)
+        future.add_done_callback(lambda f: self._parsed(f, page_no, row, (digest, extractor)))
+
+    def _replace_parse_pool(self, broken):
+        # A worker died (e.g. OOM on a hostile PDF); the files it held are reported failed.
+        with self._pool_lock:
+            if self.parse_pool is broken:
+                broken.shutdown(wait=False)
+                self.parse_pool = self._new_parse_pool()
+            return self.parse_pool
+
+    def _parsed(self, future, page_no, row, cache_key):
+        try:
+            self._emit(("parsed", page_no, row, future.result(), cache_key))
+        except ParseTimeoutError:
+            self._emit(("failed", page_no, row["id"], f"parsing took longer than {PARSE_TIMEOUT_SECONDS:g}s"))
+        except Exception as e:
+            self._emit(("failed", page_no, row["id"], f"parse failed: {e or e.__class__.__name__}"))
 
-        if already_has_text:
-            print(f"  SKIP  {file_name} (already has resume_text)")
-            skipped += 1
-            continue
+    def drain(self):
+        """Wait for every submitted file to reach the writer, then for the final flush."""
+        for _ in range(self.max_in_flight):
+            self.in_flight.acquire()
+        self.results.put(("stop",))
+        self.writer.join()
+        self.close()
 
-        print(f"  PARSE {file_name} ...", end=" ", flush=True)
-        try:
-            signed_url = get_signed_url(file_path)
-            file_resp = requests.get(f"{SUPABASE_URL}/storage/v1{signed_url}")
-            file_resp.raise_for_status()
+    def abort(self):
+        """Stop on Ctrl-C: write what already finished, drop everything still in flight."""
+        self._aborted = True
+        self.results.put(("stop",))
+        self.close()
+        self.writer.join(timeout=60)
 
-            resume_text = extract_text_from_bytes(file_resp.content, file_name)
-            skills = extract_skills(resume_text)
-            ratings = extract_ratings(resume_text)
+    def close(self):
+        self.downloads.shutdown(wait=False, cancel_futures=True)
+        self.parse_pool.shutdown(wait=False, cancel_futures=True)
 
-            update_resume(rid, resume_text, skills, ratings)
-            print(f"OK  ({len(skills)} skills found: {', '.join(skills[:5])}{'...' if len(skills) > 5 else ''})")
-            updated += 1
 
-        except Exception as e:
-            print(f"FAILED ({e})")
-            failed += 1
+def main():
+    parser = argparse.ArgumentParser(description="Extract text, skills and ratings for resumes that have none.")
+    parser.add_argument("--downloads", type=int, default=8, help="concurrent file downloads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="parser processes")
+    parser.add_argument("--batch-size", type=int, default=50, help="rows per database write")
+    parser.add_argument("--page-size", type=int, default=200, help="rows fetched per page")
+    parser.add_argument("--limit", type=int, help="stop after this many resumes")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the first resume")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
 
-    print(f"\nDone. Updated: {updated} | Skipped: {skipped} | Failed: {failed}")
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("ERROR: SUPABASE_URL and SUPABASE_KEY must be set in .env")
+        return
+
+    checkpoint = Checkpoint(args.checkpoint, restart=args.restart)
+    if checkpoint.last_id:
+        print(f"Resuming after resume {checkpoint.last_id} (checkpoint {args.checkpoint})")
+    total = count_pending(checkpoint.last_id)
+    if args.limit is not None and total is not None:
+        total = min(total, args.limit)
+    print(f"Resumes without text: {total if total is not None else 'unknown'}\n")
+
+    progress = Progress(total, args.progress_interval)
+    pipeline = Pipeline(args.downloads, max(1, args.workers), max(1, args.batch_size), checkpoint, progress)
+    submitted = 0
+    try:
+        for page_no, page in enumerate(iter_pages(checkpoint.last_id, args.page_size)):
+            if pipeline.writer_error is not None:
+                break
+            if args.limit is not None:
+                page = page[:max(args.limit - submitted, 0)]
+                if not page:
+                    break
+            paths = sorted({row["file_path"] for row in page if row.get("file_path")})
+            pipeline.submit_page(page_no, page, sign_urls(paths) if paths else {})
+            submitted += len(page)
+        pipeline.drain()
+    except KeyboardInterrupt:
+        pipeline.abort()
+        print(f"\nInterrupted. Checkpoint kept at resume {checkpoint.last_id}; run again to continue.")
+        return
+    if pipeline.writer_error is not None:
+        print(f"\nABORTED: writing results failed: {pipeline.writer_error}")
+        print(f"Checkpoint kept at resume {checkpoint.last_id}; run again to continue.")
+        raise SystemExit(1)
+
+    print(progress.line())
+    failed = checkpoint.state["failed"]
+    print(
+        f"\nDone in {time.monotonic() - progress.started:.1f}s. Updated: {progress.counts['updated']} "
+        f"| Failed: {progress.counts['failed']} (listed in {args.checkpoint})"
+    )
+    for resume_id, error in list(failed.items())[:10]:
+        print(f"  FAILED {resume_id}: {error}")
+    cache = get_parse_cache().stats()
+    print(f"Parse cache: {cache['memory_hits'] + cache['disk_hits']} hit(s), {cache['misses']} miss(es)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+"""
+Offline builder for the semantic resume <-> job matching indexes.
+
+Embeds every job posting and every resume with extracted text (see
+backfill_resume_text.py) and writes them to compact matrices
+(data/embeddings/jobs.*.npy and data/embeddings/resumes.*.npy, memory-mapped
+at runtime) with id -> row indexes alongside. At runtime job writes and
+resume saves keep both stores current; this script is for the first build
+and for catching up after bulk imports.
+
+Only new or changed texts are embedded; pass --full to rebuild from scratch.
+
+Run from the backend directory:
+    python build_match_embeddings.py [--only jobs|resumes] [--full] [--dtype float16|float32]
+
+Requires the .env file to be present with SUPABASE_URL and SUPABASE_KEY.
+"""
+
+import argparse
+import os
+import time
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import ai_config  # noqa: E402  (reads env populated above)
+from app.ai_module.roberta.embedding_store import EmbeddingStore  # noqa: E402
+from app.ai_module.roberta.match_index import job_reference_texts, resume_reference_texts  # noqa: E402
+from app.ai_module.roberta.question_embeddings import refresh_store  # noqa: E402
+from build_question_embeddings import lazy_encoder  # noqa: E402
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+PAGE_SIZE = 1000
+
+HEADERS = {
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}",
+    "Content-Type": "application/json",
+}
+
+
+def fetch_all(table, params):
+    """Fetch every row of a table, paging through PostgREST."""
+    rows = []
+    offset = 0
+    while True:
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/{table}",
+            headers=HEADERS,
+            params={**params, "order": "id.asc", "limit": PAGE_SIZE, "offset": offset},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        page = resp.json()
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+def build(label, path, references, dtype, full, encode):
+    store = EmbeddingStore(path, ai_config.EMBED_MODEL_NAME, dtype=dtype)
+    if full and len(store):
+        store.apply({}, store.ids())
+    stale = [entry_id for entry_id in store.ids() if entry_id not in references]
+
+    started = time.time()
+    summary = refresh_store(store, references, encode, removals=stale)
+    print(
+        f"{label}: embedded {summary['embedded']} | unchanged {summary['unchanged']} "
+        f"| removed {summary['removed']} | total rows {summary['total']} ({time.time() - started:.1f}s)"
+    )
+    print(f"  store: {store.index_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the job and resume embedding stores.")
+    parser.add_argument("--only", choices=["jobs", "resumes"], help="build one store only")
+    parser.add_argument("--full", action="store_true", help="re-embed everything instead of only changed texts")
+    parser.add_argument("--dtype", default=ai_config.MATCH_EMBEDDINGS_DTYPE, choices=["float16", "float32"])
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("ERROR: SUPABASE_URL and SUPABASE_KEY must be set in .env")
+        return
+
+    encode = lazy_encoder()
+    if args.only in (None, "jobs"):
+        print("Fetching jobs...")
+        jobs = fetch_all("jobs", {"select": "id,title,description,category,requirements,status,employer_id"})
+        build("Jobs", ai_config.JOB_EMBEDDINGS_PATH, job_reference_texts(jobs), args.dtype, args.full, encode)
+
+    if args.only in (None, "resumes"):
+        print("Fetching resumes with extracted text...")
+        resumes = fetch_all("resumes", {"select": "id,user_id,skills,resume_text", "resume_text": "not.is.null"})
+        build("Resumes", ai_config.RESUME_EMBEDDINGS_PATH, resume_reference_texts(resumes), args.dtype, args.full, encode)
+
+
+if __name__ == "__main__":
+    main()
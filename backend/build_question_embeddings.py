@@ -0,0 +1,116 @@
+"""
+Offline builder for the server-side question embedding store.
+
+Embeds every active interview_question_bank row plus the ideal answers in
+data/ideal_answers/ideal_answers.json and writes them to a compact matrix
+(data/embeddings/question_bank.*.npy, memory-mapped at runtime) with an
+id -> row index (data/embeddings/question_bank.json).
+
+Only new or changed texts are embedded; pass --full to rebuild from scratch.
+
+Run from the backend directory:
+    python build_question_embeddings.py [--full] [--dtype float16|float32]
+
+Requires the .env file to be present with SUPABASE_URL and SUPABASE_KEY.
+"""
+
+import argparse
+import os
+import time
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import ai_config  # noqa: E402  (reads env populated above)
+from app.ai_module.roberta.embedding_store import EmbeddingStore  # noqa: E402
+from app.ai_module.roberta.question_embeddings import (  # noqa: E402
+    ideal_answer_reference_texts,
+    question_reference_texts,
+    refresh_store,
+)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+PAGE_SIZE = 1000
+
+HEADERS = {
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}",
+    "Content-Type": "application/json",
+}
+
+
+def fetch_question_bank():
+    """Fetch every interview_question_bank row, paging through PostgREST."""
+    rows = []
+    offset = 0
+    while True:
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/interview_question_bank",
+            headers=HEADERS,
+            params={"select": "*", "order": "created_at.asc", "limit": PAGE_SIZE, "offset": offset},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        page = resp.json()
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+def lazy_encoder():
+    """Return an encode function that only loads the model if something needs embedding."""
+    state = {}
+
+    def encode(texts):
+        if "model" not in state:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"Loading {ai_config.EMBED_MODEL_NAME}...")
+            state["model"] = SentenceTransformer(ai_config.EMBED_MODEL_NAME, device="cpu")
+        print(f"  embedding {len(texts)} text(s)...")
+        return state["model"].encode(texts, convert_to_numpy=True, show_progress_bar=False)
+
+    return encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the question/ideal-answer embedding store.")
+    parser.add_argument("--full", action="store_true", help="re-embed everything instead of only changed texts")
+    parser.add_argument("--dtype", default=ai_config.QUESTION_EMBEDDINGS_DTYPE, choices=["float16", "float32"])
+    parser.add_argument("--output", default=ai_config.QUESTION_EMBEDDINGS_PATH, help="store path prefix")
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("ERROR: SUPABASE_URL and SUPABASE_KEY must be set in .env")
+        return
+
+    print("Fetching interview_question_bank...")
+    rows = fetch_question_bank()
+    references = question_reference_texts(rows)
+    ideal_answers = ideal_answer_reference_texts()
+    references.update(ideal_answers)
+    print(f"  {len(references) - len(ideal_answers)} active question(s), {len(ideal_answers)} ideal answer(s)")
+
+    store = EmbeddingStore(args.output, ai_config.EMBED_MODEL_NAME, dtype=args.dtype)
+    if args.full and len(store):
+        # Force every reference to be re-embedded by dropping the old rows first.
+        store.apply({}, store.ids())
+    stale = [entry_id for entry_id in store.ids() if entry_id not in references]
+
+    started = time.time()
+    summary = refresh_store(store, references, lazy_encoder(), removals=stale)
+    elapsed = time.time() - started
+
+    print(
+        f"\nDone in {elapsed:.1f}s. Embedded: {summary['embedded']} | Unchanged: {summary['unchanged']} "
+        f"| Removed: {summary['removed']} | Total rows: {summary['total']}"
+    )
+    print(f"Store: {store.index_path}")
+
+
+if __name__ == "__main__":
+    main()
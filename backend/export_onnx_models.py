@@ -0,0 +1,135 @@
+"""
+Export the RoBERTa models to ONNX and verify them against PyTorch float32.
+
+Exports the embedding model (EMBED_MODEL_NAME, Path 1) and the NLI
+zero-shot model (ZSL_MODEL_NAME, Path 2) into ONNX_MODELS_DIR, optionally
+adds a dynamic int8-quantized copy, then runs both runtimes on the same
+sample answers:
+
+  - embeddings: per-text cosine between ONNX and PyTorch vectors
+  - ZSL:        top-label agreement and max absolute score difference
+
+Exits non-zero if agreement is below the thresholds, so the export can
+gate a deploy that sets AI_INFERENCE_BACKEND=onnx.
+
+Run from the backend directory:
+    python export_onnx_models.py [--models embed,zsl] [--quantize] [--min-cosine 0.99]
+"""
+
+import argparse
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import ai_config  # noqa: E402  (reads env populated above)
+from app.ai_module.roberta import onnx_models  # noqa: E402
+
+ZSL_SAMPLE_LABELS = [
+    "describes specific concrete steps or actions they personally took",
+    "mentions generic effort or attitude with no specific actions",
+    "no action or effort of any kind described",
+]
+
+
+def verify_embeddings(quantized, min_cosine):
+    from sentence_transformers import SentenceTransformer
+
+    texts = onnx_models.sample_texts()
+    reference = SentenceTransformer(ai_config.EMBED_MODEL_NAME, device="cpu").encode(
+        texts, convert_to_numpy=True, show_progress_bar=False
+    )
+    encoder = onnx_models.load_sentence_encoder(ai_config.EMBED_MODEL_NAME, quantized=quantized)
+
+    started = time.time()
+    candidate = encoder.encode(texts)
+    elapsed = time.time() - started
+
+    agreement = onnx_models.cosine_agreement(reference, candidate)
+    print(
+        f"  embed: min cosine {agreement.min():.5f} | mean {agreement.mean():.5f} "
+        f"| {len(texts)} texts in {elapsed * 1000:.0f} ms"
+    )
+    return bool(agreement.min() >= min_cosine)
+
+
+def verify_zero_shot(quantized, max_score_diff):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    from app.ai_module.zero_shot.classifier import ZeroShotClassifier
+
+    tokenizer = AutoTokenizer.from_pretrained(ai_config.ZSL_MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        ai_config.ZSL_MODEL_NAME, torch_dtype=torch.float32, low_cpu_mem_usage=False
+    )
+    model.eval()
+    reference = ZeroShotClassifier.from_transformers(tokenizer, model)
+    candidate = onnx_models.load_zero_shot_classifier(ai_config.ZSL_MODEL_NAME, quantized=quantized)
+
+    specs = [{"premise": text, "labels": ZSL_SAMPLE_LABELS} for text in onnx_models.sample_texts()]
+    expected = reference.classify_many(specs)
+    started = time.time()
+    actual = candidate.classify_many(specs)
+    elapsed = time.time() - started
+
+    agree = 0
+    worst = 0.0
+    for want, got in zip(expected, actual):
+        agree += want["labels"][0] == got["labels"][0]
+        want_scores = dict(zip(want["labels"], want["scores"]))
+        for label, score in zip(got["labels"], got["scores"]):
+            worst = max(worst, abs(score - want_scores[label]))
+    print(
+        f"  zsl:   top label agrees {agree}/{len(specs)} | max score diff {worst:.4f} "
+        f"| {len(specs)} premises in {elapsed * 1000:.0f} ms"
+    )
+    return agree == len(specs) and worst <= max_score_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and verify ONNX versions of the RoBERTa models.")
+    parser.add_argument("--models", default="embed,zsl", help="comma-separated subset of: embed, zsl")
+    parser.add_argument("--quantize", action="store_true", help="also build and verify the int8 graphs")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="minimum per-text embedding cosine")
+    parser.add_argument("--max-score-diff", type=float, default=0.05, help="maximum ZSL label score difference")
+    parser.add_argument("--skip-verify", action="store_true")
+    args = parser.parse_args()
+
+    models = {name.strip() for name in args.models.split(",") if name.strip()}
+    targets = []
+    if "embed" in models:
+        targets.append(("embed", ai_config.EMBED_MODEL_NAME, "encoder"))
+    if "zsl" in models:
+        targets.append(("zsl", ai_config.ZSL_MODEL_NAME, "classifier"))
+    if not targets:
+        print("ERROR: --models must include embed and/or zsl")
+        sys.exit(2)
+
+    variants = [False, True] if args.quantize else [False]
+    for _, model_name, kind in targets:
+        for quantized in variants:
+            started = time.time()
+            path = onnx_models.ensure_exported(model_name, kind, quantized)
+            print(f"Exported {model_name} -> {path} ({time.time() - started:.1f}s)")
+
+    if args.skip_verify:
+        return
+
+    ok = True
+    for quantized in variants:
+        print(f"\nVerifying {'int8' if quantized else 'float32'} graphs against PyTorch float32...")
+        for key, _, _ in targets:
+            if key == "embed":
+                ok &= verify_embeddings(quantized, args.min_cosine)
+            else:
+                ok &= verify_zero_shot(quantized, args.max_score_diff)
+
+    print("\nAgreement OK." if ok else "\nAgreement below threshold — keep AI_INFERENCE_BACKEND=pytorch.")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
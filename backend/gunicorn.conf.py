@@ -0,0 +1,20 @@
+# Gunicorn settings read automatically when gunicorn starts from backend/.
+# Command-line flags (railway.toml, Dockerfile) still take precedence.
+#
+# GUNICORN_PRELOAD=true imports the app in the master before forking, so the
+# models listed in MODEL_PRELOAD are loaded once and shared copy-on-write by
+# every worker instead of each worker holding a private copy.
+import os
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def post_fork(server, worker):
+    # Locks and background threads do not survive fork; reset them per worker.
+    from app.ai_module.model_registry import get_model_registry
+    from app.ai_module.warmup import start_warmup
+
+    get_model_registry().after_fork()
+    if preload_app:
+        # create_app() skipped warm-up in the master; run the dummy inferences here.
+        start_warmup()
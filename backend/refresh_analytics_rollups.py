@@ -0,0 +1,62 @@
+"""
+Incremental aggregator for the analytics time-series rollups.
+
+Folds the rows created since each metric's watermark into
+public.analytics_daily_rollups (see database/create_analytics_rollups.sql).
+Cheap to run often: each metric is one RPC that only scans new rows, so
+schedule it every few minutes (cron / Railway cron job):
+
+Run from the backend directory:
+    python refresh_analytics_rollups.py [--metrics registrations,applications] [--reset]
+
+--reset drops the selected metrics' rollups first and rebuilds them from the
+base tables (use after backdated imports; status changes are applied by a
+trigger as they happen).
+
+Requires the .env file to be present with SUPABASE_URL and SUPABASE_KEY
+(service role key).
+"""
+
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.rollup_service import ROLLUP_METRICS, RollupService  # noqa: E402  (reads env populated above)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metrics", default=",".join(ROLLUP_METRICS), help="comma-separated metrics to refresh")
+    parser.add_argument("--reset", action="store_true", help="rebuild the selected metrics from scratch")
+    args = parser.parse_args()
+
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+    service = RollupService()
+    if not service.client.is_configured:
+        print("ERROR: SUPABASE_URL and SUPABASE_KEY must be set in .env")
+        return 1
+
+    if args.reset:
+        for metric in metrics:
+            result = service.reset(metric)
+            if not result.get("success"):
+                print(f"  RESET {metric} FAILED ({result.get('error')})")
+                return 1
+            print(f"  RESET {metric}: {(result.get('data') or {}).get('rows_dropped', 0)} rollup rows dropped")
+
+    result = service.refresh(metrics)
+    if result.get("status_code") == 400:
+        print(f"ERROR: {result.get('error')}")
+        return 1
+    for metric, run in (result.get("data") or {}).items():
+        print(f"  OK    {metric}: {run.get('rows_processed', 0)} new rows up to {run.get('watermark')}")
+    for metric, error in (result.get("errors") or {}).items():
+        print(f"  FAIL  {metric}: {error}")
+    return 0 if result.get("success") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from app.services.analytics_service import AnalyticsService
+
+
+class _FakeClient:
+	def __init__(self):
+		self.calls = []
+
+	def make_request(self, method, endpoint, data=None, params=None):
+		self.calls.append((endpoint, params))
+		rows = int((params or {}).get("limit") or 1)
+		return {"success": True, "data": [{"created_at": f"2026-03-02T10:{i:02d}:00+00:00", "title": "Analyst"} for i in range(rows)], "status_code": 200}
+
+
+def test_recent_activity_limits_share_a_few_snapshots():
+	service = AnalyticsService()
+	service.client = _FakeClient()
+
+	etags = set()
+	for limit, returned in ((1, 1), (7, 7), (9, 9), (10, 9), (50, 48), (-3, 1)):
+		result, meta = service.get_snapshot("recent_activity", limit=limit)
+		assert result["success"]
+		assert len(result["data"]) == returned
+		etags.add(meta["etag"])
+
+	assert sorted(key[1] for key in service.snapshots._entries) == [(("limit", 5),), (("limit", 10),), (("limit", 50),)]
+	assert service.snapshots.stats()["miss"] == 3
+	# One ETag per distinct payload (1, 7, 9 and 48 events); trimming leaves the snapshot whole.
+	assert len(etags) == 4
+	assert len(service.get_snapshot("recent_activity", limit=10)[0]["data"]) == 9
+
+
+def test_recent_activity_rejects_limits_over_the_largest_snapshot():
+	service = AnalyticsService()
+	service.client = _FakeClient()
+
+	result, _ = service.get_snapshot("recent_activity", limit=51)
+
+	assert result["status_code"] == 400
+	assert not service.client.calls
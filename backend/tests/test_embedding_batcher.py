@@ -0,0 +1,62 @@
+import threading
+
+import numpy as np
+
+from app.ai_module.roberta.batcher import EmbeddingBatcher
+
+
+class _FakeModel:
+	max_seq_length = 128
+
+	def __init__(self):
+		self.calls = []
+
+	def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+		self.calls.append(list(texts))
+		return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_requests_share_a_forward_pass():
+	model = _FakeModel()
+	batcher = EmbeddingBatcher(lambda: model, max_wait_ms=100, max_batch_size=64, max_batch_tokens=100000)
+	results = {}
+
+	def worker(i):
+		texts = ["x" * (i + 1), "y" * (10 * (i + 1))]
+		results[i] = (texts, batcher.encode(texts, timeout=5))
+
+	threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert len(model.calls) < 8
+	for texts, embeddings in results.values():
+		assert embeddings.shape == (2, 2)
+		assert embeddings[:, 0].tolist() == [float(len(text)) for text in texts]
+
+	stats = batcher.stats()
+	assert stats["requests"] == 8
+	assert stats["texts"] == 16
+
+
+def test_batches_are_split_by_size_and_length_sorted():
+	model = _FakeModel()
+	batcher = EmbeddingBatcher(lambda: model, max_wait_ms=0, max_batch_size=2, max_batch_tokens=100000)
+
+	embeddings = batcher.encode(["ccccccccccccccccc", "a", "bbbbb"], timeout=5)
+
+	assert embeddings[:, 0].tolist() == [17.0, 1.0, 5.0]
+	assert model.calls == [["a", "bbbbb"], ["ccccccccccccccccc"]]
+
+
+def test_missing_model_fails_every_waiting_request():
+	batcher = EmbeddingBatcher(lambda: None, max_wait_ms=0)
+
+	try:
+		batcher.encode(["hello"], timeout=5)
+	except RuntimeError as error:
+		assert "not available" in str(error)
+	else:
+		raise AssertionError("expected RuntimeError")
@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.ai_module.roberta.embedding_cache import EmbeddingCache, cache_key
+
+
+def test_key_ignores_whitespace_but_not_model():
+	assert cache_key("m", "  Tell me  about\nyourself ") == cache_key("m", "Tell me about yourself")
+	assert cache_key("m", "hello") != cache_key("other-model", "hello")
+
+
+def test_lru_evicts_oldest_entry():
+	cache = EmbeddingCache("m", max_entries=2)
+	_, keys = cache.lookup(["a", "b", "c"])
+	cache.store(keys, np.eye(3, dtype=np.float32))
+
+	vectors, _ = cache.lookup(["a", "b", "c"])
+
+	assert vectors[0] is None
+	assert vectors[1].tolist() == [0.0, 1.0, 0.0]
+	assert cache.stats()["entries"] == 2
+
+
+def test_disk_tier_survives_a_new_cache_instance(tmp_path):
+	first = EmbeddingCache("m", max_entries=8, disk_dir=str(tmp_path))
+	_, keys = first.lookup(["question one", "question two"])
+	first.store(keys, np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32))
+
+	second = EmbeddingCache("m", max_entries=8, disk_dir=str(tmp_path))
+	vectors, _ = second.lookup(["question two", "unseen"])
+
+	assert vectors[0].tolist() == [3.0, 4.0]
+	assert vectors[1] is None
+	stats = second.stats()
+	assert stats["disk_hits"] == 1
+	assert stats["misses"] == 1
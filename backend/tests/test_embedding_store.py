@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+
+from app.ai_module.roberta.embedding_store import EmbeddingStore
+from app.ai_module.roberta.question_embeddings import question_reference_texts, refresh_store
+
+
+def _encoder(calls):
+	def encode(texts):
+		calls.append(list(texts))
+		return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+	return encode
+
+
+def test_refresh_only_embeds_new_or_changed_questions(tmp_path):
+	store = EmbeddingStore(str(tmp_path / "qb"), "model", dtype="float32")
+	calls = []
+	rows = [
+		{"id": "q1", "question_text": "Why should we hire you?"},
+		{"id": "q2", "question_text": "Are you a team player?"},
+		{"id": "q3", "question_text": "Inactive", "is_active": False},
+	]
+
+	assert refresh_store(store, question_reference_texts(rows), _encoder(calls))["embedded"] == 2
+
+	rows[1]["question_text"] = "Are you a risk taker?"
+	summary = refresh_store(store, question_reference_texts(rows), _encoder(calls), removals=["q1"])
+
+	assert calls[-1] == ["Are you a risk taker?"]
+	assert summary["removed"] == 0  # q1 is still referenced, so it is kept
+	vectors, missing = EmbeddingStore(str(tmp_path / "qb"), "model").get_many(["q2", "q1", "q3"])
+	assert vectors[:, 0].tolist() == [21.0, 23.0]
+	assert missing == ["q3"]
+
+
+def _apply_range(path, worker, count):
+	store = EmbeddingStore(path, "model", dtype="float32")
+	for i in range(count):
+		store.apply({f"w{worker}-{i}": (f"text {worker} {i}", np.array([worker, i], dtype=np.float32), {})})
+
+
+def test_concurrent_writers_keep_every_upsert(tmp_path):
+	import multiprocessing
+
+	path = str(tmp_path / "shared")
+	context = multiprocessing.get_context("fork")
+	workers = [context.Process(target=_apply_range, args=(path, worker, 15)) for worker in range(4)]
+	for process in workers:
+		process.start()
+	for process in workers:
+		process.join()
+
+	store = EmbeddingStore(path, "model", dtype="float32")
+	assert len(store) == 60
+	vectors, missing = store.get_many(["w3-14", "w0-0"])
+	assert missing == [] and vectors.tolist() == [[3.0, 14.0], [0.0, 0.0]]
+	assert len([name for name in os.listdir(tmp_path) if name.endswith(".npy")]) == 1
+
+
+def test_writes_append_until_the_store_compacts(tmp_path, monkeypatch):
+	from app.ai_module.roberta import embedding_store
+
+	monkeypatch.setattr(embedding_store, "MIN_CAPACITY", 4)
+	path = str(tmp_path / "grow")
+	store = EmbeddingStore(path, "model", dtype="float32")
+	store.apply({"a": ("a", np.array([1.0, 0.0]), {"n": 1})})
+	generation, index_mtime = store.generation, os.path.getmtime(f"{path}.json")
+
+	store.apply({"b": ("b", np.array([0.0, 1.0]), {})}, removals=["a"])
+	store.apply({"a": ("a2", np.array([2.0, 2.0]), {"n": 2})})
+	assert store.generation == generation
+	assert os.path.getmtime(f"{path}.json") == index_mtime
+
+	reader = EmbeddingStore(path, "model", dtype="float32")
+	assert reader.entry("a")["n"] == 2 and reader.entry("a")["row"] == 2
+	store.apply({"c": ("c", np.array([3.0, 3.0]), {})})
+	vectors, missing = reader.get_many(["c", "a", "b"])
+	assert missing == [] and vectors.tolist() == [[3.0, 3.0], [2.0, 2.0], [0.0, 1.0]]
+
+	# The spare rows are used up: the next write compacts into a new generation.
+	store.apply({"d": ("d", np.array([4.0, 4.0]), {})})
+	assert store.generation != generation
+	assert sorted(name for name in os.listdir(tmp_path) if name.endswith((".npy", ".jsonl"))) == [
+		f"grow.{store.generation[5:-4]}.jsonl", store.generation,
+	]
+	reader.reload_if_changed()
+	assert sorted(reader.ids()) == ["a", "b", "c", "d"] and reader.entry("a")["row"] == 1
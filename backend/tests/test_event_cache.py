@@ -0,0 +1,68 @@
+from app.services import event_service
+from app.services.event_service import EventService
+from app.utils.registration_store import RegistrationStore
+
+
+class _FakeResponse:
+	def __init__(self, payload):
+		self.payload = payload
+
+	def raise_for_status(self):
+		pass
+
+	def json(self):
+		return self.payload
+
+
+class _FakeClient:
+	def __init__(self, events):
+		self.events = events
+		self.calls = []
+
+	def get(self, url, params=None, **kwargs):
+		self.calls.append(params)
+		if params and "id" in params:
+			event_id = params["id"][3:]
+			return _FakeResponse([e for e in self.events if e["id"] == event_id])
+		return _FakeResponse(list(self.events))
+
+
+def _service(monkeypatch, tmp_path, events):
+	monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+	monkeypatch.setenv("SUPABASE_KEY", "key")
+	monkeypatch.setattr(event_service, "get_registration_store", lambda: RegistrationStore(str(tmp_path / "r.sqlite3")))
+	service = EventService()
+	service.client = _FakeClient(events)
+	return service
+
+
+def test_list_and_lookups_are_served_from_cache(monkeypatch, tmp_path):
+	events = [
+		{"id": "e1", "title": "Job fair", "event_type": "Job Fair", "date": "2026-03-01"},
+		{"id": "e2", "title": "CV clinic", "event_type": "Workshop", "date": "2026-03-02"},
+	]
+	service = _service(monkeypatch, tmp_path, events)
+
+	assert service.get_all_events()["count"] == 2
+	assert [e["id"] for e in service.get_all_events(event_type="Workshop")["data"]] == ["e2"]
+	assert service.get_event_by_id("e1")["data"]["title"] == "Job fair"
+	service.register_for_event("e1", "s1")
+
+	assert len(service.client.calls) == 1  # one list fetch served everything above
+	assert service.get_all_events(student_id="s1")["data"][1]["registered"] == 1
+	stats = service.get_cache_stats()["data"]
+	assert stats["miss"] == 2 and stats["hit_rate"] > 0.5
+
+
+def test_writes_invalidate_cached_events(monkeypatch, tmp_path):
+	service = _service(monkeypatch, tmp_path, [])
+	assert service.get_all_events()["count"] == 0
+
+	created = service.create_event({
+		"title": "Mock interviews", "description": "d", "event_type": "Workshop",
+		"date": "2026-04-01", "time": "10:00", "location": "Hall A",
+	})["data"]
+	service.client.events.append(dict(created))
+
+	assert service.get_all_events()["count"] == 1
+	assert len(service.client.calls) == 2
@@ -0,0 +1,99 @@
+import math
+from collections import Counter
+
+from app.utils.job_recommender import JobRecommender, job_document, student_document, tokenize
+
+
+JOBS = [
+	{"id": "1", "title": "Junior Python Developer", "description": "Build REST APIs with Flask and SQL.", "requirements": ["Python", "SQL"],
+	 "category": "IT", "job_type": "Full-time", "location": "Manila", "status": "active"},
+	{"id": "2", "title": "Data Analyst Intern", "description": "Clean data and build dashboards in Python.", "requirements": ["Excel", "Python"],
+	 "category": "Analytics", "job_type": "Internship", "location": "Quezon City", "status": "active"},
+	{"id": "3", "title": "Elementary Teacher", "description": "Teaching and curriculum development.", "requirements": ["Lesson planning"],
+	 "category": "Education", "job_type": "Full-time", "location": "Manila", "status": "active"},
+	{"id": "4", "title": "Python Backend Engineer", "description": "Flask services.", "requirements": ["Python"],
+	 "category": "IT", "job_type": "Full-time", "location": "Cebu", "status": "closed"},
+]
+STUDENT = {"skills": ["Python", "SQL", "Flask"], "major": "Computer Science", "bio": "I build web APIs and dashboards."}
+
+
+def _reference_cosines(user_tokens, jobs):
+	# The loop the browser used to run, one job at a time.
+	docs = [job_document(job) for job in jobs]
+	df = Counter(term for doc in docs for term in set(doc))
+	idf = {term: math.log((len(docs) + 1) / (n + 1)) + 1 for term, n in df.items()}
+
+	def vector(tokens):
+		return {t: c / len(tokens) * idf.get(t, 1.0) for t, c in Counter(tokens).items()}
+
+	user = vector(user_tokens)
+	user_norm = math.sqrt(sum(v * v for v in user.values()))
+	scores = {}
+	for job, doc in zip(jobs, docs):
+		vec = vector(doc)
+		norm = math.sqrt(sum(v * v for v in vec.values()))
+		scores[job["id"]] = sum(user.get(t, 0.0) * v for t, v in vec.items()) / (user_norm * norm)
+	return scores
+
+
+def test_tokenize_drops_stop_words_and_short_tokens():
+	assert tokenize("The C# and Node.js developer, in Manila!") == ["node", "developer", "manila"]
+
+
+def test_matrix_scores_match_reference_loop():
+	recommender = JobRecommender()
+	recommender.rebuild(JOBS)
+	tokens = student_document(STUDENT)
+
+	recs = recommender.recommend(tokens, top_k=10, min_score=0)
+	expected = _reference_cosines(tokens, [job for job in JOBS if job["status"] == "active"])
+
+	assert [rec["job"]["id"] for rec in recs] == sorted(expected, key=lambda k: -expected[k])
+	for rec in recs:
+		assert math.isclose(rec["similarity"], expected[rec["job"]["id"]], abs_tol=1e-3)
+	assert recs[0]["matchedSkills"] == ["Python", "SQL"]
+
+
+def test_preferences_applied_jobs_and_threshold():
+	recommender = JobRecommender()
+	recommender.rebuild(JOBS)
+	tokens = student_document(STUDENT)
+
+	boosted = {rec["job"]["id"]: rec for rec in recommender.recommend(tokens, preferences={"preferred_job_types": ["Internship"]})}
+	plain = {rec["job"]["id"]: rec for rec in recommender.recommend(tokens)}
+	assert math.isclose(boosted["2"]["score"] - plain["2"]["score"], 0.1, abs_tol=1e-3)
+	assert boosted["1"]["score"] == plain["1"]["score"]
+
+	assert [rec["job"]["id"] for rec in recommender.recommend(tokens, exclude={"1"})] == ["2"]
+	assert recommender.recommend(["python"]) == []
+
+
+def test_incremental_updates():
+	recommender = JobRecommender()
+	recommender.rebuild(JOBS)
+	tokens = student_document(STUDENT)
+
+	recommender.add({**JOBS[3], "status": "active"})
+	assert "4" in [rec["job"]["id"] for rec in recommender.recommend(tokens)]
+
+	recommender.add({**JOBS[0], "status": "closed"})
+	recommender.remove("4")
+	assert [rec["job"]["id"] for rec in recommender.recommend(tokens)] == ["2"]
+	assert recommender.stats()["jobs"] == 2
+
+
+def test_jobs_without_tokens_do_not_break_scoring():
+	recommender = JobRecommender()
+	recommender.rebuild([JOBS[0], {"id": "5", "title": "QA", "status": "active"}, JOBS[1], {"id": "6", "title": "IT", "status": "active"}])
+
+	recs = recommender.recommend(student_document(STUDENT))
+	assert {rec["job"]["id"] for rec in recs} <= {"1", "2"}
+	assert recs[0]["job"]["id"] == "1"
+
+
+def test_student_document_weights_skills_and_truncates_resume():
+	resume = {"skills": ["Docker"], "resume_text": " ".join(["kubernetes"] * 600), "file_name": "cv.pdf"}
+	tokens = Counter(student_document({"skills_entries": [{"skill": "React"}]}, resume))
+
+	assert tokens["react"] == 3 and tokens["docker"] == 3
+	assert tokens["kubernetes"] == 500
@@ -0,0 +1,56 @@
+from app.utils.job_search import JobSearchIndex, stem, tokenize
+
+
+JOBS = [
+	{"id": "1", "title": "Junior Python Developer", "description": "Build REST APIs with Flask.", "requirements": ["Python", "SQL"],
+	 "category": "IT", "job_type": "Full-time", "location": "Manila", "status": "active", "employer": {"name": "Acme Labs"}},
+	{"id": "2", "title": "Data Analyst Intern", "description": "Clean data and build dashboards in Python.", "requirements": ["Excel"],
+	 "category": "Analytics", "job_type": "Internship", "location": "Quezon City", "status": "active", "employer": {"name": "Bright Data"}},
+	{"id": "3", "title": "Elementary Teacher", "description": "Teaching and curriculum development.", "requirements": [],
+	 "category": "Education", "job_type": "Full-time", "location": "Manila", "status": "closed", "employer": {"name": "St. Mary"}},
+]
+
+
+def _index():
+	index = JobSearchIndex()
+	index.rebuild(JOBS)
+	return index
+
+
+def _ids(found):
+	return [job["id"] for job, _ in found["results"]]
+
+
+def test_stems_and_tokens():
+	assert stem("developers") == stem("developer")
+	assert stem("teaching") == stem("teach")
+	assert tokenize("C++ and Node.js for the win") == ["c++", "node.js", "win"]
+
+
+def test_title_hits_outrank_description_hits():
+	found = _index().search("python")
+
+	assert _ids(found) == ["1", "2"]
+	assert found["results"][0][1] > found["results"][1][1]
+
+
+def test_prefix_typo_and_employer_matches():
+	index = _index()
+
+	assert _ids(index.search("analy")) == ["2"]
+	assert _ids(index.search("pyhton")) == ["1", "2"]
+	assert _ids(index.search("acme")) == ["1"]
+
+
+def test_facets_pagination_and_incremental_updates():
+	index = _index()
+
+	assert _ids(index.search("", filters={"location": "manila", "status": "active"})) == ["1"]
+	assert index.search("python", limit=1, offset=1)["total"] == 2
+	assert _ids(index.search("python", limit=1, offset=1)) == ["2"]
+
+	index.add({**JOBS[1], "title": "Data Engineer", "description": "Spark pipelines."})
+	index.remove("1")
+	assert _ids(index.search("python")) == []
+	assert _ids(index.search("engineer")) == ["2"]
+	assert index.stats()["jobs"] == 2
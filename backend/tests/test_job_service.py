@@ -0,0 +1,71 @@
+from app.config import ai_config
+from app.services.job_service import JobService
+
+
+def _job(job_id, title, status="active"):
+	return {"id": job_id, "title": title, "description": title, "category": "IT", "status": status}
+
+
+class _FakeClient:
+	"""A jobs table behind SupabaseClient.make_request's status handling (only 200/201 succeed).
+
+	`during_fetch` runs after a GET has taken its snapshot, like a slow GET racing other writes.
+	"""
+
+	def __init__(self, jobs, during_fetch=None):
+		self.jobs = {job["id"]: job for job in jobs}
+		self.during_fetch = during_fetch
+
+	def make_request(self, method, endpoint, data=None, params=None, headers=None):
+		representation = "return=representation" in (headers or {}).get("Prefer", "")
+		if method == "GET":
+			snapshot = list(self.jobs.values())
+			if self.during_fetch:
+				during_fetch, self.during_fetch = self.during_fetch, None
+				during_fetch()
+			return {"success": True, "data": snapshot, "status_code": 200}
+		job_id = endpoint.split("eq.")[1]
+		if method == "PUT":
+			self.jobs[job_id] = {**data, "id": job_id}
+			rows = [self.jobs[job_id]]
+		else:
+			rows = [self.jobs.pop(job_id)] if job_id in self.jobs else []
+		if not representation:
+			# PostgREST answers 204 No Content, which make_request reports as a failure.
+			return {"success": False, "error": "HTTP 204", "status_code": 204}
+		return {"success": True, "data": rows, "status_code": 200}
+
+
+def _service(monkeypatch, jobs):
+	monkeypatch.setattr(ai_config, "MATCH_EMBEDDINGS_AUTO_REFRESH", False)
+	service = JobService()
+	service.client = _FakeClient(jobs)
+	assert service.build_search_index()["success"]
+	return service
+
+
+def test_writes_during_a_rebuild_survive_the_swap(monkeypatch):
+	service = _service(monkeypatch, [_job("1", "Python developer"), _job("2", "Java developer")])
+
+	def concurrent_writes():
+		service.update_job("1", _job("1", "Kotlin developer"))
+		service.delete_job("2")
+
+	service.client.during_fetch = concurrent_writes
+	assert service.build_search_index()["success"]
+
+	assert service.search_index.search("kotlin")["total"] == 1
+	assert service.search_index.search("python")["total"] == 0
+	assert "2" not in service.search_index and len(service.search_index) == 1 and len(service.recommender) == 1
+	assert service._pending_writes is None
+
+
+def test_delete_removes_the_job_from_search_and_recommendations(monkeypatch):
+	service = _service(monkeypatch, [_job("1", "Python developer"), _job("2", "Java developer")])
+
+	assert service.delete_job("2")["success"]
+	assert service.search_index.search("java")["total"] == 0
+	assert len(service.recommender) == 1
+
+	missing = service.delete_job("2")
+	assert missing["success"] is False and missing["status_code"] == 404
@@ -0,0 +1,73 @@
+import numpy as np
+
+from app.ai_module.roberta.embedding_store import EmbeddingStore
+from app.ai_module.roberta.match_index import VectorIndex, job_reference_texts, resume_reference_texts
+
+
+def _store(tmp_path, vectors, meta):
+	store = EmbeddingStore(str(tmp_path / "vectors"), "model", dtype="float32")
+	store.apply({entry_id: (entry_id, vectors[i], meta[i]) for i, entry_id in enumerate(f"r{i}" for i in range(len(vectors)))})
+	return store
+
+
+def test_reference_texts():
+	jobs = job_reference_texts([
+		{"id": 1, "title": "Data Analyst", "category": "Analytics", "requirements": ["SQL", "Excel"], "description": "Dashboards."},
+		{"id": 2, "title": "", "description": None},
+	])
+	resumes = resume_reference_texts([
+		{"id": "a", "user_id": "u1", "skills": ["python"], "resume_text": "  Built   things.  " * 10},
+		{"id": "b", "user_id": "u2", "resume_text": ""},
+	], max_chars=20)
+
+	assert jobs == {"1": {"text": "Data Analyst. Analytics. SQL, Excel. Dashboards.",
+	                      "meta": {"kind": "job", "status": "active", "employer_id": None}}}
+	assert resumes["a"]["text"] == "Skills: python. Built things. Built"
+	assert list(resumes) == ["a"]
+
+
+def test_exact_search_filters_and_excludes(tmp_path):
+	vectors = np.array([[1.0, 0.0], [0.8, 0.6], [0.0, 1.0], [0.9, 0.1]], dtype=np.float32) * 3
+	meta = [{"status": "active"}, {"status": "active"}, {"status": "active"}, {"status": "closed"}]
+	index = VectorIndex(_store(tmp_path, vectors, meta), ivf_min_rows=0)
+
+	hits = index.search(np.array([1.0, 0.0]), k=2, where={"status": "active"})
+	assert [entry_id for entry_id, _, _ in hits] == ["r0", "r1"]
+	assert np.isclose(hits[0][1], 1.0) and np.isclose(hits[1][1], 0.8)
+
+	assert [entry_id for entry_id, _, _ in index.search(np.array([1.0, 0.0]), k=2, exclude=["r0"])] == ["r3", "r1"]
+	assert index.stats()["mode"] == "exact"
+
+
+def test_ivf_matches_exact_search_and_follows_store_updates(tmp_path):
+	rng = np.random.default_rng(7)
+	centers = rng.normal(size=(12, 16))
+	vectors = (centers[rng.integers(0, 12, 600)] + 0.05 * rng.normal(size=(600, 16))).astype(np.float32)
+	store = _store(tmp_path, vectors, [{"status": "active"}] * 600)
+	exact = VectorIndex(store, ivf_min_rows=0)
+	ivf = VectorIndex(store, ivf_min_rows=100, nprobe=4)
+
+	for query in vectors[:20]:
+		assert [hit[0] for hit in ivf.search(query, k=5)] == [hit[0] for hit in exact.search(query, k=5)]
+	assert ivf.stats()["mode"] == "ivf" and ivf.stats()["lists"] == 24
+
+	store.apply({"new": ("new", -vectors[0], {"status": "active"})})
+	assert ivf.search(-vectors[0], k=1)[0][0] == "new"
+
+
+def test_appended_rows_update_the_index_in_place(tmp_path):
+	rng = np.random.default_rng(3)
+	vectors = rng.normal(size=(300, 8)).astype(np.float32)
+	store = _store(tmp_path, vectors, [{"status": "active"}] * 300)
+	ivf = VectorIndex(store, ivf_min_rows=100, nprobe=17)
+	ivf.search(vectors[0], k=1)
+	generation, centroids = store.generation, ivf._centroids
+
+	store.apply({"r5": ("moved", -vectors[5], {"status": "closed"})}, removals=["r0"])
+	store.apply({"extra": ("extra", vectors[0], {"status": "active"})})
+	assert store.generation == generation
+
+	assert ivf.search(vectors[0], k=1)[0][0] == "extra"
+	assert ivf.search(-vectors[5], k=1, where={"status": "closed"})[0][0] == "r5"
+	assert "r5" not in [hit[0] for hit in ivf.search(vectors[5], k=3, where={"status": "active"})]
+	assert ivf._centroids is centroids and ivf.stats()["rows"] == 300
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import numpy as np
+
+from app.ai_module.model_registry import ModelRegistry
+
+
+MB = 1024 * 1024
+
+
+def _loader(calls, name, megabytes=32):
+	def load():
+		calls.append(name)
+		return np.ones(megabytes * MB, dtype=np.uint8)  # touched pages count towards RSS
+	return load
+
+
+def test_lazy_load_and_lru_unload_over_memory_budget():
+	calls = []
+	registry = ModelRegistry(memory_budget_bytes=48 * MB)
+	registry.register("embed", _loader(calls, "embed"))
+	registry.register("zsl", _loader(calls, "zsl"))
+
+	assert registry.state("embed") == "unloaded" and calls == []
+	assert registry.get("embed") is not None
+	assert registry.get("zsl") is not None
+
+	# Both do not fit: the least recently used one is dropped, and reloads on demand.
+	assert registry.state("embed") == "unloaded"
+	assert registry.stats()["models"]["zsl"]["state"] == "ready"
+	registry.get("embed")
+	assert calls == ["embed", "zsl", "embed"]
+
+
+def test_idle_unload_skips_pinned_and_failed_load_is_retried_later():
+	calls = []
+	registry = ModelRegistry(idle_unload_seconds=10)
+	registry.register("embed", _loader(calls, "embed", 1))
+	registry.register("whisper", _loader(calls, "whisper", 1), pinned=True)
+	registry.register("broken", lambda: calls.append("broken") or None, retry_after_seconds=60)
+	registry.get("embed")
+	registry.get("whisper")
+
+	assert registry.unload_idle(now=registry._slots["embed"].last_used + 60) == ["embed"]
+	assert registry.peek("whisper") is not None
+
+	assert registry.get("broken") is None and registry.get("broken") is None
+	assert calls.count("broken") == 1
+	assert registry.state("broken") == "failed"
+
+	# A transient failure is not permanent: the load is retried once the delay has passed.
+	registry._slots["broken"].failed_at -= 120
+	assert registry.get("broken") is None
+	assert calls.count("broken") == 2
+
+
+def test_parallel_loads_are_measured_separately():
+	registry = ModelRegistry()
+
+	def slow_loader():
+		model = np.ones(32 * MB, dtype=np.uint8)
+		time.sleep(0.2)  # without serialised loads the other model lands inside this window
+		return model
+
+	registry.register("embed", slow_loader)
+	registry.register("zsl", slow_loader)
+	threads = [threading.Thread(target=registry.get, args=(name,)) for name in ("embed", "zsl")]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	models = registry.stats()["models"]
+	assert all(24 <= models[name]["memory_mb"] < 48 for name in ("embed", "zsl"))
@@ -0,0 +1,68 @@
+from app.utils.parse_cache import ParseResultCache, file_digest
+
+
+PAYLOAD = {"resume_text": "Python and SQL", "skills": ["python", "sql"], "ratings": {}, "pages": 1, "truncated": False}
+
+
+def test_memory_tier_is_a_bounded_lru():
+	cache = ParseResultCache("1", max_entries=2)
+	key = cache.extractor_key("cv.pdf", 20)
+
+	cache.put("a", key, PAYLOAD)
+	cache.put("b", key, PAYLOAD)
+	assert cache.get("a", key) == PAYLOAD
+	cache.put("c", key, PAYLOAD)
+
+	assert cache.get("b", key) is None
+	assert cache.get("a", key) == PAYLOAD
+	stats = cache.stats()
+	assert stats["entries"] == 2
+	assert stats["memory_hits"] == 2
+	assert stats["misses"] == 1
+	assert stats["disk_enabled"] is False
+
+
+def test_key_covers_bytes_file_type_and_page_limit():
+	cache = ParseResultCache("1")
+	digest = file_digest(b"%PDF-1.4 resume")
+	cache.put(digest, cache.extractor_key("cv.pdf", 20), PAYLOAD)
+
+	assert cache.get(digest, cache.extractor_key("other-name.PDF", 20)) == PAYLOAD
+	assert cache.get(digest, cache.extractor_key("cv.docx", 20)) is None
+	assert cache.get(digest, cache.extractor_key("cv.pdf", 5)) is None
+	assert cache.get(file_digest(b"%PDF-1.4 resume v2"), cache.extractor_key("cv.pdf", 20)) is None
+
+
+def test_disk_tier_is_shared_across_instances(tmp_path):
+	path = str(tmp_path / "parse_cache.sqlite3")
+	writer = ParseResultCache("1", db_path=path)
+	key = writer.extractor_key("cv.pdf", 20)
+	writer.put("abc", key, PAYLOAD)
+
+	reader = ParseResultCache("1", db_path=path)
+	assert reader.get("abc", key) == PAYLOAD
+	assert reader.get("abc", key) == PAYLOAD
+	assert reader.stats()["disk_hits"] == 1
+	assert reader.stats()["memory_hits"] == 1
+
+
+def test_extractor_version_bump_drops_old_rows(tmp_path):
+	path = str(tmp_path / "parse_cache.sqlite3")
+	old = ParseResultCache("1", db_path=path)
+	old.put("abc", old.extractor_key("cv.pdf", 20), PAYLOAD)
+
+	new = ParseResultCache("2", db_path=path)
+	assert new.get("abc", new.extractor_key("cv.pdf", 20)) is None
+	assert ParseResultCache("1", db_path=path).get("abc", old.extractor_key("cv.pdf", 20)) is None
+
+
+def test_disk_tier_is_trimmed_to_max_rows(tmp_path):
+	path = str(tmp_path / "parse_cache.sqlite3")
+	cache = ParseResultCache("1", max_entries=1, db_path=path, max_rows=10)
+	key = cache.extractor_key("cv.pdf", 20)
+	for i in range(100):
+		cache.put(f"file-{i}", key, PAYLOAD)
+
+	fresh = ParseResultCache("1", db_path=path)
+	assert fresh.get("file-99", key) == PAYLOAD
+	assert fresh.get("file-0", key) is None
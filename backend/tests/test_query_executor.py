@@ -0,0 +1,27 @@
+import time
+
+from app.utils.query_executor import ConcurrentQueryExecutor
+
+
+def _sleep_then(seconds, value):
+	def query():
+		time.sleep(seconds)
+		return value
+	return query
+
+
+def test_queries_run_concurrently_and_report_partial_results():
+	executor = ConcurrentQueryExecutor(max_workers=4)
+	started = time.perf_counter()
+
+	results = executor.run({
+		"students": _sleep_then(0.2, {"success": True, "data": {"count": 3}}),
+		"employers": _sleep_then(0.2, {"success": False, "error": "HTTP 500"}),
+		"events": _sleep_then(2.0, {"success": True}),
+	}, deadline_seconds=0.5)
+
+	assert time.perf_counter() - started < 1.0  # max of the round trips, capped by the deadline
+	assert results["students"].ok and results["students"].value["data"]["count"] == 3
+	assert results["employers"].error == "HTTP 500"
+	assert results["events"].timed_out and not results["events"].ok
+	assert results["students"].elapsed_ms >= 200
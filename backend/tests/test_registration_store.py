@@ -0,0 +1,75 @@
+import json
+import multiprocessing
+
+from app.utils.registration_store import RegistrationStore
+
+
+def _register_range(path, worker, count):
+	store = RegistrationStore(path)
+	for i in range(count):
+		store.register("job-fair", f"student-{worker}-{i}")
+
+
+def test_register_and_unregister_are_idempotent(tmp_path):
+	store = RegistrationStore(str(tmp_path / "registrations.sqlite3"))
+
+	assert store.register("event-1", "s1") is True
+	assert store.register("event-1", "s1") is False
+	assert store.register("event-1", "s2") is True
+	assert store.students("event-1") == ["s1", "s2"]
+	assert store.unregister("event-1", "s1") is True
+	assert store.unregister("event-1", "s1") is False
+	assert store.count("event-1") == 1
+	assert store.delete_event("event-1") == 1
+	assert store.all() == {}
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+	legacy = tmp_path / "registrations.json"
+	legacy.write_text(json.dumps({"event-1": ["s1", "s2"], "event-2": ["s1"]}))
+	store = RegistrationStore(str(tmp_path / "registrations.sqlite3"))
+
+	assert store.import_legacy_json(str(legacy)) == 3
+	store.unregister("event-2", "s1")
+	assert store.import_legacy_json(str(legacy)) == 0
+	assert store.all() == {"event-1": ["s1", "s2"]}
+
+
+def test_concurrent_workers_do_not_lose_writes(tmp_path):
+	path = str(tmp_path / "registrations.sqlite3")
+	RegistrationStore(path).close()  # no connection may be open across fork
+	context = multiprocessing.get_context("fork")
+	workers = [context.Process(target=_register_range, args=(path, worker, 50)) for worker in range(4)]
+	for process in workers:
+		process.start()
+	for process in workers:
+		process.join(30)
+
+	assert all(process.exitcode == 0 for process in workers)
+	assert RegistrationStore(path).count("job-fair") == 200
+
+
+def test_counts_and_reverse_index_follow_writes(tmp_path):
+	store = RegistrationStore(str(tmp_path / "registrations.sqlite3"))
+	store.add_many([("event-1", "s1"), ("event-1", "s2"), ("event-2", "s1")])
+	store.unregister("event-1", "s2")
+	store.register("event-3", "s2")
+
+	assert store.counts() == {"event-1": 1, "event-2": 1, "event-3": 1}
+	assert store.events_for_student("s1") == {"event-1", "event-2"}
+	store.delete_event("event-2")
+	assert store.counts() == {"event-1": 1, "event-3": 1}
+	assert store.events_for_student("s1") == {"event-1"}
+	assert [row["student_id"] for row in store.registrants("event-1", limit=10)] == ["s1"]
+
+
+def test_counts_are_backfilled_for_older_databases(tmp_path):
+	path = str(tmp_path / "registrations.sqlite3")
+	store = RegistrationStore(path)
+	store.add_many([("event-1", "s1"), ("event-1", "s2")])
+	conn = store._connect()
+	conn.execute("DELETE FROM event_counts")
+	conn.execute("DELETE FROM store_meta WHERE key = 'event_counts'")
+	store.close()
+
+	assert RegistrationStore(path).counts() == {"event-1": 2}
@@ -0,0 +1,79 @@
+import os
+import stat
+import time
+
+import pytest
+
+from app.utils.resume_extraction import ParseQueueFullError, ResumeParseExecutor, extract_ratings, parse_resume_bytes
+
+
+RESUME = b"Jane Doe\nSkills: Python, SQL, Docker\nEnglish: 9/10\nTyping - 95%\n"
+
+
+@pytest.fixture
+def executor(tmp_path):
+	executor = ResumeParseExecutor(max_workers=1, max_pending=2, timeout_seconds=1, results_dir=str(tmp_path))
+	yield executor
+	executor.shutdown()
+
+
+def test_parse_payload():
+	parsed = parse_resume_bytes(RESUME, "resume.txt")
+
+	assert parsed["skills"] == ["python", "sql", "docker", "typing"]
+	assert parsed["ratings"] == {"english": "9/10", "typing": "95"}
+	assert parsed["truncated"] is False
+
+
+def test_ratings_stay_linear_on_long_lines():
+	line = " ".join(["worked on projects"] * 2000) + " Python: 4/5 SQL - 80%"
+
+	started = time.perf_counter()
+	ratings = extract_ratings(line)
+
+	assert time.perf_counter() - started < 1.0
+	assert sorted(ratings.values()) == ["4/5", "80"]
+	assert all(len(label) <= 60 for label in ratings)
+
+
+def test_jobs_run_in_worker_processes_and_can_be_polled(executor, tmp_path):
+	done = []
+	job_id = executor.submit(RESUME, "resume.txt", on_done=done.append)
+
+	record = executor.result(job_id, wait=30)
+	assert record["status"] == "done"
+	assert record["result"]["skills"] == ["python", "sql", "docker", "typing"]
+	assert done and done[0]["resume_text"].startswith("Jane Doe")
+
+	# Another gunicorn worker answers the same poll from the shared record file.
+	other = ResumeParseExecutor(max_workers=1, results_dir=str(tmp_path))
+	assert other.result(job_id)["status"] == "done"
+	assert other.result("0" * 32) is None
+	assert other.result("../etc/passwd") is None
+	# Records carry the resume text: owner-only directory and files.
+	assert stat.S_IMODE(os.stat(tmp_path).st_mode) == 0o700
+	assert stat.S_IMODE(os.stat(tmp_path / f"{job_id}.json").st_mode) == 0o600
+
+
+def test_failures_and_timeouts_are_reported(executor, tmp_path):
+	failed = executor.result(executor.submit(b"%PDF-1.4 not really", "broken.pdf"), wait=30)
+	assert failed["status"] == "failed" and failed["error"]
+
+	slow = ResumeParseExecutor(max_workers=1, timeout_seconds=0.05, results_dir=str(tmp_path))
+	try:
+		text = ("word " * 400000).encode()
+		record = slow.result(slow.submit(text, "huge.txt"), wait=30)
+		assert record["status"] == "timeout"
+		# The worker is free again after the timeout.
+		assert slow.result(slow.submit(RESUME, "resume.txt"), wait=30)["status"] == "done"
+	finally:
+		slow.shutdown()
+
+
+def test_queue_is_bounded(executor):
+	text = ("word " * 400000).encode()
+	executor.submit(text, "a.txt")
+	executor.submit(text, "b.txt")
+	with pytest.raises(ParseQueueFullError):
+		executor.submit(text, "c.txt")
+	assert executor.stats()["rejected"] == 1
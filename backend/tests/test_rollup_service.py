@@ -0,0 +1,59 @@
+from datetime import date
+
+from app.services.rollup_service import RollupService, bucket_start, iter_buckets
+
+
+class _FakeClient:
+	def __init__(self, rows):
+		self.rows = rows
+		self.calls = []
+
+	def make_request(self, method, endpoint, data=None, params=None):
+		self.calls.append((method, endpoint, data, params))
+		return {"success": True, "data": self.rows, "status_code": 200}
+
+
+def _service(rows):
+	service = RollupService()
+	service.client = _FakeClient(rows)
+	return service
+
+
+def test_buckets_cover_partial_weeks_and_months():
+	assert bucket_start(date(2026, 3, 5), "week") == date(2026, 3, 2)
+	assert bucket_start(date(2026, 3, 5), "month") == date(2026, 3, 1)
+	assert list(iter_buckets(date(2026, 1, 31), date(2026, 3, 1), "month")) == [
+		date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1),
+	]
+
+
+def test_timeseries_zero_fills_and_rebuckets_rollups():
+	service = _service([
+		{"bucket_date": "2026-03-02", "dimension": "pending", "count": 4},
+		{"bucket_date": "2026-03-02", "dimension": "accepted", "count": 1},
+		{"bucket_date": "2026-03-10", "dimension": "pending", "count": 2},
+	])
+
+	result = service.get_timeseries("applications", start=date(2026, 3, 1), end=date(2026, 3, 14), granularity="week", split=True)
+
+	data = result["data"]
+	assert data["series"] == [
+		{"bucket": "2026-02-23", "count": 0},
+		{"bucket": "2026-03-02", "count": 5},
+		{"bucket": "2026-03-09", "count": 2},
+	]
+	assert data["total"] == 7
+	assert [point["count"] for point in data["by_dimension"]["accepted"]] == [0, 1, 0]
+	method, endpoint, _, params = service.client.calls[0]
+	assert endpoint == "/analytics_daily_rollups" and params["metric"] == "eq.applications"
+	assert params["and"] == "(bucket_date.gte.2026-03-01,bucket_date.lte.2026-03-14)"
+
+
+def test_timeseries_rejects_bad_input_without_querying():
+	service = _service([])
+
+	assert service.get_timeseries("logins")["status_code"] == 400
+	assert service.get_timeseries("applications", granularity="year")["status_code"] == 400
+	assert service.get_timeseries("applications", start=date(2026, 3, 2), end=date(2026, 3, 1))["status_code"] == 400
+	assert service.refresh(["registrations", "logins"])["status_code"] == 400
+	assert service.client.calls == []
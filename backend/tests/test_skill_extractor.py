@@ -0,0 +1,62 @@
+import json
+
+from app.utils.skill_extractor import SkillExtractor, get_skill_extractor, tokenize
+
+
+def test_tokens_keep_skill_punctuation():
+	assert tokenize("C++, C#, Node.js and .NET.") == ["c++", "c#", "node.js", "and", ".net"]
+	assert tokenize("problem-solving") == tokenize("Problem Solving")
+
+
+def test_matches_respect_token_boundaries():
+	extractor = SkillExtractor(["java", "sql", "word", "git"])
+
+	assert extractor.extract("JavaScript, PostgreSQL, GitHub and keywords") == []
+	assert extractor.extract("Java and SQL (git)") == ["java", "sql", "git"]
+
+
+def test_aliases_map_to_canonical_names_in_taxonomy_order():
+	extractor = SkillExtractor([
+		{"name": "javascript", "aliases": ["js", "ecmascript"]},
+		{"name": "rest api", "aliases": ["restful apis"]},
+		{"name": "word", "aliases": ["microsoft word", "ms word"], "match_name": False},
+	])
+
+	assert extractor.extract("Built RESTful APIs in JS with MS Word docs") == ["javascript", "rest api", "word"]
+	assert extractor.extract("in other words, a word") == []
+
+
+def test_overlapping_phrases_are_all_reported():
+	extractor = SkillExtractor([
+		{"name": "machine learning"},
+		{"name": "learning"},
+		{"name": "deep learning", "aliases": ["deep machine learning"]},
+	])
+
+	found = sorted(extractor.matches("deep machine learning"))
+	assert found == [("deep learning", 0, 3), ("learning", 2, 3), ("machine learning", 1, 3)]
+
+
+def test_failure_links_recover_partial_phrases():
+	extractor = SkillExtractor(["project management", "management"])
+
+	assert extractor.extract("project project management") == ["project management", "management"]
+	assert extractor.extract("project planning and management") == ["management"]
+
+
+def test_taxonomy_file_and_fingerprint(tmp_path):
+	path = tmp_path / "taxonomy.json"
+	path.write_text(json.dumps({"version": "1", "skills": ["python", {"name": "docker", "aliases": ["dockerfile"]}]}))
+	extractor = SkillExtractor.from_file(str(path))
+
+	assert extractor.stats()["skills"] == 2
+	assert extractor.extract("Wrote a Dockerfile for a Python service") == ["python", "docker"]
+	assert SkillExtractor.from_file(str(path)).fingerprint == extractor.fingerprint
+	assert SkillExtractor(["python", "docker"]).fingerprint != extractor.fingerprint
+
+
+def test_default_taxonomy_covers_legacy_keywords():
+	extractor = get_skill_extractor()
+
+	assert len(extractor) > 100
+	assert extractor.extract("Python, React, C++ and teamwork; communication: 5/5") == ["python", "react", "c++", "communication", "teamwork"]
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from app.utils.snapshot_cache import SnapshotCache
+
+
+def test_concurrent_misses_are_coalesced_into_one_load():
+	cache = SnapshotCache(default_ttl=60)
+	calls = []
+
+	def slow_loader():
+		calls.append(1)
+		time.sleep(0.2)
+		return {"success": True, "data": {"total_students": 3}}
+
+	results = []
+	threads = [threading.Thread(target=lambda: results.append(cache.get("dashboard", slow_loader))) for _ in range(5)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert len(calls) == 1
+	assert {meta["etag"] for _, meta in results} == {results[0][1]["etag"]}
+	assert cache.get("dashboard", slow_loader)[1]["state"] == "fresh"
+
+
+def test_stale_value_is_served_while_refreshing_in_background():
+	cache = SnapshotCache(default_ttl=0.05, default_stale_ttl=60)
+	versions = iter([{"v": 1}, {"v": 2}])
+	cache.get("job_stats", lambda: next(versions))
+	time.sleep(0.1)
+
+	value, meta = cache.get("job_stats", lambda: next(versions))
+	assert meta["state"] == "stale" and value == {"v": 1}
+
+	deadline = time.time() + 2
+	while cache.stats()["inflight"] and time.time() < deadline:
+		time.sleep(0.01)
+	assert cache.get("job_stats", lambda: {"v": 3})[0] == {"v": 2}
+
+
+def test_failed_results_are_not_cached():
+	cache = SnapshotCache(default_ttl=60)
+	cache.get("user_stats", lambda: {"success": False, "error": "HTTP 500"})
+
+	assert cache.get("user_stats", lambda: {"success": True})[0] == {"success": True}
+
+
+def test_invalidate_discards_a_load_that_was_already_running():
+	cache = SnapshotCache(default_ttl=60)
+	started, release = threading.Event(), threading.Event()
+
+	def slow_loader():
+		started.set()
+		release.wait(2)
+		return {"registered": 10}
+
+	results = []
+	thread = threading.Thread(target=lambda: results.append(cache.get(("event", "e1"), slow_loader)))
+	thread.start()
+	started.wait(2)
+	cache.invalidate(prefix="event")  # a registration was written meanwhile
+	release.set()
+	thread.join()
+
+	assert results[0][0] == {"registered": 10}
+	value, meta = cache.get(("event", "e1"), lambda: {"registered": 11})
+	assert meta["state"] == "miss" and value == {"registered": 11}
+	assert cache.stats()["inflight"] == 0
+
+
+def test_etag_covers_only_the_selected_part():
+	cache = SnapshotCache(default_ttl=0, default_stale_ttl=0, etag_of=lambda result: result["data"])
+	loads = iter([{"data": [1, 2], "timings_ms": {"a": 3.1}}, {"data": [1, 2], "timings_ms": {"a": 7.9}}])
+
+	first = cache.get("activity", lambda: next(loads))[1]["etag"]
+	assert cache.get("activity", lambda: next(loads))[1]["etag"] == first
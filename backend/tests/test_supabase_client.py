@@ -0,0 +1,114 @@
+import os
+
+import requests
+
+from app.supabase_client import SupabaseClient
+
+
+class _FakeResponse:
+	def __init__(self, status_code, text="[]", headers=None, payload=None):
+		self.status_code = status_code
+		self.text = text
+		self.headers = headers or {}
+		self.payload = payload
+
+	def json(self):
+		if self.payload is not None:
+			return self.payload
+		return [{"id": 1}] if self.text != "[]" else []
+
+
+class _FakeSession:
+	def __init__(self, responses):
+		self.responses = list(responses)
+		self.calls = []
+
+	def request(self, method, url, **kwargs):
+		self.calls.append((method, url, kwargs))
+		response = self.responses.pop(0)
+		if isinstance(response, Exception):
+			raise response
+		return response
+
+
+def _client(responses):
+	client = SupabaseClient("https://example.supabase.co", "key", max_retries=2, backoff_base=0, slow_call_ms=10_000)
+	client._session = _FakeSession(responses)
+	client._session_pid = os.getpid()
+	return client
+
+
+def test_get_retries_transient_failures_with_default_timeouts():
+	client = _client([requests.ConnectionError("reset"), _FakeResponse(503), _FakeResponse(200, '[{"id": 1}]')])
+
+	result = client.make_request("GET", "/jobs", params={"select": "id"})
+
+	assert result == {"success": True, "data": [{"id": 1}], "status_code": 200}
+	method, url, kwargs = client.session.calls[-1]
+	assert url == "https://example.supabase.co/rest/v1/jobs"
+	assert kwargs["timeout"] == (client.connect_timeout, client.read_timeout)
+	assert client.stats()["calls"]["GET jobs"]["retries"] == 2
+
+
+def test_post_is_not_retried():
+	client = _client([_FakeResponse(503, "unavailable")])
+
+	result = client.make_request("POST", "/applications", data={"status": "pending"})
+
+	assert result["success"] is False and result["status_code"] == 503
+	assert len(client.session.calls) == 1
+
+
+def test_count_uses_head_and_content_range():
+	client = _client([_FakeResponse(200, "", headers={"Content-Range": "0-0/3573"})])
+
+	result = client.count("/profiles", params={"role": "eq.student"}, mode="planned")
+
+	assert result["count"] == 3573 and result["data"] == {"count": 3573}
+	method, url, kwargs = client.session.calls[0]
+	assert method == "HEAD"
+	assert kwargs["headers"]["Prefer"] == "count=planned"
+	assert kwargs["params"] == {"role": "eq.student", "select": "id"}
+	assert client.count("/profiles", mode="fuzzy")["status_code"] == 400
+
+
+def test_group_count_uses_aggregate_select():
+	client = _client([_FakeResponse(200, payload=[{"status": "active", "count": 7}, {"status": None, "count": 1}])])
+
+	result = client.group_count("/jobs", "status", params={"select": "id", "employer_id": "eq.5"})
+
+	assert result["data"] == {"active": 7, "null": 1} and result["total"] == 8
+	assert result["source"] == "aggregate"
+	assert client.session.calls[0][2]["params"] == {"employer_id": "eq.5", "select": "status,count()"}
+
+
+def test_group_count_falls_back_to_rpc_once_aggregates_are_disabled():
+	client = _client([
+		_FakeResponse(400, '{"code":"PGRST123","message":"Use of aggregate functions is not allowed"}'),
+		_FakeResponse(200, payload=[{"group_value": "pending", "row_count": 3}, {"group_value": "accepted", "row_count": 2}]),
+		_FakeResponse(200, payload=[{"group_value": "student", "row_count": 40}]),
+	])
+
+	first = client.group_count("/applications", "status", params={"student_id": "eq.abc"})
+	second = client.group_count("/profiles", "role")
+
+	assert first["data"] == {"pending": 3, "accepted": 2} and first["source"] == "rpc"
+	assert second["data"] == {"student": 40}
+	methods = [(method, url.rsplit("/v1", 1)[1]) for method, url, _ in client.session.calls]
+	assert methods == [("GET", "/applications"), ("POST", "/rpc/group_count"), ("POST", "/rpc/group_count")]
+	assert client.session.calls[1][2]["json"] == {
+		"table_name": "applications", "group_column": "status", "filters": {"student_id": "abc"},
+	}
+	assert client.group_count("/jobs", "status", params={"salary": "gt.10"})["status_code"] == 400
+
+
+def test_group_count_keeps_aggregates_after_other_errors():
+	client = _client([
+		_FakeResponse(400, '{"code":"42703","message":"column jobs.stauts does not exist"}'),
+		_FakeResponse(200, payload=[{"status": "active", "count": 2}]),
+	])
+
+	failed = client.group_count("/jobs", "stauts")
+	assert failed["success"] is False and failed["status_code"] == 400
+	assert client.group_count("/jobs", "status")["source"] == "aggregate"
+	assert [url.rsplit("/v1", 1)[1] for _, url, _ in client.session.calls] == ["/jobs", "/jobs"]
@@ -0,0 +1,32 @@
+from app.ai_module.warmup import SkipWarmup, WarmupManager, WarmupTask
+
+
+def _skip():
+	raise SkipWarmup("not used here")
+
+
+def _fail():
+	raise RuntimeError("no weights")
+
+
+def test_ready_only_when_required_models_are_warm():
+	manager = WarmupManager([
+		WarmupTask("embed", lambda: "ok", required=True),
+		WarmupTask("whisper", _skip, required=True),
+		WarmupTask("ollama", _fail, required=False),
+	])
+	assert not manager.is_ready()
+
+	manager.run_all()
+	status = manager.status()
+
+	assert status["ready"] is True
+	assert status["models"]["whisper"]["state"] == "skipped"
+	assert status["models"]["ollama"] == {"state": "failed", "required": False, "seconds": status["models"]["ollama"]["seconds"], "detail": "no weights"}
+
+
+def test_failed_required_model_keeps_not_ready():
+	manager = WarmupManager([WarmupTask("zsl", _fail, required=True)])
+	manager.run_all()
+
+	assert manager.status()["ready"] is False
@@ -0,0 +1,74 @@
+import re
+
+import numpy as np
+
+from app.ai_module.zero_shot.classifier import ZeroShotClassifier
+
+
+LABELS = ["clear situation", "vague situation", "no situation"]
+
+
+def _fake_tokenizer(premises, hypotheses=None, **kwargs):
+	if hypotheses is None:
+		# Single text: one token per word, with character offsets.
+		spans = [match.span() for match in re.finditer(r"\S+", premises)]
+		return {"input_ids": list(range(len(spans))), "offset_mapping": spans}
+	# Entailment favours the hypothesis whose label text appears in the premise.
+	matches = [1.0 if hypothesis[len("This example is "):-1] in premise else 0.0 for premise, hypothesis in zip(premises, hypotheses)]
+	return {"match": np.array(matches, dtype=np.float32)}
+
+
+def _classifier(passes, max_length=512):
+	def forward(encoded):
+		passes.append(len(encoded["match"]))
+		match = encoded["match"]
+		# label order: contradiction, entailment, neutral
+		return np.stack([-match, match * 4.0, np.zeros_like(match)], axis=1)
+
+	return ZeroShotClassifier(
+		_fake_tokenizer,
+		forward,
+		{"contradiction": 0, "entailment": 1, "neutral": 2},
+		max_length=max_length,
+		max_pairs_per_pass=4,
+	)
+
+
+def test_classify_many_batches_all_pairs_and_ranks_per_spec():
+	passes = []
+	classifier = _classifier(passes)
+
+	results = classifier.classify_many([
+		{"premise": "A vague situation was described.", "labels": LABELS},
+		{"premise": "There was a clear situation.", "labels": LABELS},
+	])
+
+	assert passes == [4, 2]  # 6 pairs split by max_pairs_per_pass, not 2 pipeline calls
+	assert results[0]["labels"][0] == "vague situation"
+	assert results[1]["labels"][0] == "clear situation"
+	assert abs(sum(results[0]["scores"]) - 1.0) < 1e-6
+	assert results[0]["scores"] == sorted(results[0]["scores"], reverse=True)
+
+
+def test_single_call_matches_pipeline_shape():
+	result = _classifier([])("no situation at all", LABELS, multi_label=True)
+
+	assert {"sequence", "labels", "scores"} <= set(result)
+	assert result["labels"][0] == "no situation"
+	assert sum(result["scores"]) > 1.0  # multi_label scores are independent per label
+
+
+def test_long_premise_is_windowed_and_the_end_is_still_scored():
+	classifier = _classifier([], max_length=40)
+	premise = " ".join(["filler"] * 200) + " and a clear situation at the very end"
+
+	windows = classifier.premise_windows(premise, LABELS, suffix="Focus?", max_windows=3, overlap_tokens=8)
+
+	assert len(windows) == 3
+	assert all(window.endswith("\nFocus?") for window in windows)
+	assert windows[-1].startswith("filler") and "clear situation at the very end" in windows[-1]
+
+	result = classifier.classify_many([{"premise": premise, "labels": LABELS, "windows": windows}], aggregation="max")[0]
+	assert result["windows"] == 3
+	assert result["labels"][0] == "clear situation"
+	assert abs(sum(result["scores"]) - 1.0) < 1e-6
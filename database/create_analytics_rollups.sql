@@ -0,0 +1,229 @@
+-- Daily analytics rollups for term reports and trend charts.
+-- Run in Supabase SQL Editor.
+--
+-- public.analytics_daily_rollups holds one row per (metric, UTC day, dimension)
+-- with the number of source rows created that day. public.refresh_analytics_rollup()
+-- folds in only the rows created since the metric's watermark, so the
+-- aggregator (backend/refresh_analytics_rollups.py, or
+-- POST /api/analytics/timeseries/refresh) never rescans a base table, and
+-- /api/analytics/timeseries/<metric> reads the rollups only.
+--
+-- Metrics (source table . timestamp column, dimension):
+--   registrations  profiles.created_at               role
+--   interviews     interview_sessions.created_at     status
+--   applications   applications.created_at           status
+--   event_signups  event_registrations.registered_at (none)
+--
+-- Rows are only aggregated once they are settle_seconds old, so transactions
+-- still in flight when the job runs are picked up by the next run. Rows that
+-- arrive later than that (backdated imports) are folded in by
+-- reset_analytics_rollup() + a refresh.
+--
+-- The role / status dimensions are mutable. When one changes on a row that
+-- has already been aggregated, a trigger moves that row's count from the old
+-- dimension to the new one in its creation-day bucket, so the series follow
+-- status transitions without a rescan. When installing this over rollups
+-- built by an older version of this script, reset + refresh each metric once.
+
+CREATE TABLE IF NOT EXISTS public.analytics_daily_rollups (
+  metric TEXT NOT NULL,
+  bucket_date DATE NOT NULL,
+  dimension TEXT NOT NULL DEFAULT '',
+  count BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (metric, bucket_date, dimension)
+);
+
+CREATE TABLE IF NOT EXISTS public.analytics_rollup_watermarks (
+  metric TEXT PRIMARY KEY,
+  last_created_at TIMESTAMPTZ NOT NULL,
+  last_run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  rows_processed BIGINT NOT NULL DEFAULT 0
+);
+
+-- The date-range reads filter on (metric, bucket_date); the primary key covers them.
+
+ALTER TABLE public.analytics_daily_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.analytics_rollup_watermarks ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view analytics rollups" ON public.analytics_daily_rollups;
+CREATE POLICY "Admins can view analytics rollups"
+  ON public.analytics_daily_rollups
+  FOR SELECT
+  USING (public.is_admin());
+
+DROP POLICY IF EXISTS "Admins can view rollup watermarks" ON public.analytics_rollup_watermarks;
+CREATE POLICY "Admins can view rollup watermarks"
+  ON public.analytics_rollup_watermarks
+  FOR SELECT
+  USING (public.is_admin());
+
+GRANT SELECT ON public.analytics_daily_rollups TO authenticated;
+GRANT SELECT ON public.analytics_rollup_watermarks TO authenticated;
+
+
+-- Aggregate the rows of one metric created since its watermark.
+-- Returns {"metric", "rows_processed", "watermark"}.
+CREATE OR REPLACE FUNCTION public.refresh_analytics_rollup(
+  metric_name TEXT,
+  settle_seconds INTEGER DEFAULT 120
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  source_table TEXT;
+  ts_column TEXT;
+  dimension_sql TEXT;
+  low_mark TIMESTAMPTZ;
+  high_mark TIMESTAMPTZ;
+  processed BIGINT := 0;
+BEGIN
+  CASE metric_name
+    WHEN 'registrations' THEN
+      source_table := 'profiles'; ts_column := 'created_at'; dimension_sql := 'COALESCE(role, '''')';
+    WHEN 'interviews' THEN
+      source_table := 'interview_sessions'; ts_column := 'created_at'; dimension_sql := 'COALESCE(status, '''')';
+    WHEN 'applications' THEN
+      source_table := 'applications'; ts_column := 'created_at'; dimension_sql := 'COALESCE(status, '''')';
+    WHEN 'event_signups' THEN
+      source_table := 'event_registrations'; ts_column := 'registered_at'; dimension_sql := '''''';
+    ELSE
+      RAISE EXCEPTION 'Unknown rollup metric: %', metric_name USING ERRCODE = '22023';
+  END CASE;
+
+  -- One aggregator per metric at a time, otherwise a window could be counted twice.
+  PERFORM pg_advisory_xact_lock(hashtext('analytics_rollup:' || metric_name));
+
+  SELECT w.last_created_at INTO low_mark
+  FROM public.analytics_rollup_watermarks w
+  WHERE w.metric = metric_name;
+  low_mark := COALESCE(low_mark, '-infinity'::timestamptz);
+  high_mark := NOW() - make_interval(secs => GREATEST(settle_seconds, 0));
+
+  IF high_mark <= low_mark THEN
+    RETURN jsonb_build_object('metric', metric_name, 'rows_processed', 0, 'watermark', low_mark);
+  END IF;
+
+  -- Buckets are UTC days (the Supabase session time zone).
+  EXECUTE format(
+    'WITH fresh AS (
+       SELECT %1$I::date AS bucket_date, %2$s AS dimension, COUNT(*)::bigint AS n
+       FROM public.%3$I
+       WHERE %1$I > $1 AND %1$I <= $2
+       GROUP BY 1, 2
+     ), merged AS (
+       INSERT INTO public.analytics_daily_rollups AS r (metric, bucket_date, dimension, count, updated_at)
+       SELECT $3, bucket_date, dimension, n, NOW() FROM fresh
+       ON CONFLICT (metric, bucket_date, dimension)
+       DO UPDATE SET count = r.count + EXCLUDED.count, updated_at = NOW()
+     )
+     SELECT COALESCE(SUM(n), 0)::bigint FROM fresh',
+    ts_column, dimension_sql, source_table
+  )
+  INTO processed
+  USING low_mark, high_mark, metric_name;
+
+  INSERT INTO public.analytics_rollup_watermarks AS w (metric, last_created_at, last_run_at, rows_processed)
+  VALUES (metric_name, high_mark, NOW(), processed)
+  ON CONFLICT (metric) DO UPDATE
+    SET last_created_at = EXCLUDED.last_created_at,
+        last_run_at = NOW(),
+        rows_processed = w.rows_processed + EXCLUDED.rows_processed;
+
+  RETURN jsonb_build_object('metric', metric_name, 'rows_processed', processed, 'watermark', high_mark);
+END;
+$$;
+
+
+-- Move an already-aggregated row between dimensions when its role / status changes.
+-- Trigger arguments: metric name, dimension column.
+CREATE OR REPLACE FUNCTION public.move_analytics_rollup_dimension()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  metric_name TEXT := TG_ARGV[0];
+  old_dimension TEXT := COALESCE(to_jsonb(OLD) ->> TG_ARGV[1], '');
+  new_dimension TEXT := COALESCE(to_jsonb(NEW) ->> TG_ARGV[1], '');
+  counted_until TIMESTAMPTZ;
+BEGIN
+  IF old_dimension = new_dimension THEN
+    RETURN NULL;
+  END IF;
+
+  -- Serialised with refresh_analytics_rollup(), so the row is moved exactly
+  -- when it has been counted: either before this update (moved here) or after
+  -- it (counted under the new dimension by the refresh).
+  PERFORM pg_advisory_xact_lock(hashtext('analytics_rollup:' || metric_name));
+  SELECT w.last_created_at INTO counted_until
+  FROM public.analytics_rollup_watermarks w
+  WHERE w.metric = metric_name;
+  IF counted_until IS NULL OR OLD.created_at IS NULL OR OLD.created_at > counted_until THEN
+    RETURN NULL;
+  END IF;
+
+  UPDATE public.analytics_daily_rollups r
+  SET count = r.count - 1, updated_at = NOW()
+  WHERE r.metric = metric_name AND r.bucket_date = OLD.created_at::date AND r.dimension = old_dimension;
+
+  INSERT INTO public.analytics_daily_rollups AS r (metric, bucket_date, dimension, count, updated_at)
+  VALUES (metric_name, OLD.created_at::date, new_dimension, 1, NOW())
+  ON CONFLICT (metric, bucket_date, dimension)
+  DO UPDATE SET count = r.count + 1, updated_at = NOW();
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS analytics_rollup_role_change ON public.profiles;
+CREATE TRIGGER analytics_rollup_role_change
+  AFTER UPDATE OF role ON public.profiles
+  FOR EACH ROW
+  WHEN (OLD.role IS DISTINCT FROM NEW.role)
+  EXECUTE FUNCTION public.move_analytics_rollup_dimension('registrations', 'role');
+
+DROP TRIGGER IF EXISTS analytics_rollup_status_change ON public.interview_sessions;
+CREATE TRIGGER analytics_rollup_status_change
+  AFTER UPDATE OF status ON public.interview_sessions
+  FOR EACH ROW
+  WHEN (OLD.status IS DISTINCT FROM NEW.status)
+  EXECUTE FUNCTION public.move_analytics_rollup_dimension('interviews', 'status');
+
+DROP TRIGGER IF EXISTS analytics_rollup_status_change ON public.applications;
+CREATE TRIGGER analytics_rollup_status_change
+  AFTER UPDATE OF status ON public.applications
+  FOR EACH ROW
+  WHEN (OLD.status IS DISTINCT FROM NEW.status)
+  EXECUTE FUNCTION public.move_analytics_rollup_dimension('applications', 'status');
+
+
+-- Drop a metric's rollups and watermark; the next refresh rebuilds it from scratch.
+CREATE OR REPLACE FUNCTION public.reset_analytics_rollup(metric_name TEXT)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  dropped BIGINT;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('analytics_rollup:' || metric_name));
+  DELETE FROM public.analytics_daily_rollups r WHERE r.metric = metric_name;
+  GET DIAGNOSTICS dropped = ROW_COUNT;
+  DELETE FROM public.analytics_rollup_watermarks w WHERE w.metric = metric_name;
+  RETURN jsonb_build_object('metric', metric_name, 'rows_dropped', dropped);
+END;
+$$;
+
+-- The aggregator runs with the service role key; nobody else may move watermarks.
+REVOKE EXECUTE ON FUNCTION public.refresh_analytics_rollup(TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.reset_analytics_rollup(TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.refresh_analytics_rollup(TEXT, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION public.reset_analytics_rollup(TEXT) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
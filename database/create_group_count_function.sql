@@ -0,0 +1,68 @@
+-- Server-side GROUP BY counts for the admin dashboard / application stats.
+-- Used by SupabaseClient.group_count() (backend/app/supabase_client.py) when
+-- PostgREST aggregate selects ("select=role,count()") are not enabled.
+-- Run in Supabase SQL Editor.
+--
+-- Returns one row per distinct value of group_column:
+--   SELECT * FROM public.group_count('profiles', 'role');
+--   SELECT * FROM public.group_count('applications', 'status', '{"student_id": "..."}');
+--
+-- Only whitelisted (table, column) pairs can be grouped, and filters are plain
+-- equality on existing columns, so the dynamic SQL cannot be steered elsewhere.
+-- SECURITY INVOKER: row level security of the caller still applies.
+
+CREATE OR REPLACE FUNCTION public.group_count(
+  table_name TEXT,
+  group_column TEXT,
+  filters JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE(group_value TEXT, row_count BIGINT)
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+  where_sql TEXT := '';
+  filter_key TEXT;
+  filter_value TEXT;
+BEGIN
+  IF (group_count.table_name, group_count.group_column) NOT IN (
+    VALUES
+      ('profiles', 'role'),
+      ('jobs', 'status'),
+      ('applications', 'status')
+  ) THEN
+    RAISE EXCEPTION 'group_count: %.% is not allowed', group_count.table_name, group_count.group_column
+      USING ERRCODE = '42501';
+  END IF;
+
+  FOR filter_key, filter_value IN
+    SELECT key, value FROM jsonb_each_text(COALESCE(filters, '{}'::jsonb))
+  LOOP
+    IF NOT EXISTS (
+      SELECT 1
+      FROM information_schema.columns c
+      WHERE c.table_schema = 'public'
+        AND c.table_name = group_count.table_name
+        AND c.column_name = filter_key
+    ) THEN
+      RAISE EXCEPTION 'group_count: unknown filter column %', filter_key
+        USING ERRCODE = '42703';
+    END IF;
+    where_sql := where_sql || format(' AND %I::text = %L', filter_key, filter_value);
+  END LOOP;
+
+  RETURN QUERY EXECUTE format(
+    'SELECT %I::text, COUNT(*)::bigint FROM public.%I WHERE TRUE%s GROUP BY 1',
+    group_count.group_column,
+    group_count.table_name,
+    where_sql
+  );
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.group_count(TEXT, TEXT, JSONB) TO anon, authenticated, service_role;
+
+-- Make the new function visible to PostgREST immediately.
+NOTIFY pgrst, 'reload schema';
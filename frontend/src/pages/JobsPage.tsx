@@ -14,11 +14,10 @@ import {
 import { Sidebar } from "../components/common/Sidebar";
 import { useAuth } from "../hooks/useAuth";
 import { useCachedQuery } from "../hooks/useCachedQuery";
-import { getAllJobs, type JobWithEmployer } from "../services/jobService";
+import { getAllJobs, getJobRecommendations, type JobWithEmployer } from "../services/jobService";
 import { submitJobApplication } from "../services/applicationService";
 import { supabase } from "../lib/supabaseClient";
 import { queryCache } from "../utils/queryCache";
-import { computeJobRecommendations } from "../utils/jobRecommendations";
 
 const STOPWORDS = new Set([
   "and",
@@ -463,9 +462,16 @@ function JobsPageContent({ email, onLogout, onNavigate }: { email: string; onLog
 
   const totalPages = Math.ceil(filteredJobs.length / JOBS_PER_PAGE);
 
+  // Ranked by the backend recommender; jobs applied to during this visit are dropped locally.
+  const { data: serverRecommendations = [] } = useCachedQuery(
+    `job-recommendations-${user?.id}`,
+    async () => (user?.id ? getJobRecommendations(user.id, 8) : []),
+    { enabled: !!user?.id }
+  );
+
   const recommendedJobs = useMemo(() => {
-    return computeJobRecommendations(jobs, userData, userResumes, appliedJobs);
-  }, [jobs, userData, userResumes, appliedJobs]);
+    return serverRecommendations.filter(({ job }) => !appliedJobs.has(job.id ?? "")).slice(0, 4);
+  }, [serverRecommendations, appliedJobs]);
 
   const currentJob = selectedJob
     ? filteredJobs.find((j) => j.id === selectedJob)
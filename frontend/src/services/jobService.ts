@@ -300,3 +300,35 @@ export async function incrementApplicationCount(jobId: string): Promise<Job> {
     throw error
   }
 }
+
+export interface RecommendedJob {
+  job: JobWithEmployer
+  score: number
+  matchedSkills: string[]
+}
+
+/**
+ * Get recommended active jobs for a student, ranked by the backend
+ * (TF-IDF over profile and resume, already-applied jobs excluded)
+ */
+export async function getJobRecommendations(studentId: string, limit = 4): Promise<RecommendedJob[]> {
+  try {
+    const apiBase = (import.meta.env.VITE_BACKEND_URL as string | undefined)?.replace(/\/$/, '') || ''
+    const resp = await fetch(`${apiBase}/api/jobs/recommendations/${encodeURIComponent(studentId)}?limit=${limit}`)
+    const result = await resp.json()
+    if (!resp.ok || !result?.success) throw new Error(result?.error || `HTTP ${resp.status}`)
+
+    return (result.data || []).map(({ score, similarity, matchedSkills, ...job }: any) => ({
+      job: {
+        ...job,
+        employer_name: job.employer?.name,
+        employer_website: job.employer?.website
+      },
+      score,
+      matchedSkills: Array.isArray(matchedSkills) ? matchedSkills : []
+    }))
+  } catch (error) {
+    console.error('Error fetching job recommendations:', error)
+    throw error
+  }
+}
@@ -142,8 +142,13 @@ export async function uploadResume(file: File, userId: string) {
       method: 'POST',
       body: formData,
     });
-    if (resp.ok) {
-      const result = await resp.json();
+    let result = resp.ok ? await resp.json() : null;
+    // Large files are parsed in the background: poll until the job finishes.
+    for (let attempt = 0; result?.status === 'pending' && result.job_id && attempt < 6; attempt++) {
+      const poll = await fetch(`${apiBase}/api/resumes/parse/${result.job_id}?wait=10`);
+      result = poll.ok ? await poll.json() : null;
+    }
+    if (result?.status !== 'pending' && result?.success) {
       skills = Array.isArray(result.skills) ? result.skills : [];
       ratings = result.ratings || {};
       resume_text = typeof result.resume_text === 'string' ? result.resume_text : '';
@@ -105,39 +105,11 @@ function jaccard(a: Set<string>, b: Set<string>): number {
   return ia.length ? ia.length / (a.size + b.size - ia.length) : 0;
 }
 
-// ---------------------------------------------------------------------------
-// Cosine similarity between two dense vectors
-// ---------------------------------------------------------------------------
-
-function cosineSimilarity(a: number[], b: number[]): number {
-  let dot = 0, magA = 0, magB = 0;
-  for (let i = 0; i < a.length; i++) {
-    dot  += a[i] * b[i];
-    magA += a[i] * a[i];
-    magB += b[i] * b[i];
-  }
-  const denom = Math.sqrt(magA) * Math.sqrt(magB);
-  return denom > 0 ? Math.max(0, Math.min(1, dot / denom)) : 0;
-}
-
-// ---------------------------------------------------------------------------
-// HF feature-extraction returns number[][] (token-level) or number[].
-// Mean-pool token-level outputs to get a sentence embedding.
-// ---------------------------------------------------------------------------
-
-function toSentenceEmbedding(raw: number[] | number[][]): number[] {
-  if (typeof raw[0] === 'number') return raw as number[];
-  const tokens = raw as number[][];
-  const dim = tokens[0].length;
-  const mean = new Array(dim).fill(0);
-  for (const tok of tokens) {
-    for (let i = 0; i < dim; i++) mean[i] += tok[i];
-  }
-  return mean.map(v => v / tokens.length);
-}
-
 // ---------------------------------------------------------------------------
 // Path 1 — RoBERTa Sentence Similarity
+//
+// The backend embeds both texts and computes the cosine itself, returning
+// only the score (clamped to 0–1) instead of two 1024-float vectors.
 // ---------------------------------------------------------------------------
 
 async function callRoBERTaSimilarity(
@@ -152,19 +124,20 @@ async function callRoBERTaSimilarity(
   const referenceText = `${question} ${referenceAnswer}`.slice(0, 512);
 
   try {
-    const res = await fetch(`${BACKEND_URL}/api/hf-embed`, {
+    const res = await fetch(`${BACKEND_URL}/api/hf-similarity`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ inputs: [referenceText, answer] }),
+      body: JSON.stringify({ answer, references: [referenceText] }),
       signal: controller.signal,
     });
 
     if (!res.ok) throw new Error(`RoBERTa API error ${res.status}`);
 
     const data = await res.json();
-    const embA = toSentenceEmbedding(data[0]);
-    const embB = toSentenceEmbedding(data[1]);
-    return cosineSimilarity(embA, embB);
+    if (!Array.isArray(data.scores) || typeof data.scores[0] !== 'number') {
+      throw new Error('Invalid RoBERTa similarity response');
+    }
+    return data.scores[0];
 
   } finally {
     window.clearTimeout(tid);
@@ -202,24 +175,45 @@ function probabilityToLikert(strong: number, mid: number, weak: number): number
   return Math.max(1, Math.min(5, Math.round(strong * 5 + mid * 3 + weak * 1)));
 }
 
-// Classify a single STAR dimension with its own focus question.
-// Each dimension call appends a different focus question to the shared base text,
+// Upper bound on the answer text sent for classification (~2 minutes of speech
+// is well under this); the backend splits it into overlapping token windows.
+const ZSL_MAX_INPUT_CHARS = 6000;
+
+// Each dimension appends a different focus question to the shared base text,
 // so the NLI model evaluates a distinct hypothesis per STAR component.
+// Used by the per-dimension fallback (older backends truncate to 350 chars).
+function dimensionText(dim: keyof STARBreakdown, baseText: string): string {
+  return `${baseText.slice(0, 600)}
+${FOCUS_QUESTIONS[dim]}`.slice(0, 650);
+}
+
+// Map a ZSL {labels, scores} result for one dimension onto the 1–5 scale.
+function zslResultToLikert(dim: keyof STARBreakdown, labels: string[], scores: number[]): number {
+  const labelIdx = (label: string) => labels.indexOf(label);
+  const strongIdx = labelIdx(ZSL_LABELS[dim][0]);
+  const midIdx    = labelIdx(ZSL_LABELS[dim][1]);
+  const weakIdx   = labelIdx(ZSL_LABELS[dim][2]);
+
+  const strong = strongIdx >= 0 ? scores[strongIdx] : 0;
+  const mid    = midIdx    >= 0 ? scores[midIdx]    : 0;
+  const weak   = weakIdx   >= 0 ? scores[weakIdx]   : 0;
+
+  return probabilityToLikert(strong, mid, weak);
+}
+
+// Classify a single STAR dimension (fallback for backends without batch support).
 async function classifyDimension(
   dim: keyof STARBreakdown,
   baseText: string
 ): Promise<[keyof STARBreakdown, number]> {
   const controller = new AbortController();
   const tid = window.setTimeout(() => controller.abort(), HF_TIMEOUT_MS);
-  // Append the dimension-specific focus question to the base text.
-  const text = `${baseText}
-${FOCUS_QUESTIONS[dim]}`.slice(0, 650);
   try {
     const res = await fetch(`${BACKEND_URL}/api/hf-classify`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({
-        inputs: text,
+        inputs: dimensionText(dim, baseText),
         candidate_labels: ZSL_LABELS[dim],
       }),
       signal: controller.signal,
@@ -229,16 +223,45 @@ ${FOCUS_QUESTIONS[dim]}`.slice(0, 650);
 
     if (!data.labels || !data.scores) throw new Error('Invalid ZSL response');
 
-    const labelIdx = (label: string) => (data.labels as string[]).indexOf(label);
-    const strongIdx = labelIdx(ZSL_LABELS[dim][0]);
-    const midIdx    = labelIdx(ZSL_LABELS[dim][1]);
-    const weakIdx   = labelIdx(ZSL_LABELS[dim][2]);
+    return [dim, zslResultToLikert(dim, data.labels, data.scores)];
+  } finally {
+    window.clearTimeout(tid);
+  }
+}
+
+// Classify every STAR dimension in one request — the backend runs all
+// premise × label pairs through a single batched NLI forward pass.
+async function classifyAllDimensions(
+  dims: (keyof STARBreakdown)[],
+  baseText: string
+): Promise<[keyof STARBreakdown, number][]> {
+  const controller = new AbortController();
+  const tid = window.setTimeout(() => controller.abort(), HF_TIMEOUT_MS);
+  try {
+    const res = await fetch(`${BACKEND_URL}/api/hf-classify`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        // The backend windows long answers and re-appends the focus question to
+        // every window, so the full answer is classified instead of the first 650 chars.
+        dimensions: dims.map((dim) => ({
+          key: dim,
+          inputs: baseText,
+          premise_suffix: FOCUS_QUESTIONS[dim],
+          candidate_labels: ZSL_LABELS[dim],
+        })),
+      }),
+      signal: controller.signal,
+    });
+    if (!res.ok) throw new Error(`ZSL classify error ${res.status}`);
+    const data = await res.json();
 
-    const strong = strongIdx >= 0 ? data.scores[strongIdx] : 0;
-    const mid    = midIdx    >= 0 ? data.scores[midIdx]    : 0;
-    const weak   = weakIdx   >= 0 ? data.scores[weakIdx]   : 0;
+    if (!Array.isArray(data.results) || data.results.length !== dims.length) {
+      throw new Error('Invalid batched ZSL response');
+    }
 
-    return [dim, probabilityToLikert(strong, mid, weak)];
+    return (data.results as { key: keyof STARBreakdown; labels: string[]; scores: number[] }[])
+      .map((r) => [r.key, zslResultToLikert(r.key, r.labels, r.scores)]);
   } finally {
     window.clearTimeout(tid);
   }
@@ -250,16 +273,22 @@ async function callZSLClassify(
 ): Promise<STARBreakdown> {
   if (!BACKEND_URL) throw new Error('VITE_BACKEND_URL is not set.');
 
-  // Base text shared across all dimension calls — each gets its own focus question appended.
+  // Base text shared across all dimensions — each gets its own focus question appended.
+  // Capped only as a payload guard; the backend chunks it into token windows.
   const baseText = `Question: ${question}
-Answer: ${answer}`.slice(0, 600);
+Answer: ${answer}`.slice(0, ZSL_MAX_INPUT_CHARS);
 
   const dims = ['situation', 'task', 'action', 'result', 'reflection'] as (keyof STARBreakdown)[];
 
-  const dimScores: [keyof STARBreakdown, number][] = [];
-  for (const dim of dims) {
-    const result = await classifyDimension(dim, baseText);
-    dimScores.push(result);
+  let dimScores: [keyof STARBreakdown, number][];
+  try {
+    dimScores = await classifyAllDimensions(dims, baseText);
+  } catch (err) {
+    console.warn('[ZSL] Batched classify failed, falling back to per-dimension calls:', err);
+    dimScores = [];
+    for (const dim of dims) {
+      dimScores.push(await classifyDimension(dim, baseText));
+    }
   }
 
   const scores = Object.fromEntries(dimScores) as Record<keyof STARBreakdown, number>;